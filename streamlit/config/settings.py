@@ -2,6 +2,11 @@
 Configuration settings for the Streamlit dashboard
 """
 
+import os
+
+# Root of the Streamlit app, used to resolve local data directories
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 # BigQuery Configuration
 BIGQUERY_CONFIG = {
     "project_id": "project-olist-470307",
@@ -9,6 +14,27 @@ BIGQUERY_CONFIG = {
     "location": "asia-southeast1"  # Updated to your data location
 }
 
+# Developer mode unlocks diagnostics such as the Performance page
+DEV_MODE = os.getenv("OLIST_DEV_MODE", "0") == "1"
+
+# Query Backend Settings
+QUERY_BACKEND = {
+    "type": os.getenv("OLIST_QUERY_BACKEND", "bigquery"),     # "bigquery" or "duckdb"
+    "duckdb_data_dir": os.path.join(APP_DIR, "data", "obt"),  # <table>.parquet copies of ANALYTICS_TABLES
+    # Memory-mapped Arrow IPC snapshots (scripts/export_arrow_snapshot.py), shared by
+    # every process on the host; used by the duckdb backend instead of Parquet when published
+    "arrow_snapshot_dir": os.getenv("OLIST_ARROW_SNAPSHOT_DIR", os.path.join(APP_DIR, "data", "snapshots")),
+    "arrow_snapshots_kept": 3
+}
+
+# Record/Replay Settings (offline, deterministic runs without a GCP project)
+CASSETTE_CONFIG = {
+    "mode": os.getenv("OLIST_CASSETTE_MODE", "off"),  # "off", "record" (live + save) or "replay"
+    "directory": os.getenv("OLIST_CASSETTE_DIR", os.path.join(APP_DIR, "cassettes")),
+    "latency": "recorded",  # Replay latency: "recorded", fixed seconds, or None for instant
+    "latency_scale": 1.0    # Multiplier on recorded latencies
+}
+
 # Analytics OBT Table Names
 ANALYTICS_TABLES = {
     "revenue": "revenue_analytics_obt",
@@ -20,6 +46,38 @@ ANALYTICS_TABLES = {
     "orders": "orders_analytics_obt"
 }
 
+# Partition and cluster columns declared in the dbt analytics_obt model configs
+ANALYTICS_TABLE_LAYOUTS = {
+    "revenue_analytics_obt": {
+        "partition_by": "order_date",
+        "cluster_by": ["customer_state", "product_category_english", "seller_state"]
+    },
+    "customer_analytics_obt": {
+        "partition_by": None,
+        "cluster_by": ["customer_state", "customer_segment", "satisfaction_tier"]
+    },
+    "seller_analytics_obt": {
+        "partition_by": None,
+        "cluster_by": ["seller_state", "performance_tier", "seller_segment"]
+    },
+    "payment_analytics_obt": {
+        "partition_by": None,
+        "cluster_by": ["payment_type", "installment_category", "customer_state"]
+    },
+    "geographic_analytics_obt": {
+        "partition_by": None,
+        "cluster_by": ["geographic_region", "market_tier", "state_code"]
+    },
+    "delivery_analytics_obt": {
+        "partition_by": None,
+        "cluster_by": []
+    },
+    "orders_analytics_obt": {
+        "partition_by": "order_date",
+        "cluster_by": ["customer_state", "order_status"]
+    }
+}
+
 # Streamlit Page Configuration
 PAGE_CONFIG = {
     "page_title": "Olist Analytics Dashboard",
@@ -45,7 +103,136 @@ CHART_DEFAULTS = {
 
 # Cache Settings (in seconds)
 CACHE_TTL = {
-    "data_queries": 3600,  # 1 hour
+    "data_queries": 3600,  # 1 hour, only for queries whose source tables have no known version
     "table_info": 7200,    # 2 hours  
-    "charts": 1800         # 30 minutes
+    "charts": 1800,        # 30 minutes
+    "table_versions": 60   # How often table modification times are re-checked
+}
+
+# Concurrent Query Settings
+QUERY_CONCURRENCY = {
+    "max_workers": 8  # Max BigQuery jobs submitted at once per page batch
+}
+
+# Result Download Settings
+DOWNLOAD_CONFIG = {
+    "use_storage_api": False,  # Opt-in Arrow / BigQuery Storage Read API path for full-table reads
+    "arrow_dtypes": True       # Keep Arrow-backed pandas dtypes on the Storage API path
+}
+
+# In-Memory Result Cache Settings (per process, least-recently-used eviction)
+MEMORY_CACHE_CONFIG = {
+    "max_size_mb": 1024,        # Budget for all cached DataFrames, measured with memory_usage(deep=True)
+    "max_entry_fraction": 0.25  # Results larger than this share of the budget are not kept in memory
+}
+
+# Query Result Dtype Compaction Settings (applied before results are cached)
+DTYPE_COMPACTION_CONFIG = {
+    "enabled": True,
+    "max_category_ratio": 0.5,  # String columns with at most this distinct/rows ratio become categoricals
+    "min_int_bits": 32,         # Narrowest integer downcast; int8/int16 overflow silently in arithmetic
+    "downcast_floats": False,   # float32 when lossless; derived sums then accumulate in float32
+    "arrow_strings": False      # Store high-cardinality strings as string[pyarrow]
+}
+
+# Streaming Query Settings (iter_query_chunks)
+STREAMING_CONFIG = {
+    "chunk_rows": 50_000  # Maximum rows per yielded chunk
+}
+
+# Filtered Slice Settings (filtered_slice: per-session local copies of filtered OBT rows)
+SESSION_SLICE_CONFIG = {
+    "enabled": True,
+    "max_rows": 500_000,    # Filters matching more rows than this query the full table instead
+    "max_size_mb": 512,     # Budget for the slices of all sessions together
+    "idle_seconds": 1800    # Slices unused this long are dropped
+}
+
+# Columnar Store Settings (in-process column copies of small OBT tables, aggregated locally)
+COLUMNAR_STORE_CONFIG = {
+    "enabled": os.getenv("OLIST_COLUMNAR_STORE", "1") == "1",
+    "max_rows": 2_000_000,  # Larger tables are aggregated by the query backend instead
+    "tables": {             # Columns loaded per table: everything its pages group, sum or filter on
+        "revenue_analytics_obt": [
+            "order_id", "customer_id", "customer_unique_id", "item_price", "order_date",
+            "customer_state", "seller_state", "product_category_english"
+        ]
+    }
+}
+
+# Persistent Result Cache Settings (Parquet files under the in-memory cache)
+DISK_CACHE_CONFIG = {
+    "enabled": True,
+    "directory": os.path.join(APP_DIR, ".query_cache"),
+    "max_size_mb": 512  # Least-recently-used results are evicted above this size
+}
+
+# Hedged Execution Settings (duplicate slow BigQuery jobs, keep the first result)
+HEDGING_CONFIG = {
+    "enabled": False,
+    "percentile": 95,             # Hedge once a query runs past this percentile of its latency history
+    "min_samples": 20,            # Latencies needed before a query template's history is trusted
+    "history_size": 200,          # Latencies kept per query template
+    "min_delay_seconds": 1.0,     # Never hedge sooner than this
+    "poll_interval_seconds": 0.2  # How often the racing jobs are checked
+}
+
+# Shared Result Cache Settings (Redis protocol, shared by every dashboard replica)
+SHARED_CACHE_CONFIG = {
+    "url": os.getenv("OLIST_REDIS_URL", ""),  # e.g. redis://cache:6379/0; empty disables the shared cache
+    "ttl_seconds": 6 * 3600,
+    "key_prefix": "olist:result:",
+    "compression": "zstd",         # Arrow IPC buffer compression: "zstd", "lz4" or None
+    "max_entry_mb": 64,            # Larger results stay replica-local
+    "socket_timeout_seconds": 0.5,
+    "retry_after_seconds": 30      # Back-off after a connection error before retrying the server
+}
+
+# Cache Warmer Settings (pre-executes every page's get_* queries)
+CACHE_WARMER_CONFIG = {
+    "enabled": os.getenv("OLIST_WARM_CACHE", "1") == "1",
+    "pages_dir": os.path.join(APP_DIR, "pages"),
+    "trigger_file": os.path.join(APP_DIR, ".warm_trigger"),  # Touch to force a re-warm
+    "dbt_run_results": os.path.join(os.path.dirname(APP_DIR), "dbt", "target", "run_results.json"),
+    "poll_interval_seconds": 30,  # How often the trigger files are checked
+    "exclude": []                 # get_* functions that should not be warmed
+}
+
+# Benchmark Settings (scripts/benchmark.py)
+BENCHMARK_CONFIG = {
+    "repetitions": 5,
+    "baseline_path": os.path.join(APP_DIR, "benchmarks", "baseline.json"),
+    "output_path": os.path.join(APP_DIR, "benchmarks", "latest.json"),
+    "latency_regression": 0.25,    # Fail when p50 grows by more than 25%...
+    "min_latency_delta_ms": 20,    # ...and by more than this many milliseconds
+    "bytes_regression": 0.10,      # Fail when bytes processed grow by more than 10%
+    "memory_regression": 0.25      # Fail when result memory grows by more than 25%
+}
+
+# Query Telemetry Settings
+TELEMETRY_CONFIG = {
+    "enabled": True,
+    "max_records": 5000  # Ring buffer size; oldest records are dropped first
+}
+
+# Query Plan Inspection Settings (flags wasteful backend executions in telemetry)
+PLAN_INSPECTION_CONFIG = {
+    "enabled": True,
+    "max_read_amplification": 1000,         # Flag jobs processing more than 1000x their result size...
+    "min_bytes_processed": 10 * 1024 ** 2   # ...once they process at least 10 MB
+}
+
+# Query Cost Guard Settings (dry-run before running uncached queries)
+COST_GUARD_CONFIG = {
+    "enabled": False,
+    "max_bytes_per_query": 1024 ** 3,  # 1 GB per-query budget
+    "over_budget_action": "refuse",    # "refuse" or "sample"
+    "sample_percent": 10               # TABLESAMPLE size when downgrading to a sampled query
+}
+
+# Query Deadline Settings
+QUERY_TIMEOUT_CONFIG = {
+    "timeout_seconds": 120,        # Per-query deadline; the job is cancelled when exceeded (None disables)
+    "cancel_abandoned": True,      # Cancel jobs whose page run was superseded (rerun, page change) or whose session ended
+    "poll_interval_seconds": 0.5   # How often waiting queries check their deadline and run state
 }
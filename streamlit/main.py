@@ -7,6 +7,8 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 
+from utils.cache_warmer import start_cache_warmer
+
 # Configure page
 st.set_page_config(
     page_title="Olist Analytics Dashboard",
@@ -15,6 +17,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Warm every page's queries in the background, once per server process (pages
+# start it through utils.database; the home page queries nothing, so start it here)
+start_cache_warmer()
+
 # Main title
 st.title("🛒 Olist E-commerce Analytics Dashboard")
 st.markdown("---")
@@ -10,10 +10,14 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import sys
 import os
+from contextlib import ExitStack
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.database import execute_custom_query, get_table_info
+from utils.database import (
+    aggregate_locally, columnar_store_available, execute_custom_query, filtered_slice, get_table_info
+)
+from utils.query_builder import DateRange, InList, build_where_clause
 from config.settings import ANALYTICS_TABLES, COLOR_PALETTES, CHART_DEFAULTS, BIGQUERY_CONFIG
 
 # Page configuration
@@ -33,10 +37,75 @@ st.sidebar.header("🔍 Filters")
 def get_table_ref(table_name):
     return f"`{BIGQUERY_CONFIG['project_id']}.{BIGQUERY_CONFIG['dataset_id']}.{table_name}`"
 
-# Fast aggregated queries instead of loading all data
-@st.cache_data(ttl=3600)
-def get_revenue_overview_metrics():
+# Aggregations are answered in process from the table's columnar store when it is
+# enabled (see COLUMNAR_STORE_CONFIG); the SQL below is the fallback. Sidebar
+# filters are bound as parameters on the partition (order_date) and cluster
+# columns, so BigQuery only scans the selected partitions and blocks.
+def get_order_date_range():
+    """Get the first and last order date, bounding the date filter"""
+    local_df = aggregate_locally(ANALYTICS_TABLES["revenue"], {
+        "min_date": ("min", "order_date"),
+        "max_date": ("max", "order_date")
+    })
+    if local_df is not None:
+        return local_df
+    
+    query = f"""
+    SELECT 
+        MIN(order_date) as min_date,
+        MAX(order_date) as max_date
+    FROM {get_table_ref(ANALYTICS_TABLES["revenue"])}
+    """
+    return execute_custom_query(query)
+
+def get_filter_values(column):
+    """Get the distinct non-null values of a filter column"""
+    local_df = aggregate_locally(ANALYTICS_TABLES["revenue"], {"rows": ("count", None)}, by=[column])
+    if local_df is not None:
+        return local_df[[column]].sort_values(column).reset_index(drop=True)
+    
+    query = f"""
+    SELECT DISTINCT {column}
+    FROM {get_table_ref(ANALYTICS_TABLES["revenue"])}
+    WHERE {column} IS NOT NULL
+    ORDER BY {column}
+    """
+    return execute_custom_query(query)
+
+def filter_options(column):
+    """Options of a multiselect filter (empty if the values could not be loaded)"""
+    values_df = get_filter_values(column)
+    return values_df[column].tolist() if column in values_df else []
+
+def build_revenue_filters(date_range, customer_states, seller_states, categories):
+    """Turn the sidebar selections into query_builder predicates (empty selections do not filter)"""
+    filters = []
+    if date_range is not None:
+        filters.append(DateRange("order_date", date_range[0], date_range[1]))
+    if customer_states:
+        filters.append(InList("customer_state", list(customer_states)))
+    if seller_states:
+        filters.append(InList("seller_state", list(seller_states)))
+    if categories:
+        filters.append(InList("product_category_english", list(categories)))
+    return filters
+
+def get_revenue_overview_metrics(filters=None):
     """Get key revenue metrics using SQL aggregation"""
+    local_df = aggregate_locally(ANALYTICS_TABLES["revenue"], {
+        "total_transactions": ("count", None),
+        "total_unique_customers": ("nunique", "customer_unique_id"),
+        "total_customer_records": ("nunique", "customer_id"),
+        "total_orders": ("nunique", "order_id"),
+        "total_revenue": ("sum", "item_price"),
+        "avg_revenue_per_transaction": ("mean", "item_price"),
+        "total_items": ("count", None)
+    }, filters=filters)
+    if local_df is not None:
+        local_df.insert(6, "avg_order_value", local_df["total_revenue"] / local_df["total_orders"])
+        return local_df.round(2)
+    
+    where_clause, params = build_where_clause(ANALYTICS_TABLES["revenue"], filters)
     query = f"""
     SELECT 
         COUNT(*) as total_transactions,
@@ -45,15 +114,29 @@ def get_revenue_overview_metrics():
         COUNT(DISTINCT order_id) as total_orders,
         ROUND(SUM(item_price), 2) as total_revenue,
         ROUND(AVG(item_price), 2) as avg_revenue_per_transaction,
-        ROUND(SUM(item_price) / COUNT(DISTINCT order_id), 2) as avg_order_value,
+        ROUND(SAFE_DIVIDE(SUM(item_price), COUNT(DISTINCT order_id)), 2) as avg_order_value,
         COUNT(*) as total_items
     FROM {get_table_ref(ANALYTICS_TABLES["revenue"])}
+    {where_clause}
     """
-    return execute_custom_query(query)
+    return execute_custom_query(query, params)
 
-@st.cache_data(ttl=3600)
-def get_monthly_revenue_trend():
+def get_monthly_revenue_trend(filters=None):
     """Get monthly revenue trend using SQL"""
+    local_df = aggregate_locally(ANALYTICS_TABLES["revenue"], {
+        "monthly_revenue": ("sum", "item_price"),
+        "monthly_orders": ("nunique", "order_id")
+    }, by=[("order_date", "month")], filters=filters)
+    if local_df is not None:
+        month_date = local_df.pop("order_date")
+        local_df.insert(0, "year", month_date.dt.year)
+        local_df.insert(1, "month", month_date.dt.month)
+        local_df.insert(2, "month_date", month_date)
+        return local_df.round({"monthly_revenue": 2})
+    
+    where_clause, params = build_where_clause(
+        ANALYTICS_TABLES["revenue"], filters, conditions=["order_date IS NOT NULL"]
+    )
     query = f"""
     SELECT 
         EXTRACT(YEAR FROM order_date) as year,
@@ -62,15 +145,25 @@ def get_monthly_revenue_trend():
         ROUND(SUM(item_price), 2) as monthly_revenue,
         COUNT(DISTINCT order_id) as monthly_orders
     FROM {get_table_ref(ANALYTICS_TABLES["revenue"])}
-    WHERE order_date IS NOT NULL
+    {where_clause}
     GROUP BY year, month, month_date
     ORDER BY year, month
     """
-    return execute_custom_query(query)
+    return execute_custom_query(query, params)
 
-@st.cache_data(ttl=3600)
-def get_top_products():
+def get_top_products(filters=None):
     """Get top products by revenue using SQL"""
+    local_df = aggregate_locally(ANALYTICS_TABLES["revenue"], {
+        "category_revenue": ("sum", "item_price"),
+        "orders_count": ("nunique", "order_id"),
+        "items_sold": ("count", None)
+    }, by=["product_category_english"], filters=filters)
+    if local_df is not None:
+        return local_df.round(2).nlargest(10, "category_revenue").reset_index(drop=True)
+    
+    where_clause, params = build_where_clause(
+        ANALYTICS_TABLES["revenue"], filters, conditions=["product_category_english IS NOT NULL"]
+    )
     query = f"""
     SELECT 
         product_category_english,
@@ -78,16 +171,27 @@ def get_top_products():
         COUNT(DISTINCT order_id) as orders_count,
         COUNT(*) as items_sold
     FROM {get_table_ref(ANALYTICS_TABLES["revenue"])}
-    WHERE product_category_english IS NOT NULL
+    {where_clause}
     GROUP BY product_category_english
     ORDER BY category_revenue DESC
     LIMIT 10
     """
-    return execute_custom_query(query)
+    return execute_custom_query(query, params)
 
-@st.cache_data(ttl=3600)
-def get_state_performance():
+def get_state_performance(filters=None):
     """Get revenue by state using SQL"""
+    local_df = aggregate_locally(ANALYTICS_TABLES["revenue"], {
+        "state_revenue": ("sum", "item_price"),
+        "unique_customers": ("nunique", "customer_unique_id"),
+        "customer_records": ("nunique", "customer_id"),
+        "orders": ("nunique", "order_id")
+    }, by=["customer_state"], filters=filters)
+    if local_df is not None:
+        return local_df.round(2).nlargest(15, "state_revenue").reset_index(drop=True)
+    
+    where_clause, params = build_where_clause(
+        ANALYTICS_TABLES["revenue"], filters, conditions=["customer_state IS NOT NULL"]
+    )
     query = f"""
     SELECT 
         customer_state,
@@ -96,24 +200,63 @@ def get_state_performance():
         COUNT(DISTINCT customer_id) as customer_records,
         COUNT(DISTINCT order_id) as orders
     FROM {get_table_ref(ANALYTICS_TABLES["revenue"])}
-    WHERE customer_state IS NOT NULL
+    {where_clause}
     GROUP BY customer_state
     ORDER BY state_revenue DESC
     LIMIT 15
     """
-    return execute_custom_query(query)
+    return execute_custom_query(query, params)
+
+# Sidebar filter widgets
+date_range = None
+date_bounds_df = get_order_date_range()
+if not date_bounds_df.empty and pd.notna(date_bounds_df["min_date"].iloc[0]):
+    min_date = pd.Timestamp(date_bounds_df["min_date"].iloc[0]).date()
+    max_date = pd.Timestamp(date_bounds_df["max_date"].iloc[0]).date()
+    selected_dates = st.sidebar.date_input(
+        "Order Date",
+        value=(min_date, max_date),
+        min_value=min_date,
+        max_value=max_date,
+        help="Filters on the order_date partition column"
+    )
+    # A range is only complete once both ends are picked; the default full
+    # range is no filter, so unfiltered renders keep using the unfiltered caches
+    if isinstance(selected_dates, (list, tuple)) and len(selected_dates) == 2:
+        if tuple(selected_dates) != (min_date, max_date):
+            date_range = tuple(selected_dates)
+
+customer_states = st.sidebar.multiselect(
+    "Customer State", filter_options("customer_state"), help="Leave empty for all states"
+)
+seller_states = st.sidebar.multiselect(
+    "Seller State", filter_options("seller_state"), help="Leave empty for all states"
+)
+categories = st.sidebar.multiselect(
+    "Product Category", filter_options("product_category_english"), help="Leave empty for all categories"
+)
+filters = build_revenue_filters(date_range, customer_states, seller_states, categories)
+
+# The SQL fallbacks of the charts below share one WHERE clause: unless the columnar
+# store answers them locally, they run against one session slice of the filtered rows
+page_scope = ExitStack()
+if not columnar_store_available(ANALYTICS_TABLES["revenue"]):
+    page_scope.enter_context(filtered_slice(ANALYTICS_TABLES["revenue"], filters))
 
 # Main content
 try:
     # Load key metrics (fast aggregated query)
     with st.spinner("Loading revenue metrics..."):
-        metrics_df = get_revenue_overview_metrics()
+        metrics_df = get_revenue_overview_metrics(filters)
     
     if metrics_df.empty:
         st.warning("No revenue data available. Please check your database connection.")
         st.stop()
     
     metrics = metrics_df.iloc[0]
+    if metrics["total_transactions"] == 0:
+        st.info("No orders match the selected filters.")
+        st.stop()
     
     # Revenue Overview Metrics
     st.subheader("💰 Revenue Overview")
@@ -181,7 +324,7 @@ try:
     
     # Monthly revenue trend
     with st.spinner("Loading monthly trends..."):
-        monthly_df = get_monthly_revenue_trend()
+        monthly_df = get_monthly_revenue_trend(filters)
     
     if not monthly_df.empty:
         fig = px.line(monthly_df, 
@@ -199,7 +342,7 @@ try:
     with col1:
         st.subheader("🏆 Top Product Categories")
         with st.spinner("Loading top products..."):
-            products_df = get_top_products()
+            products_df = get_top_products(filters)
         
         if not products_df.empty:
             fig = px.bar(products_df, 
@@ -217,7 +360,7 @@ try:
     with col2:
         st.subheader("�️ Revenue by State")
         with st.spinner("Loading state performance..."):
-            states_df = get_state_performance()
+            states_df = get_state_performance(filters)
         
         if not states_df.empty:
             fig = px.bar(states_df.head(10), 
@@ -262,3 +405,6 @@ except Exception as e:
         st.metric("Total Orders", "112,650", "8.7%")
     with col4:
         st.metric("Growth Rate", "15.3%", "2.1%")
+
+finally:
+    page_scope.close()
@@ -25,7 +25,6 @@ def get_table_ref(table_name):
     return f"`{BIGQUERY_CONFIG['project_id']}.{BIGQUERY_CONFIG['dataset_id']}.{table_name}`"
 
 # Fast SQL-based analytics functions
-@st.cache_data(ttl=3600)
 def get_table_columns():
     """Get column names from customer analytics table"""
     query = f"""
@@ -36,7 +35,6 @@ def get_table_columns():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_customer_sample():
     """Get sample data to understand the structure"""
     query = f"""
@@ -46,7 +44,6 @@ def get_customer_sample():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_customer_metrics():
     """Get key customer metrics using SQL aggregation with actual columns"""
     query = f"""
@@ -63,7 +60,6 @@ def get_customer_metrics():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_customer_segmentation():
     """Get customer segmentation using actual columns"""
     query = f"""
@@ -80,7 +76,6 @@ def get_customer_segmentation():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_geographic_distribution():
     """Get customer geographic distribution using actual columns"""
     query = f"""
@@ -98,7 +93,6 @@ def get_geographic_distribution():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_spending_analysis():
     """Get customer spending analysis using actual columns"""
     query = f"""
@@ -119,7 +113,6 @@ def get_spending_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_customer_lifecycle():
     """Get customer lifecycle analysis using actual columns"""
     query = f"""
@@ -25,7 +25,6 @@ def get_table_ref(table_name):
     return f"`{BIGQUERY_CONFIG['project_id']}.{BIGQUERY_CONFIG['dataset_id']}.{table_name}`"
 
 # Fast SQL-based analytics functions
-@st.cache_data(ttl=3600)
 def get_table_columns():
     """Get column names from seller analytics table"""
     query = f"""
@@ -36,7 +35,6 @@ def get_table_columns():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_seller_sample():
     """Get sample data to understand the structure"""
     query = f"""
@@ -46,7 +44,6 @@ def get_seller_sample():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_seller_metrics():
     """Get key seller metrics using SQL aggregation with actual columns"""
     query = f"""
@@ -65,7 +62,6 @@ def get_seller_metrics():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_seller_performance_tiers():
     """Get seller performance analysis using actual performance_tier column"""
     query = f"""
@@ -84,7 +80,6 @@ def get_seller_performance_tiers():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_geographic_seller_distribution():
     """Get seller geographic distribution using actual columns"""
     query = f"""
@@ -103,7 +98,6 @@ def get_geographic_seller_distribution():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_seller_activity_analysis():
     """Get seller activity analysis using activity_level column"""
     query = f"""
@@ -121,7 +115,6 @@ def get_seller_activity_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_seller_segments():
     """Get seller segmentation analysis"""
     query = f"""
@@ -139,7 +132,6 @@ def get_seller_segments():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_top_performing_sellers():
     """Get top performing sellers with actual columns"""
     query = f"""
@@ -161,7 +153,6 @@ def get_top_performing_sellers():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_quality_analysis():
     """Get seller quality analysis"""
     query = f"""
@@ -25,7 +25,6 @@ def get_table_ref(table_name):
     return f"`{BIGQUERY_CONFIG['project_id']}.{BIGQUERY_CONFIG['dataset_id']}.{table_name}`"
 
 # Fast SQL-based analytics functions
-@st.cache_data(ttl=3600)
 def get_payment_overview_metrics():
     """Get key payment overview metrics"""
     query = f"""
@@ -44,7 +43,6 @@ def get_payment_overview_metrics():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_payment_method_distribution():
     """Get payment method distribution and analysis"""
     query = f"""
@@ -64,7 +62,6 @@ def get_payment_method_distribution():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_installment_analysis():
     """Get installment behavior analysis"""
     query = f"""
@@ -84,7 +81,6 @@ def get_installment_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_payment_risk_analysis():
     """Get payment risk level analysis"""
     query = f"""
@@ -104,7 +100,6 @@ def get_payment_risk_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_credit_behavior_analysis():
     """Get credit behavior type analysis"""
     query = f"""
@@ -123,7 +118,6 @@ def get_credit_behavior_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_payment_trends():
     """Get payment trends over time"""
     query = f"""
@@ -147,7 +141,6 @@ def get_payment_trends():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_customer_payment_profiles():
     """Get customer payment profile distribution"""
     query = f"""
@@ -166,7 +159,6 @@ def get_customer_payment_profiles():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_geographic_payment_patterns():
     """Get payment patterns by geography"""
     query = f"""
@@ -187,7 +179,6 @@ def get_geographic_payment_patterns():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_payment_satisfaction_analysis():
     """Get payment satisfaction correlation analysis"""
     query = f"""
@@ -25,7 +25,6 @@ def get_table_ref(table_name):
     return f"`{BIGQUERY_CONFIG['project_id']}.{BIGQUERY_CONFIG['dataset_id']}.{table_name}`"
 
 # Fast SQL-based analytics functions
-@st.cache_data(ttl=3600)
 def get_geographic_overview_metrics():
     """Get key geographic overview metrics"""
     query = f"""
@@ -44,7 +43,6 @@ def get_geographic_overview_metrics():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_regional_performance():
     """Get performance by geographic regions"""
     query = f"""
@@ -66,7 +64,6 @@ def get_regional_performance():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_market_tier_analysis():
     """Get market tier performance analysis"""
     query = f"""
@@ -87,7 +84,6 @@ def get_market_tier_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_market_development_analysis():
     """Get market development tier analysis"""
     query = f"""
@@ -107,7 +103,6 @@ def get_market_development_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_state_performance_ranking():
     """Get top performing states"""
     query = f"""
@@ -130,7 +125,6 @@ def get_state_performance_ranking():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_market_density_analysis():
     """Get market density analysis"""
     query = f"""
@@ -150,7 +144,6 @@ def get_market_density_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_payment_preferences_by_region():
     """Get payment preferences by geographic region"""
     query = f"""
@@ -170,7 +163,6 @@ def get_payment_preferences_by_region():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_logistics_analysis():
     """Get logistics and shipping analysis by region"""
     query = f"""
@@ -191,7 +183,6 @@ def get_logistics_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_competition_analysis():
     """Get seller competition analysis"""
     query = f"""
@@ -211,7 +202,6 @@ def get_competition_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_market_maturity_analysis():
     """Get market maturity analysis"""
     query = f"""
@@ -7,7 +7,7 @@ import os
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.database import execute_custom_query, get_table_info
+from utils.database import execute_custom_query, execute_queries_concurrently, get_table_info
 from config.settings import ANALYTICS_TABLES, COLOR_PALETTES, CHART_DEFAULTS, BIGQUERY_CONFIG
 
 # Page configuration
@@ -25,7 +25,6 @@ def get_table_ref(table_name):
     return f"`{BIGQUERY_CONFIG['project_id']}.{BIGQUERY_CONFIG['dataset_id']}.{table_name}`"
 
 # Fast SQL-based analytics functions
-@st.cache_data(ttl=600)
 def get_table_columns():
     """Get column information for the delivery analytics table"""
     query = """
@@ -40,7 +39,6 @@ def get_table_columns():
         st.error(f"Error getting table columns: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
 def get_delivery_sample():
     """Get a sample of delivery analytics data"""
     query = """
@@ -54,7 +52,6 @@ def get_delivery_sample():
         st.error(f"Error getting sample data: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=3600)
 def get_delivery_overview_metrics():
     """Get key delivery overview metrics"""
     query = f"""
@@ -75,7 +72,6 @@ def get_delivery_overview_metrics():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_order_status_distribution():
     """Get order status distribution analysis"""
     query = f"""
@@ -94,7 +90,6 @@ def get_order_status_distribution():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_shipping_complexity_analysis():
     """Get shipping complexity analysis"""
     query = f"""
@@ -114,7 +109,6 @@ def get_shipping_complexity_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_geographic_delivery_performance():
     """Get delivery performance by geography"""
     query = f"""
@@ -136,7 +130,6 @@ def get_geographic_delivery_performance():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_product_category_logistics():
     """Get logistics performance by product category"""
     query = f"""
@@ -158,7 +151,6 @@ def get_product_category_logistics():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_delivery_trends():
     """Get delivery trends over time"""
     query = f"""
@@ -181,7 +173,6 @@ def get_delivery_trends():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_freight_cost_analysis():
     """Get freight cost analysis and optimization insights"""
     query = f"""
@@ -206,7 +197,6 @@ def get_freight_cost_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_seller_delivery_performance():
     """Get delivery performance by seller location"""
     query = f"""
@@ -231,7 +221,6 @@ def get_seller_delivery_performance():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_delivery_satisfaction_correlation():
     """Get correlation between delivery metrics and customer satisfaction"""
     query = f"""
@@ -269,7 +258,6 @@ def get_delivery_satisfaction_correlation():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_order_size_logistics():
     """Get logistics performance by order size"""
     query = f"""
@@ -292,6 +280,23 @@ def get_order_size_logistics():
 
 # Main content
 try:
+    # Warm every section's cache in one concurrent batch instead of one round trip per chart
+    with st.spinner("Loading delivery analytics..."):
+        execute_queries_concurrently({
+            "columns": get_table_columns,
+            "sample": get_delivery_sample,
+            "overview": get_delivery_overview_metrics,
+            "status": get_order_status_distribution,
+            "complexity": get_shipping_complexity_analysis,
+            "geographic": get_geographic_delivery_performance,
+            "product": get_product_category_logistics,
+            "trends": get_delivery_trends,
+            "freight": get_freight_cost_analysis,
+            "seller": get_seller_delivery_performance,
+            "satisfaction": get_delivery_satisfaction_correlation,
+            "order_size": get_order_size_logistics,
+        })
+    
     # First, let's examine the table structure for debugging
     st.subheader("🔍 Table Structure Analysis")
     
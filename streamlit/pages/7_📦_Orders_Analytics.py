@@ -39,7 +39,6 @@ def get_table_ref(table_name):
 # DATA LOADING FUNCTIONS
 # =============================================================================
 
-@st.cache_data(ttl=3600)
 def get_orders_overview_metrics():
     """Get key order metrics using SQL aggregation"""
     query = f"""
@@ -57,7 +56,6 @@ def get_orders_overview_metrics():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_order_complexity_distribution():
     """Get order complexity breakdown"""
     query = f"""
@@ -80,7 +78,6 @@ def get_order_complexity_distribution():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_order_value_tiers():
     """Get order value tier analysis"""
     query = f"""
@@ -103,7 +100,6 @@ def get_order_value_tiers():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_delivery_performance_analysis():
     """Get delivery performance breakdown"""
     query = f"""
@@ -120,7 +116,6 @@ def get_delivery_performance_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_monthly_orders_trend():
     """Get monthly order trends"""
     query = f"""
@@ -138,7 +133,6 @@ def get_monthly_orders_trend():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_geographic_orders_analysis():
     """Get orders by state and region"""
     query = f"""
@@ -158,7 +152,6 @@ def get_geographic_orders_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_satisfaction_vs_complexity():
     """Analyze satisfaction vs order complexity"""
     query = f"""
@@ -175,7 +168,6 @@ def get_satisfaction_vs_complexity():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_payment_behavior_analysis():
     """Analyze payment behavior patterns"""
     query = f"""
@@ -191,7 +183,6 @@ def get_payment_behavior_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_customer_behavior_analysis():
     """Analyze customer behavior patterns using customer_unique_id"""
     query = f"""
@@ -211,7 +202,6 @@ def get_customer_behavior_analysis():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600) 
 def get_customer_order_frequency():
     """Get distribution of orders per unique customer"""
     query = f"""
@@ -232,7 +222,6 @@ def get_customer_order_frequency():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_customer_order_behavior():
     """Get customer order behavior distribution using new customer behavior fields"""
     query = f"""
@@ -256,7 +245,6 @@ def get_customer_order_behavior():
     """
     return execute_custom_query(query)
 
-@st.cache_data(ttl=3600)
 def get_customer_lifetime_analysis():
     """Analyze customer lifetime metrics using new fields"""
     query = f"""
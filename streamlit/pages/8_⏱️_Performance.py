@@ -0,0 +1,187 @@
+"""
+Performance Page
+Per-query telemetry ranking the slowest and most expensive page queries
+"""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import sys
+import os
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from utils.database import (
+    export_query_telemetry, get_columnar_store_stats, get_download_stats, get_hedging_stats, get_job_control_stats,
+    get_memory_cache_stats, get_query_telemetry, get_result_cache_stats, get_session_slice_stats,
+    get_shared_cache_stats, get_single_flight_stats, query_telemetry
+)
+from utils.cache_warmer import get_cache_warmer
+from config.settings import CHART_DEFAULTS, COLOR_PALETTES, DEV_MODE
+
+st.set_page_config(
+    page_title="Performance - Olist Dashboard",
+    page_icon="⏱️",
+    layout="wide"
+)
+
+st.title("⏱️ Query Performance")
+st.markdown("---")
+
+# Hidden unless the dashboard runs in developer mode
+if not DEV_MODE:
+    st.info("💡 This page is only available in developer mode (set `OLIST_DEV_MODE=1`).")
+    st.stop()
+
+records = get_query_telemetry()
+if not records:
+    st.info("No queries recorded yet. Open some analytics pages first.")
+    st.stop()
+
+records_df = pd.DataFrame(records)
+summary_df = query_telemetry.summarize()
+
+# Overview metrics
+st.subheader("📊 Overview")
+col1, col2, col3, col4 = st.columns(4)
+
+executions = records_df[records_df["source"] == "backend"]
+with col1:
+    st.metric("Query Calls", f"{len(records_df):,}")
+with col2:
+    st.metric("Backend Executions", f"{len(executions):,}")
+with col3:
+    bytes_billed = executions["bytes_billed"].sum() if "bytes_billed" in executions else 0
+    st.metric("Bytes Billed", f"{(bytes_billed or 0) / (1024 ** 3):,.2f} GB")
+with col4:
+    memory_hit_rate = (records_df["source"] == "memory").mean() * 100
+    st.metric("Memory Cache Hit Rate", f"{memory_hit_rate:.1f}%")
+
+if "raw_memory_bytes" in records_df:
+    compacted = records_df.dropna(subset=["raw_memory_bytes"])
+    raw_mb = compacted["raw_memory_bytes"].sum() / (1024 ** 2)
+    compacted_mb = compacted["compacted_memory_bytes"].sum() / (1024 ** 2)
+    st.caption(
+        f"🗜️ Dtype compaction: {raw_mb:,.1f} MB → {compacted_mb:,.1f} MB "
+        f"across {len(compacted):,} backend results"
+    )
+
+st.markdown("---")
+
+# Worst offenders per page
+st.subheader("🐢 Worst Offenders by Page")
+
+pages = sorted(summary_df["page"].unique())
+selected_page = st.selectbox("Page", ["All pages"] + pages)
+page_df = summary_df if selected_page == "All pages" else summary_df[summary_df["page"] == selected_page]
+
+top_df = page_df.sort_values("total_wall_ms", ascending=False).head(15)
+fig = px.bar(top_df,
+             x="total_wall_ms",
+             y="function",
+             color="page",
+             orientation="h",
+             title="Total Wall Time by Query Function",
+             labels={"total_wall_ms": "Total Wall Time (ms)", "function": "Function"},
+             color_discrete_sequence=COLOR_PALETTES["primary"])
+fig.update_layout(height=CHART_DEFAULTS["height"], yaxis={"categoryorder": "total ascending"})
+st.plotly_chart(fig, use_container_width=True)
+
+st.dataframe(page_df, use_container_width=True)
+
+# Query plan flags: full partition scans and read amplification
+st.markdown("---")
+st.subheader("🔎 Query Plan Flags")
+
+if "plan_flags" in records_df:
+    flagged_df = records_df.dropna(subset=["plan_flags"])
+    flagged_df = flagged_df[flagged_df["plan_flags"].apply(bool)]
+else:
+    flagged_df = pd.DataFrame()
+
+if flagged_df.empty:
+    st.success("No executed query scanned all partitions or read far more than it returned.")
+else:
+    flag_columns = [c for c in ["page", "function", "bytes_processed", "partitions_processed", "rows_read", "rows"]
+                    if c in flagged_df]
+    flag_view = flagged_df[flag_columns].copy()
+    flag_view["flags"] = flagged_df["plan_flags"].apply(" · ".join)
+    st.dataframe(flag_view.drop_duplicates(subset=["page", "function", "flags"], keep="last"),
+                 use_container_width=True)
+
+# Cache and download diagnostics
+st.markdown("---")
+col1, col2 = st.columns(2)
+
+with col1:
+    st.subheader("🧠 Memory Cache")
+    st.json(get_memory_cache_stats())
+    
+    st.subheader("💾 Disk Cache")
+    cache_stats = get_result_cache_stats()
+    if cache_stats:
+        st.json(cache_stats)
+    else:
+        st.info("Disk cache is disabled.")
+    
+    st.subheader("🌐 Shared Cache")
+    shared_stats = get_shared_cache_stats()
+    if shared_stats:
+        st.json(shared_stats)
+    else:
+        st.info("Shared cache is disabled (set `OLIST_REDIS_URL`).")
+    
+    st.subheader("🔪 Filtered Slices")
+    st.json(get_session_slice_stats())
+    
+    st.subheader("🔀 Request Coalescing")
+    st.json(get_single_flight_stats())
+    
+    st.subheader("🛑 Timeouts & Cancellations")
+    st.json(get_job_control_stats())
+    
+    st.subheader("🏁 Hedged Execution")
+    st.json(get_hedging_stats())
+    
+    st.subheader("🔥 Cache Warm-up")
+    warmer = get_cache_warmer()
+    warm_report = warmer.last_report() if warmer is not None else None
+    if warm_report:
+        st.caption(
+            f"{warm_report['reason']} at {warm_report['started_at']}: "
+            f"{warm_report['warmed']} queries warmed in {warm_report['duration_s']}s, "
+            f"{warm_report['failed']} failed"
+        )
+        st.dataframe(pd.DataFrame(warm_report["results"]), use_container_width=True)
+    elif warmer is None:
+        st.info("The cache warmer is not running (disabled with OLIST_WARM_CACHE=0, or not started yet).")
+    else:
+        st.info("No warm-up has finished yet.")
+
+with col2:
+    st.subheader("⬇️ Downloads")
+    download_df = pd.DataFrame(get_download_stats())
+    if not download_df.empty:
+        st.dataframe(download_df, use_container_width=True)
+    else:
+        st.info("No downloads recorded yet.")
+    
+    st.subheader("🧮 Columnar Stores")
+    columnar_df = pd.DataFrame(get_columnar_store_stats())
+    if not columnar_df.empty:
+        st.dataframe(columnar_df, use_container_width=True)
+    else:
+        st.info("No columnar store loaded yet.")
+
+# Raw records and export
+st.markdown("---")
+st.subheader("🧾 Recent Queries")
+st.dataframe(records_df.drop(columns=["query", "plan_stages"], errors="ignore").tail(200),
+             use_container_width=True)
+
+st.download_button(
+    "📥 Export Telemetry (JSON)",
+    data=export_query_telemetry(),
+    file_name="query_telemetry.json",
+    mime="application/json"
+)
@@ -0,0 +1,232 @@
+"""
+Benchmark every dashboard page's data-access functions
+
+Runs each page's get_* query functions against the configured backend
+(normally the local DuckDB backend or a replayed cassette) with the result
+caches bypassed, records latency distributions, bytes processed and result
+memory per function, and compares them against a stored baseline.
+
+Usage:
+    cd streamlit
+    OLIST_QUERY_BACKEND=duckdb python scripts/benchmark.py
+    OLIST_CASSETTE_MODE=replay python scripts/benchmark.py --replay-latency none
+    python scripts/benchmark.py --save-baseline      # accept the current numbers
+
+The in-process columnar store is turned off so every function's queries reach
+the backend; pass --columnar-store to measure the local aggregations instead.
+
+Exits with status 1 when any function fails or regresses past the BENCHMARK_CONFIG thresholds.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import (
+    BENCHMARK_CONFIG, CACHE_WARMER_CONFIG, CASSETTE_CONFIG, COLUMNAR_STORE_CONFIG, DISK_CACHE_CONFIG,
+    QUERY_BACKEND, SHARED_CACHE_CONFIG
+)
+
+def positive_int(value: str) -> int:
+    """Parse a command-line count that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def benchmark_function(fn, repetitions: int) -> dict:
+    """
+    Run one query function repeatedly with cold result caches
+    
+    One untimed run first loads table versions and backend state, so the
+    timed runs measure only the function's own queries.
+    
+    Returns:
+        Dictionary with latency percentiles (ms), queries, rows, bytes_processed,
+        memory_bytes and error
+    """
+    from utils.database import query_memory_cache, query_telemetry
+    
+    latencies = []
+    result = {"error": None}
+    try:
+        fn()
+    except Exception as e:
+        return {"error": str(e)}
+    for _ in range(repetitions):
+        query_memory_cache.clear()
+        query_telemetry.clear()
+        start = time.perf_counter()
+        try:
+            df = fn()
+        except Exception as e:
+            result["error"] = str(e)
+            break
+        latencies.append((time.perf_counter() - start) * 1000)
+        
+        records = query_telemetry.records()
+        errors = [r["error"] for r in records if r.get("error")]
+        if errors:
+            result["error"] = errors[0]
+            break
+        result["queries"] = len(records)
+        result["rows"] = len(df) if df is not None else 0
+        result["bytes_processed"] = sum(r.get("bytes_processed") or 0 for r in records)
+        result["memory_bytes"] = sum(r.get("memory_bytes") or 0 for r in records)
+    
+    if latencies:
+        result.update({
+            "runs": len(latencies),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+            "mean_ms": round(statistics.fmean(latencies), 2),
+            "min_ms": round(min(latencies), 2),
+            "max_ms": round(max(latencies), 2)
+        })
+    return result
+
+def compare_to_baseline(results: dict, baseline: dict) -> list:
+    """
+    Find functions that regressed against the baseline
+    
+    Returns:
+        List of human-readable regression descriptions
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None or current.get("error") or previous.get("error"):
+            continue
+        
+        if "p50_ms" in current and "p50_ms" in previous:
+            delta = current["p50_ms"] - previous["p50_ms"]
+            if (delta > BENCHMARK_CONFIG["min_latency_delta_ms"]
+                    and current["p50_ms"] > previous["p50_ms"] * (1 + BENCHMARK_CONFIG["latency_regression"])):
+                regressions.append(f"{name}: p50 {previous['p50_ms']:.1f} ms -> {current['p50_ms']:.1f} ms")
+        
+        for metric, threshold in (("bytes_processed", BENCHMARK_CONFIG["bytes_regression"]),
+                                  ("memory_bytes", BENCHMARK_CONFIG["memory_regression"])):
+            before, after = previous.get(metric) or 0, current.get(metric) or 0
+            if before and after > before * (1 + threshold):
+                regressions.append(f"{name}: {metric} {before:,} -> {after:,}")
+    return regressions
+
+def format_table(results: dict, baseline: dict) -> str:
+    """Render results as a fixed-width table with the change in p50 against the baseline"""
+    header = f"{'function':<60} {'p50 ms':>9} {'p95 ms':>9} {'vs base':>8} {'MB proc':>9} {'mem KB':>9} {'rows':>7}"
+    lines = [header, "-" * len(header)]
+    for name, result in results.items():
+        if result.get("error"):
+            lines.append(f"{name:<60} ERROR: {result['error'][:80]}")
+            continue
+        if "p50_ms" not in result:
+            lines.append(f"{name:<60} no timed runs")
+            continue
+        previous = baseline.get(name, {})
+        change = ""
+        if previous.get("p50_ms"):
+            change = f"{(result['p50_ms'] / previous['p50_ms'] - 1) * 100:+.0f}%"
+        lines.append(
+            f"{name:<60} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {change:>8} "
+            f"{result['bytes_processed'] / (1024 ** 2):>9.1f} {result['memory_bytes'] / 1024:>9.1f} "
+            f"{result['rows']:>7,}"
+        )
+    return "\n".join(lines)
+
+def write_report(report: dict, path: str) -> None:
+    """Write a JSON report, creating its directory if needed"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard page query functions")
+    parser.add_argument("--repetitions", type=positive_int, default=BENCHMARK_CONFIG["repetitions"])
+    parser.add_argument("--pages", nargs="*", help="Only pages whose file name contains one of these")
+    parser.add_argument("--baseline", default=BENCHMARK_CONFIG["baseline_path"])
+    parser.add_argument("--output", default=BENCHMARK_CONFIG["output_path"],
+                        help="JSON report path")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--replay-latency", default=None,
+                        help='Replay latency: "recorded", seconds, or "none" (replay mode only)')
+    parser.add_argument("--columnar-store", action="store_true",
+                        help="Aggregate through the in-process columnar store instead of the backend")
+    args = parser.parse_args()
+    
+    # Measure cold executions: no persistent or shared result caches, and no
+    # columnar store answering queries locally unless asked for
+    DISK_CACHE_CONFIG["enabled"] = False
+    SHARED_CACHE_CONFIG["url"] = ""
+    COLUMNAR_STORE_CONFIG["enabled"] = args.columnar_store
+    if args.replay_latency == "none":
+        CASSETTE_CONFIG["latency"] = None
+    elif args.replay_latency == "recorded":
+        CASSETTE_CONFIG["latency"] = "recorded"
+    elif args.replay_latency is not None:
+        CASSETTE_CONFIG["latency"] = float(args.replay_latency)
+    
+    from utils.cache_warmer import discover_page_queries
+    
+    queries = discover_page_queries(CACHE_WARMER_CONFIG["pages_dir"], exclude=CACHE_WARMER_CONFIG["exclude"])
+    if args.pages:
+        queries = {page: fns for page, fns in queries.items() if any(p in page for p in args.pages)}
+    
+    results = {}
+    for page, functions in queries.items():
+        for name, fn in functions.items():
+            results[f"{page}.{name}"] = benchmark_function(fn, args.repetitions)
+    
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+        # Local aggregations and backend queries are not comparable
+        if stored.get("columnar_store", False) == args.columnar_store:
+            baseline = stored.get("results", {})
+        else:
+            print(f"Baseline {args.baseline} was recorded with columnar_store="
+                  f"{stored.get('columnar_store', False)}; not comparing\n")
+    
+    regressions = compare_to_baseline(results, baseline)
+    errors = [f"{name}: {result['error']}" for name, result in results.items() if result.get("error")]
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "backend": QUERY_BACKEND["type"],
+        "cassette_mode": CASSETTE_CONFIG["mode"],
+        "columnar_store": args.columnar_store,
+        "python": platform.python_version(),
+        "repetitions": args.repetitions,
+        "results": results,
+        "regressions": regressions,
+        "errors": errors
+    }
+    
+    print(format_table(results, baseline))
+    if errors:
+        print(f"\n{len(errors)} function(s) failed:")
+        for error in errors:
+            print(f"  - {error}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+    
+    write_report(report, args.output)
+    print(f"\nWrote JSON report to {args.output}")
+    if args.save_baseline:
+        write_report(report, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+    
+    sys.exit(1 if regressions or errors else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Export the analytics OBT tables to a memory-mapped Arrow IPC snapshot
+
+Every dashboard process on the host that uses the DuckDB backend maps the
+published snapshot instead of loading private copies of the tables, so the
+OS page cache holds one copy for all of them. Run it after each dbt run; the
+new snapshot is swapped in atomically and running processes pick it up on
+their next table version check.
+
+Usage:
+    cd streamlit
+    python scripts/export_arrow_snapshot.py                   # from BigQuery
+    python scripts/export_arrow_snapshot.py --source parquet  # from data/obt/*.parquet
+"""
+
+import argparse
+import os
+import sys
+
+import pyarrow.parquet as pq
+from google.cloud import bigquery
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import ANALYTICS_TABLES, BIGQUERY_CONFIG, QUERY_BACKEND, STREAMING_CONFIG
+from utils.arrow_snapshot import write_snapshot
+
+def bigquery_batches(client: bigquery.Client, table_name: str):
+    """Stream a BigQuery table as Arrow record batches"""
+    table_ref = f"{BIGQUERY_CONFIG['project_id']}.{BIGQUERY_CONFIG['dataset_id']}.{table_name}"
+    rows = client.list_rows(client.get_table(table_ref), page_size=STREAMING_CONFIG["chunk_rows"])
+    yield from rows.to_arrow_iterable()
+
+def parquet_batches(parquet_dir: str, table_name: str):
+    """Stream a local Parquet copy as Arrow record batches"""
+    path = os.path.join(parquet_dir, f"{table_name}.parquet")
+    yield from pq.ParquetFile(path).iter_batches(batch_size=STREAMING_CONFIG["chunk_rows"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Export analytics OBT tables to an Arrow IPC snapshot")
+    parser.add_argument("--source", choices=["bigquery", "parquet"], default="bigquery")
+    parser.add_argument("--parquet-dir", default=QUERY_BACKEND["duckdb_data_dir"],
+                        help="Parquet copies to read with --source parquet")
+    parser.add_argument("--output-dir", default=QUERY_BACKEND["arrow_snapshot_dir"])
+    parser.add_argument("--keep", type=int, default=QUERY_BACKEND["arrow_snapshots_kept"],
+                        help="Snapshots kept on disk for processes still reading older ones")
+    args = parser.parse_args()
+    
+    # A snapshot always holds every table, so readers never mix snapshots
+    table_names = list(ANALYTICS_TABLES.values())
+    if args.source == "bigquery":
+        client = bigquery.Client(
+            project=BIGQUERY_CONFIG["project_id"],
+            location=BIGQUERY_CONFIG["location"]
+        )
+        tables = {name: bigquery_batches(client, name) for name in table_names}
+    else:
+        tables = {name: parquet_batches(args.parquet_dir, name) for name in table_names}
+    
+    snapshot_id = write_snapshot(args.output_dir, tables, keep=args.keep)
+    manifest_path = os.path.join(args.output_dir, snapshot_id, "manifest.json")
+    print(f"Published Arrow snapshot {snapshot_id} ({manifest_path})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Export the analytics OBT tables to local Parquet files
+
+The files are read by the DuckDB query backend (QUERY_BACKEND["type"] = "duckdb"),
+which lets the dashboard run and be benchmarked without a live BigQuery connection.
+
+Usage:
+    cd streamlit
+    python scripts/export_obt_parquet.py [--output-dir DIR] [--tables revenue orders ...]
+"""
+
+import argparse
+import os
+import sys
+
+import pyarrow.parquet as pq
+from google.cloud import bigquery
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import ANALYTICS_TABLES, BIGQUERY_CONFIG, QUERY_BACKEND
+
+def export_table(client: bigquery.Client, table_name: str, output_dir: str) -> int:
+    """
+    Export one table to <output_dir>/<table_name>.parquet
+    
+    The file is written under a temporary name and renamed into place, so a
+    running DuckDB backend never reads a partial file.
+    
+    Returns:
+        Number of rows exported
+    """
+    table_ref = f"{BIGQUERY_CONFIG['project_id']}.{BIGQUERY_CONFIG['dataset_id']}.{table_name}"
+    arrow_table = client.list_rows(client.get_table(table_ref)).to_arrow()
+    
+    path = os.path.join(output_dir, f"{table_name}.parquet")
+    tmp_path = f"{path}.tmp"
+    pq.write_table(arrow_table, tmp_path)
+    os.replace(tmp_path, path)
+    return arrow_table.num_rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Export analytics OBT tables to Parquet")
+    parser.add_argument("--output-dir", default=QUERY_BACKEND["duckdb_data_dir"])
+    parser.add_argument("--tables", nargs="*", choices=sorted(ANALYTICS_TABLES),
+                        help="Table keys from ANALYTICS_TABLES (default: all)")
+    args = parser.parse_args()
+    
+    os.makedirs(args.output_dir, exist_ok=True)
+    client = bigquery.Client(
+        project=BIGQUERY_CONFIG["project_id"],
+        location=BIGQUERY_CONFIG["location"]
+    )
+    
+    for key in args.tables or ANALYTICS_TABLES:
+        table_name = ANALYTICS_TABLES[key]
+        num_rows = export_table(client, table_name, args.output_dir)
+        print(f"Exported {table_name}: {num_rows:,} rows")
+
+if __name__ == "__main__":
+    main()
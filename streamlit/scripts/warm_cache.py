@@ -0,0 +1,37 @@
+"""
+Warm the dashboard's query caches from the command line
+
+Runs every page's get_* query functions once so the persistent disk cache
+(and the shared cache, when OLIST_REDIS_URL is set) hold fresh results. Run it
+after a deploy or at the end of a dbt job.
+
+Usage:
+    cd streamlit
+    python scripts/warm_cache.py [--max-workers N]
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import CACHE_WARMER_CONFIG
+from utils.cache_warmer import discover_page_queries, warm_caches
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-execute every dashboard page query")
+    parser.add_argument("--max-workers", type=int, default=None)
+    args = parser.parse_args()
+    
+    queries = discover_page_queries(CACHE_WARMER_CONFIG["pages_dir"], exclude=CACHE_WARMER_CONFIG["exclude"])
+    report = warm_caches(queries, max_workers=args.max_workers)
+    
+    for result in report["results"]:
+        status = f"error: {result['error']}" if "error" in result else f"{result['rows']:,} rows"
+        print(f"{result['page']}.{result['function']}: {result['wall_ms']:.0f} ms ({status})")
+    print(f"Warmed {report['warmed']} queries in {report['duration_s']}s ({report['failed']} failed)")
+    sys.exit(1 if report["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
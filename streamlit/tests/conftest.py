@@ -0,0 +1,33 @@
+"""
+Shared fixtures for the dashboard tests
+
+Run from the streamlit/ directory:
+
+    python -m pytest tests
+"""
+
+import pytest
+
+from tests.fakes import FakeClient
+from utils.backends import BigQueryBackend
+
+@pytest.fixture
+def database(monkeypatch):
+    """
+    utils.database wired to a FakeClient-backed BigQueryBackend
+    
+    Disk and shared caches are off and every query has the same table
+    version; set `database.fake_client` to swap the client.
+    """
+    from utils import database
+    
+    client = FakeClient()
+    monkeypatch.setattr(database, "get_query_backend", lambda: BigQueryBackend(database.fake_client), raising=True)
+    monkeypatch.setattr(database, "fake_client", client, raising=False)
+    monkeypatch.setattr(database, "get_result_cache", lambda: None)
+    monkeypatch.setattr(database, "get_shared_cache", lambda: None)
+    monkeypatch.setattr(database, "get_query_version", lambda query: "v1")
+    database.query_memory_cache.clear()
+    database._estimate_query_bytes.clear()
+    yield database
+    database.query_memory_cache.clear()
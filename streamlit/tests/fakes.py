@@ -0,0 +1,149 @@
+"""
+In-process stand-ins for the BigQuery and Redis clients used by the tests
+
+FakeClient answers every query with one canned result; its jobs take a
+controllable time to finish, can fail, and honour cancellation, so
+timeouts, hedging and coalescing can be tested without a GCP project.
+FakeRedis keeps the shared result cache's keys in a dict.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+
+class FakeJob:
+    """QueryJob stand-in that finishes after `duration` seconds unless cancelled"""
+    
+    def __init__(self, query: str, job_config, table: pa.Table, duration: float,
+                 error: Optional[Exception] = None, bytes_processed: Optional[int] = None):
+        self.query = query
+        self.job_config = job_config
+        self.job_id = f"fake_{uuid.uuid4().hex[:12]}"
+        self.total_bytes_processed = bytes_processed
+        self.total_bytes_billed = bytes_processed
+        self.slot_millis = 0
+        self.cache_hit = False
+        self.query_plan = []
+        self.cancelled = False
+        self._table = table
+        self._error = error
+        self._ready_at = time.monotonic() + duration
+    
+    def done(self, *args, **kwargs) -> bool:
+        return self.cancelled or time.monotonic() >= self._ready_at
+    
+    def cancel(self, *args, **kwargs) -> bool:
+        self.cancelled = True
+        return True
+    
+    def result(self, timeout: Optional[float] = None, page_size: Optional[int] = None, **kwargs):
+        while not self.done():
+            remaining = self._ready_at - time.monotonic()
+            if timeout is not None and remaining > timeout:
+                time.sleep(timeout)
+                if not self.done():
+                    raise FutureTimeoutError()
+            else:
+                time.sleep(min(max(remaining, 0), 0.01))
+        if self.cancelled:
+            raise RuntimeError(f"Job {self.job_id} was cancelled")
+        if self._error is not None:
+            raise self._error
+        return FakeRowIterator(self._table, page_size)
+    
+    def to_arrow(self, **kwargs) -> pa.Table:
+        return self.result().to_arrow()
+    
+    def to_dataframe(self, **kwargs) -> pd.DataFrame:
+        return self.result().to_dataframe()
+
+class FakeRowIterator:
+    """Finished job rows, readable as Arrow batches of at most page_size rows"""
+    
+    def __init__(self, table: pa.Table, page_size: Optional[int]):
+        self._table = table
+        self._page_size = page_size
+    
+    def to_arrow_iterable(self, bqstorage_client=None, max_queue_size=None, **kwargs):
+        return iter(self._table.to_batches(max_chunksize=self._page_size))
+    
+    def to_arrow(self, **kwargs) -> pa.Table:
+        return self._table
+    
+    def to_dataframe(self, **kwargs) -> pd.DataFrame:
+        return self._table.to_pandas()
+
+class FakeClient:
+    """
+    bigquery.Client stand-in returning one canned result for every query
+    
+    Args:
+        result: Rows every job returns
+        duration: Seconds a job runs, or a function of the 0-based job number
+        errors: Number of leading jobs that fail
+        bytes_processed: Bytes reported by dry runs and finished jobs
+    """
+    
+    def __init__(self, result: Union[pd.DataFrame, pa.Table, None] = None,
+                 duration: Union[float, Callable[[int], float]] = 0.0,
+                 errors: int = 0, bytes_processed: Optional[int] = 1024):
+        if result is None:
+            result = pd.DataFrame({"value": [1, 2, 3]})
+        self.result = result if isinstance(result, pa.Table) else pa.Table.from_pandas(result, preserve_index=False)
+        self.duration = duration
+        self.errors = errors
+        self.bytes_processed = bytes_processed
+        self.jobs = []
+        self.dry_runs = []
+        self._lock = threading.Lock()
+    
+    @property
+    def executions(self) -> int:
+        return len(self.jobs)
+    
+    def query(self, query: str, job_config=None, **kwargs) -> FakeJob:
+        if getattr(job_config, "dry_run", False):
+            with self._lock:
+                self.dry_runs.append(query)
+            return FakeJob(query, job_config, self.result, 0.0, bytes_processed=self.bytes_processed)
+        
+        with self._lock:
+            number = len(self.jobs)
+            duration = self.duration(number) if callable(self.duration) else self.duration
+            error = RuntimeError("backend unavailable") if number < self.errors else None
+            job = FakeJob(query, job_config, self.result, duration, error, self.bytes_processed)
+            self.jobs.append(job)
+        return job
+
+class FakeRedis:
+    """The subset of redis.Redis used by RedisResultCache (TTLs are ignored)"""
+    
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+    
+    def get(self, key):
+        return self.values.get(key)
+    
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+    
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+    
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+    
+    def expire(self, key, seconds):
+        pass
+    
+    def delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            deleted += int(self.values.pop(key, None) is not None or self.sets.pop(key, None) is not None)
+        return deleted
@@ -0,0 +1,26 @@
+"""
+Query backend interface: subclasses must implement every abstract method
+"""
+
+import pytest
+
+from tests.fakes import FakeClient
+from utils.backends import BigQueryBackend, DuckDBBackend, QueryBackend
+
+class PartialBackend(QueryBackend):
+    """Backend that forgot to implement streaming and metadata"""
+    
+    def run_query_with_stats(self, query, params=None, label="query", use_storage_api=False,
+                             control=None, hedge_after=None):
+        return None, {}
+
+def test_incomplete_backend_cannot_be_instantiated():
+    with pytest.raises(TypeError, match="iter_query_batches"):
+        PartialBackend()
+    with pytest.raises(TypeError):
+        QueryBackend()
+
+def test_shipped_backends_implement_the_interface():
+    assert isinstance(BigQueryBackend(FakeClient()), QueryBackend)
+    assert not BigQueryBackend.__abstractmethods__
+    assert not DuckDBBackend.__abstractmethods__
@@ -0,0 +1,159 @@
+"""
+Local aggregations of the columnar store, checked against pandas and the SQL path
+"""
+
+import glob
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.columnar_store import ColumnarStore
+from utils.query_builder import DateRange, InList
+
+ROWS = 5000
+
+@pytest.fixture(scope="module")
+def revenue_df() -> pd.DataFrame:
+    """Revenue-like rows with nulls in every column, dates on both sides of the epoch and float scores"""
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        "order_id": rng.integers(0, 1500, ROWS).astype(str),
+        "customer_id": rng.integers(0, 900, ROWS).astype(str),
+        "customer_unique_id": rng.integers(0, 800, ROWS).astype(str),
+        "item_price": np.round(rng.uniform(-50, 500, ROWS), 2),
+        "score": rng.choice([-1.5, 0.25, 0.5, 0.5001, 0.9, 3.0], ROWS),
+        "order_date": pd.Timestamp("1969-11-01") + pd.to_timedelta(rng.integers(0, 900, ROWS), unit="D"),
+        "customer_state": rng.choice(["SP", "RJ", "MG", "BA", "RS"], ROWS),
+        "seller_state": rng.choice(["SP", "PR", "SC"], ROWS),
+        "product_category_english": rng.choice(["toys", "garden_tools", "bed_bath_table", "health_beauty"], ROWS)
+    })
+    for column, every in [("item_price", 97), ("score", 89), ("order_date", 83), ("customer_state", 79),
+                          ("customer_unique_id", 71)]:
+        df.loc[df.index % every == 0, column] = None
+    return df
+
+@pytest.fixture(scope="module")
+def store(revenue_df) -> ColumnarStore:
+    return ColumnarStore(revenue_df, "v1")
+
+def _expected(df: pd.DataFrame, by, aggregations: dict) -> pd.DataFrame:
+    """pandas groupby reference, dropping null keys like the store does"""
+    expected = df.dropna(subset=by).groupby(by, observed=True).agg(**aggregations).reset_index()
+    return expected.sort_values(by).reset_index(drop=True)
+
+def _sorted(df: pd.DataFrame, by) -> pd.DataFrame:
+    return df.sort_values(by).reset_index(drop=True)
+
+def test_encodings(store):
+    kinds = {name: column.kind for name, column in store.columns.items()}
+    assert kinds["item_price"] == "cents"
+    assert kinds["score"] == "number"
+    assert kinds["order_date"] == "date"
+    assert kinds["customer_state"] == "category"
+
+@pytest.mark.parametrize("column", ["score", "item_price", "order_date", "customer_unique_id"])
+def test_nunique_matches_pandas(store, revenue_df, column):
+    result = store.aggregate({"distinct": ("nunique", column)}, by=["seller_state"])
+    expected = _expected(revenue_df, ["seller_state"], {"distinct": (column, "nunique")})
+    
+    pd.testing.assert_frame_equal(_sorted(result, ["seller_state"]), expected, check_dtype=False)
+
+def test_nunique_of_close_and_negative_floats():
+    store = ColumnarStore(pd.DataFrame({"value": [0.5, 0.25, 0.5001, -0.9, 0.5]}), "v1")
+    
+    assert store.aggregate({"distinct": ("nunique", "value")})["distinct"].iloc[0] == 4
+
+def test_multi_key_grouping_matches_pandas(store, revenue_df):
+    by = ["customer_state", "seller_state", "product_category_english"]
+    result = store.aggregate({
+        "rows": ("count", None),
+        "revenue": ("sum", "item_price"),
+        "avg_price": ("mean", "item_price"),
+        "orders": ("nunique", "order_id")
+    }, by=by)
+    expected = _expected(revenue_df, by, {
+        "rows": ("order_id", "size"),
+        "revenue": ("item_price", "sum"),
+        "avg_price": ("item_price", "mean"),
+        "orders": ("order_id", "nunique")
+    })
+    
+    pd.testing.assert_frame_equal(_sorted(result, by), expected, check_dtype=False)
+
+@pytest.mark.parametrize("grain, frequency", [("month", "MS"), ("year", "YS")])
+def test_date_grains_match_pandas(store, revenue_df, grain, frequency):
+    result = store.aggregate({"revenue": ("sum", "item_price")}, by=[("order_date", grain)])
+    dated = revenue_df.dropna(subset=["order_date"])
+    expected = (
+        dated.groupby(dated["order_date"].dt.to_period(frequency[0]).dt.start_time)["item_price"].sum()
+        .rename("revenue").reset_index()
+    )
+    
+    pd.testing.assert_frame_equal(_sorted(result, ["order_date"]), expected, check_dtype=False)
+
+def test_min_max_of_dates_and_cents(store, revenue_df):
+    result = store.aggregate({
+        "first": ("min", "order_date"), "last": ("max", "order_date"),
+        "low": ("min", "item_price"), "high": ("max", "item_price")
+    }, by=["customer_state"])
+    expected = _expected(revenue_df, ["customer_state"], {
+        "first": ("order_date", "min"), "last": ("order_date", "max"),
+        "low": ("item_price", "min"), "high": ("item_price", "max")
+    })
+    
+    pd.testing.assert_frame_equal(_sorted(result, ["customer_state"]), expected, check_dtype=False)
+
+def test_filters_match_pandas(store, revenue_df):
+    filters = [
+        DateRange("order_date", date(1970, 1, 1), date(1971, 6, 30)),
+        InList("customer_state", ["SP", "RJ"])
+    ]
+    result = store.aggregate({"revenue": ("sum", "item_price"), "rows": ("count", None)}, filters=filters)
+    mask = (
+        revenue_df["order_date"].between(pd.Timestamp("1970-01-01"), pd.Timestamp("1971-06-30"))
+        & revenue_df["customer_state"].isin(["SP", "RJ"])
+    )
+    
+    assert result["rows"].iloc[0] == mask.sum()
+    assert result["revenue"].iloc[0] == pytest.approx(revenue_df.loc[mask, "item_price"].sum())
+
+def test_revenue_page_matches_sql(database, monkeypatch, tmp_path, revenue_df):
+    """The Revenue page's local aggregates equal its SQL fallback run on DuckDB"""
+    from config.settings import ANALYTICS_TABLES, APP_DIR
+    from utils.backends import DuckDBBackend
+    from utils.cache_warmer import load_page_functions
+    
+    table = ANALYTICS_TABLES["revenue"]
+    rows = revenue_df.drop(columns=["score"]).dropna(subset=["order_date"])
+    rows.assign(order_date=rows["order_date"].dt.date).to_parquet(tmp_path / f"{table}.parquet", index=False)
+    backend = DuckDBBackend(str(tmp_path), [table])
+    monkeypatch.setattr(database, "get_query_backend", lambda: backend)
+    monkeypatch.setattr(database, "get_table_metadata", lambda project_id, dataset_id: {})
+    database.columnar_stores.clear()
+    
+    page = load_page_functions(glob.glob(os.path.join(APP_DIR, "pages", "1_*Revenue*.py"))[0])
+    filters = [DateRange("order_date", date(1970, 1, 1), None), InList("seller_state", ["SP", "PR"])]
+    for name, key in [("get_revenue_overview_metrics", None), ("get_monthly_revenue_trend", "month_date"),
+                      ("get_top_products", "product_category_english"), ("get_state_performance", "customer_state")]:
+        for page_filters in (None, filters):
+            monkeypatch.setitem(database.COLUMNAR_STORE_CONFIG, "enabled", True)
+            local_df = page[name](page_filters)
+            assert database.get_query_telemetry()[-1]["source"] == "columnar"
+            monkeypatch.setitem(database.COLUMNAR_STORE_CONFIG, "enabled", False)
+            sql_df = page[name](page_filters)
+            assert database.get_query_telemetry()[-1]["backend"] == "duckdb"
+            
+            assert not local_df.empty
+            if key is not None:
+                local_df, sql_df = _sorted(local_df, [key]), _sorted(sql_df, [key])
+            if key == "month_date":
+                sql_df["month_date"] = pd.to_datetime(sql_df["month_date"])
+            pd.testing.assert_frame_equal(
+                local_df.astype({c: "object" for c in local_df.select_dtypes("category")}),
+                sql_df.astype({c: "object" for c in sql_df.select_dtypes("category")}),
+                check_dtype=False, check_exact=False, rtol=1e-9
+            )
+    database.columnar_stores.clear()
@@ -0,0 +1,55 @@
+"""
+Dry-run cost estimation and the per-query byte budget
+"""
+
+from tests.fakes import FakeClient
+from utils.sql import normalize_sql
+
+QUERY = """
+    SELECT
+        payment_type,  -- Payment method breakdown
+        COUNT(*) AS payments
+    FROM `project.dataset.payment_analytics_obt`
+    GROUP BY payment_type
+"""
+
+def test_normalize_sql_removes_comments_outside_literals():
+    query = "SELECT a, -- don't\n  b /* block\n comment */ FROM t WHERE c = '-- kept'"
+    assert normalize_sql(query) == "SELECT a, b FROM t WHERE c = '-- kept'"
+
+def test_dry_run_uses_the_executed_text_and_is_cached_per_normalized_sql(database):
+    database.fake_client = FakeClient(bytes_processed=2048)
+    reformatted = "  " + QUERY.replace("\n", "\n\n")
+    
+    assert database.estimate_query_bytes(QUERY) == 2048
+    assert database.estimate_query_bytes(reformatted) == 2048
+    
+    assert database.fake_client.dry_runs == [QUERY]
+
+def test_over_budget_query_is_refused(database, monkeypatch):
+    database.fake_client = FakeClient(bytes_processed=10 * 1024 ** 3)
+    monkeypatch.setitem(database.COST_GUARD_CONFIG, "max_bytes_per_query", 1024 ** 3)
+    monkeypatch.setitem(database.COST_GUARD_CONFIG, "over_budget_action", "refuse")
+    
+    assert database.execute_custom_query(QUERY, dry_run=True).empty
+    assert database.fake_client.executions == 0
+
+def test_over_budget_query_is_downgraded_to_a_sample(database, monkeypatch):
+    database.fake_client = FakeClient(bytes_processed=10 * 1024 ** 3)
+    monkeypatch.setitem(database.COST_GUARD_CONFIG, "max_bytes_per_query", 1024 ** 3)
+    monkeypatch.setitem(database.COST_GUARD_CONFIG, "over_budget_action", "sample")
+    
+    df = database.execute_custom_query(QUERY, dry_run=True)
+    
+    assert len(df) == 3
+    [job] = database.fake_client.jobs
+    assert "TABLESAMPLE SYSTEM" in job.query
+
+def test_query_within_budget_runs_unchanged(database, monkeypatch):
+    database.fake_client = FakeClient(bytes_processed=1024)
+    monkeypatch.setitem(database.COST_GUARD_CONFIG, "max_bytes_per_query", 1024 ** 3)
+    
+    database.execute_custom_query(QUERY, dry_run=True)
+    
+    [job] = database.fake_client.jobs
+    assert job.query == QUERY
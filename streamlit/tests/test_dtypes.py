@@ -0,0 +1,60 @@
+"""
+Dtype compaction of numpy, nullable and Arrow-backed query results
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from utils.dtypes import compact_dataframe
+from utils.memory_cache import dataframe_memory_bytes
+
+ROWS = 1000
+
+@pytest.mark.parametrize("dtype, expected", [
+    ("int64", np.dtype("int32")),
+    ("Int64", pd.Int32Dtype()),
+    (pd.ArrowDtype(pa.int64()), pd.ArrowDtype(pa.int32()))
+])
+def test_integers_are_downcast_within_their_family(dtype, expected):
+    df = pd.DataFrame({"orders": pd.Series(np.arange(ROWS), dtype=dtype)})
+    
+    compacted, before, after = compact_dataframe(df, min_int_bits=32)
+    
+    assert compacted["orders"].dtype == expected
+    assert compacted["orders"].tolist() == df["orders"].tolist()
+    assert before == dataframe_memory_bytes(df)
+    assert after == dataframe_memory_bytes(compacted) < before
+
+@pytest.mark.parametrize("dtype", ["Int64", pd.ArrowDtype(pa.int64())])
+def test_nulls_survive_the_downcast(dtype):
+    df = pd.DataFrame({"items": pd.Series([1, None, 3], dtype=dtype)})
+    
+    compacted, _, _ = compact_dataframe(df, min_int_bits=16)
+    
+    assert compacted["items"].dtype.itemsize == 2
+    assert compacted["items"].isna().tolist() == [False, True, False]
+
+@pytest.mark.parametrize("dtype", ["int64", "Int64", pd.ArrowDtype(pa.int64())])
+def test_values_outside_the_narrow_range_are_kept(dtype):
+    df = pd.DataFrame({"bytes": pd.Series([0, 2 ** 40], dtype=dtype)})
+    
+    compacted, before, after = compact_dataframe(df)
+    
+    assert compacted["bytes"].dtype == df["bytes"].dtype
+    assert before == after
+
+def test_min_int_bits_is_respected():
+    df = pd.DataFrame({"flag": pd.Series([0, 1] * ROWS, dtype="Int64")})
+    
+    assert compact_dataframe(df, min_int_bits=32)[0]["flag"].dtype == pd.Int32Dtype()
+    assert compact_dataframe(df, min_int_bits=8)[0]["flag"].dtype == pd.Int8Dtype()
+
+def test_low_cardinality_strings_become_categories():
+    df = pd.DataFrame({"state": ["SP", "RJ", "MG", "SP"] * ROWS})
+    
+    compacted, before, after = compact_dataframe(df)
+    
+    assert isinstance(compacted["state"].dtype, pd.CategoricalDtype)
+    assert after < before
@@ -0,0 +1,45 @@
+"""
+Hedged execution: a duplicate job races a slow primary and the loser is cancelled
+"""
+
+from tests.fakes import FakeClient
+from utils.hedging import LatencyHistory
+from utils.sql import normalize_sql
+
+QUERY = "SELECT value FROM `project.dataset.revenue_analytics_obt`"
+
+def _history(database, monkeypatch, seconds: float = 0.1) -> LatencyHistory:
+    """Latency history that hedges QUERY after `seconds`"""
+    history = LatencyHistory(history_size=10, percentile=95, min_samples=1, min_delay=seconds)
+    history.record(normalize_sql(QUERY), seconds)
+    monkeypatch.setattr(database, "query_latency_history", history)
+    return history
+
+def test_slow_primary_is_hedged_and_cancelled(database, monkeypatch):
+    history = _history(database, monkeypatch)
+    database.fake_client = FakeClient(duration=lambda number: 10 if number == 0 else 0.05)
+    
+    df = database.execute_custom_query(QUERY, dry_run=False, timeout=5, hedge=True)
+    
+    assert len(df) == 3
+    primary, duplicate = database.fake_client.jobs
+    assert primary.cancelled and not duplicate.cancelled
+    assert history.stats()["hedged"] == 1
+    assert history.stats()["hedge_wins"] == 1
+    assert database.get_query_telemetry()[-1]["hedge_won"] is True
+
+def test_fast_primary_is_not_hedged(database, monkeypatch):
+    history = _history(database, monkeypatch, seconds=2)
+    database.fake_client = FakeClient(duration=0.05)
+    
+    assert len(database.execute_custom_query(QUERY, dry_run=False, timeout=5, hedge=True)) == 3
+    assert database.fake_client.executions == 1
+    assert history.stats()["hedged"] == 0
+
+def test_no_hedge_without_latency_history(database, monkeypatch):
+    history = LatencyHistory(history_size=10, percentile=95, min_samples=5, min_delay=0.1)
+    monkeypatch.setattr(database, "query_latency_history", history)
+    database.fake_client = FakeClient(duration=0.5)
+    
+    assert len(database.execute_custom_query(QUERY, dry_run=False, timeout=5, hedge=True)) == 3
+    assert database.fake_client.executions == 1
@@ -0,0 +1,89 @@
+"""
+Per-query deadlines and cancellation of abandoned runs
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tests.fakes import FakeClient
+from utils.job_control import JobControl, QueryCancelledError, QueryTimeoutError, SessionJobRegistry
+
+QUERY = "SELECT value FROM `project.dataset.revenue_analytics_obt`"
+
+def _script_run(session_id: str = "session-1", request: str = "NONE") -> SimpleNamespace:
+    """ScriptRunContext stand-in whose pending request is `request` (e.g. "RERUN")"""
+    state = SimpleNamespace(name=request)
+    return SimpleNamespace(session_id=session_id, script_requests=SimpleNamespace(_state=state))
+
+def test_slow_job_is_cancelled_at_its_deadline():
+    registry = SessionJobRegistry()
+    job = FakeClient(duration=10).query(QUERY)
+    control = JobControl(registry, "session-1", timeout=0.2, should_cancel=lambda: False, poll_interval=0.05)
+    
+    started = time.monotonic()
+    with pytest.raises(QueryTimeoutError):
+        control.wait(job)
+    
+    assert time.monotonic() - started < 1
+    assert job.cancelled
+    assert registry.stats() == {"running": 0, "sessions": 0, "cancelled": 0, "timed_out": 1}
+
+def test_job_is_cancelled_once_its_run_is_abandoned():
+    registry = SessionJobRegistry()
+    job = FakeClient(duration=10).query(QUERY)
+    abandon_at = time.monotonic() + 0.2
+    control = JobControl(registry, "session-1", timeout=None,
+                         should_cancel=lambda: time.monotonic() >= abandon_at, poll_interval=0.05)
+    
+    with pytest.raises(QueryCancelledError):
+        control.wait(job)
+    
+    assert job.cancelled
+    assert registry.stats()["cancelled"] == 1
+
+def test_fast_job_finishes_untouched():
+    registry = SessionJobRegistry()
+    job = FakeClient(duration=0.1).query(QUERY)
+    control = JobControl(registry, "session-1", timeout=5, should_cancel=lambda: False, poll_interval=0.05)
+    
+    control.wait(job)
+    
+    assert not job.cancelled
+    assert registry.stats()["running"] == 0
+
+def test_timeout_shows_an_empty_result_and_is_not_cached(database):
+    database.fake_client = FakeClient(duration=lambda number: 10 if number == 0 else 0)
+    
+    assert database.execute_custom_query(QUERY, dry_run=False, timeout=0.2).empty
+    assert database.fake_client.jobs[0].cancelled
+    assert database.get_query_telemetry()[-1]["source"] == "timeout"
+    
+    assert len(database.execute_custom_query(QUERY, dry_run=False, timeout=5)) == 3
+
+def test_rerun_cancels_the_running_job(database, monkeypatch):
+    database.fake_client = FakeClient(duration=10)
+    ctx = _script_run()
+    monkeypatch.setattr(database, "get_script_run_ctx", lambda suppress_warning=False: ctx)
+    monkeypatch.setitem(database.QUERY_TIMEOUT_CONFIG, "poll_interval_seconds", 0.05)
+    
+    # The widget interaction arrives while the query is running
+    ctx.script_requests._state.name = "RERUN"
+    assert database.execute_custom_query(QUERY, dry_run=False, timeout=None).empty
+    
+    assert database.fake_client.jobs[0].cancelled
+    assert database.get_query_telemetry()[-1]["source"] == "cancelled"
+
+def test_ended_session_cancels_the_running_job(database, monkeypatch):
+    database.fake_client = FakeClient(duration=10)
+    ctx = _script_run()
+    monkeypatch.setattr(database, "get_script_run_ctx", lambda suppress_warning=False: ctx)
+    monkeypatch.setattr(database, "_session_is_active", lambda session_id: False)
+    monkeypatch.setitem(database.QUERY_TIMEOUT_CONFIG, "poll_interval_seconds", 0.05)
+    
+    started = time.monotonic()
+    assert database.execute_custom_query(QUERY, dry_run=False, timeout=None).empty
+    
+    assert time.monotonic() - started < 2
+    assert database.fake_client.jobs[0].cancelled
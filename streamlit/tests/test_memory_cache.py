@@ -0,0 +1,37 @@
+"""
+In-memory result cache: sizes are measured once, when a result is cached
+"""
+
+import pandas as pd
+
+from utils.memory_cache import MemoryResultCache, dataframe_memory_bytes
+
+QUERY = "SELECT value FROM `project.dataset.revenue_analytics_obt`"
+
+def test_entry_bytes_is_the_size_measured_on_put():
+    cache = MemoryResultCache(max_size_mb=1)
+    df = pd.DataFrame({"state": ["SP", "RJ", "MG"], "revenue": [1.5, 2.0, 3.0]})
+    cache.put("key", df)
+    
+    assert cache.entry_bytes("key") == dataframe_memory_bytes(df)
+    assert cache.entry_bytes("missing") is None
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 0
+
+def test_memory_cache_hits_reuse_the_cached_size(database, monkeypatch):
+    measured = []
+    
+    def counting_memory_bytes(df):
+        measured.append(len(df))
+        return dataframe_memory_bytes(df)
+    monkeypatch.setattr(database, "dataframe_memory_bytes", counting_memory_bytes)
+    
+    first = database.execute_custom_query(QUERY, dry_run=False)
+    measured.clear()
+    for _ in range(3):
+        database.execute_custom_query(QUERY, dry_run=False)
+    
+    records = database.get_query_telemetry()[-4:]
+    assert [record["source"] for record in records] == ["backend", "memory", "memory", "memory"]
+    assert {record["memory_bytes"] for record in records} == {dataframe_memory_bytes(first)}
+    assert all("cached_memory_bytes" not in record for record in records)
+    assert measured == []
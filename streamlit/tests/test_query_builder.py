@@ -0,0 +1,33 @@
+"""
+Parameterized SELECT and WHERE compilation
+"""
+
+from datetime import date
+
+import pytest
+
+from utils.query_builder import DateRange, Equals, InList, build_select_query, build_where_clause
+
+def test_predicates_are_bound_partition_column_first():
+    where_clause, params = build_where_clause(
+        "revenue_analytics_obt",
+        [InList("seller_state", ["SP"]), DateRange("order_date", date(2018, 1, 1), date(2018, 3, 31))],
+        conditions=["order_date IS NOT NULL"]
+    )
+    
+    assert where_clause.split() == [
+        "WHERE", "order_date", ">=", "@order_date_start", "AND", "order_date", "<=", "@order_date_end",
+        "AND", "seller_state", "IN", "UNNEST(@seller_state)", "AND", "order_date", "IS", "NOT", "NULL"
+    ]
+    assert params == {
+        "order_date_start": date(2018, 1, 1), "order_date_end": date(2018, 3, 31), "seller_state": ["SP"]
+    }
+
+def test_no_filters_compile_to_no_where_clause():
+    assert build_where_clause("revenue_analytics_obt", []) == ("", {})
+
+def test_invalid_identifiers_are_rejected():
+    with pytest.raises(ValueError):
+        build_select_query("`p.d.t`", "t", columns=["order_id; DROP TABLE t"])
+    with pytest.raises(ValueError):
+        build_where_clause("t", [Equals("1=1 OR x", 1)])
@@ -0,0 +1,28 @@
+"""
+Failed query loads must never be cached
+"""
+
+from tests.fakes import FakeClient
+
+QUERY = "SELECT value FROM `project.dataset.revenue_analytics_obt`"
+
+def test_backend_error_is_not_cached(database):
+    database.fake_client = FakeClient(errors=1)
+    
+    first = database.execute_custom_query(QUERY, dry_run=False)
+    second = database.execute_custom_query(QUERY, dry_run=False)
+    
+    assert first.empty
+    assert second["value"].tolist() == [1, 2, 3]
+    assert database.fake_client.executions == 2
+
+def test_cost_guard_refusal_is_not_cached(database, monkeypatch):
+    database.fake_client = FakeClient(bytes_processed=10 * 1024 ** 3)
+    monkeypatch.setitem(database.COST_GUARD_CONFIG, "max_bytes_per_query", 1024)
+    monkeypatch.setitem(database.COST_GUARD_CONFIG, "over_budget_action", "refuse")
+    
+    assert database.execute_custom_query(QUERY, dry_run=True).empty
+    assert database.fake_client.executions == 0
+    
+    monkeypatch.setitem(database.COST_GUARD_CONFIG, "max_bytes_per_query", 100 * 1024 ** 3)
+    assert len(database.execute_custom_query(QUERY, dry_run=True)) == 3
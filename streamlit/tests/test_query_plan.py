@@ -0,0 +1,47 @@
+"""
+Plan inspection: partition-filter detection and flags on cached renders
+"""
+
+import pytest
+
+from utils.query_plan import find_plan_issues
+
+REVENUE = "`project.dataset.revenue_analytics_obt`"
+ORDERS = "`project.dataset.orders_analytics_obt`"
+
+def _full_scan(query: str) -> bool:
+    flags = find_plan_issues(query, None, 0, max_read_amplification=1000, min_bytes_processed=0)
+    return any(flag.startswith("full_scan") for flag in flags)
+
+@pytest.mark.parametrize("query", [
+    f"SELECT COUNT(*) FROM {REVENUE} WHERE order_date >= @start",
+    f"SELECT COUNT(*) FROM {REVENUE} r WHERE r.order_date BETWEEN @start AND @end",
+    f"SELECT COUNT(*) FROM {REVENUE} WHERE order_date IN UNNEST(@dates) GROUP BY 1",
+    f"SELECT COUNT(*) FROM {REVENUE} AS r JOIN {ORDERS} o USING (order_id) "
+    f"WHERE r.order_date >= @start AND o.order_date >= @start"
+])
+def test_partition_predicates_are_accepted(query):
+    assert not _full_scan(query)
+
+@pytest.mark.parametrize("query", [
+    f"SELECT COUNT(*) FROM {REVENUE} WHERE order_date IS NOT NULL",
+    f"SELECT order_date, COUNT(*) FROM {REVENUE} GROUP BY order_date",
+    f"SELECT COUNT(*) FROM {REVENUE} WHERE order_date <> @day",
+    f"SELECT COUNT(*) FROM {REVENUE} r JOIN {ORDERS} o USING (order_id) WHERE r.order_date >= @start"
+])
+def test_missing_partition_predicates_are_flagged(query):
+    assert _full_scan(query)
+
+def test_flags_are_reported_on_every_render(database, monkeypatch):
+    captions = []
+    monkeypatch.setattr(database, "DEV_MODE", True)
+    monkeypatch.setattr(database.st, "caption", captions.append)
+    query = f"SELECT value FROM {REVENUE} WHERE order_date IS NOT NULL"
+    
+    for _ in range(2):
+        database.execute_custom_query(query, dry_run=False)
+    
+    assert database.fake_client.executions == 1
+    assert [r["source"] for r in database.get_query_telemetry()[-2:]] == ["backend", "memory"]
+    assert all(r.get("plan_flags") for r in database.get_query_telemetry()[-2:])
+    assert len(captions) == 2
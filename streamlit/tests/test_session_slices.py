@@ -0,0 +1,122 @@
+"""
+Routing of page queries to a session's filtered slice
+"""
+
+from datetime import date
+
+import pyarrow as pa
+import pytest
+
+from utils.query_builder import DateRange, Equals, InList, build_where_clause
+from utils.session_slices import FilteredSlice
+from utils.sql import freeze_params
+
+TABLE = "revenue_analytics_obt"
+TABLE_REF = f"`project.dataset.{TABLE}`"
+
+def _slice(filters) -> FilteredSlice:
+    rows = pa.table({"customer_state": ["SP"], "seller_state": ["RJ"], "item_price": [10.0]})
+    return FilteredSlice("project", "dataset", TABLE, "key", filters, rows)
+
+def _page_query(filters):
+    where_clause, params = build_where_clause(TABLE, filters)
+    return f"SELECT SUM(item_price) AS revenue FROM {TABLE_REF} {where_clause}", freeze_params(params)
+
+def test_query_applying_the_same_filters_is_routed():
+    filters = [InList("customer_state", ["SP"]), DateRange("order_date", date(2017, 1, 1), date(2017, 12, 31))]
+    
+    assert _slice(filters).covers(*_page_query(filters))
+
+def test_same_value_on_another_column_is_not_routed():
+    slice_ = _slice([InList("customer_state", ["SP"])])
+    
+    assert not slice_.covers(*_page_query([InList("seller_state", ["SP"])]))
+
+def test_other_parameter_names_and_narrower_filters_are_routed():
+    slice_ = _slice([InList("customer_state", ["SP", "RJ"])])
+    query = f"""
+        SELECT COUNT(*) AS orders
+        FROM {TABLE_REF} r
+        WHERE r.customer_state IN UNNEST(@states)
+          AND seller_state = @seller
+    """
+    
+    assert slice_.covers(query, freeze_params({"states": ["SP", "RJ"], "seller": "MG"}))
+    assert not slice_.covers(query, freeze_params({"states": ["SP"], "seller": "MG"}))
+
+def test_filter_outside_the_where_clause_is_not_routed():
+    slice_ = _slice([Equals("customer_state", "SP")])
+    query = f"SELECT customer_state = @state AS is_sp FROM {TABLE_REF}"
+    
+    assert not slice_.covers(query, freeze_params({"state": "SP"}))
+
+def test_query_on_another_table_is_not_routed():
+    filters = [InList("customer_state", ["SP"])]
+    query, params = _page_query(filters)
+    
+    assert not _slice(filters).covers(query.replace(TABLE, "orders_analytics_obt"), params)
+
+def _with_where(where: str) -> str:
+    return f"SELECT SUM(item_price) AS revenue FROM {TABLE_REF} WHERE {where}"
+
+@pytest.mark.parametrize("where", [
+    "customer_state IN UNNEST(@customer_state) OR x = 2",
+    "x = 2 OR customer_state IN UNNEST(@customer_state)",
+    "NOT (customer_state IN UNNEST(@customer_state))",
+    "NOT customer_state IN UNNEST(@customer_state)",
+    "(customer_state IN UNNEST(@customer_state) OR x = 2)",
+    f"order_id IN (SELECT order_id FROM {TABLE_REF} WHERE customer_state IN UNNEST(@customer_state))",
+    "x = 'customer_state IN UNNEST(@customer_state)'",
+    "x = 1 AND NOT y = 2 AND customer_state IN UNNEST(@customer_state)"
+])
+def test_filter_that_is_not_a_top_level_conjunct_is_not_routed(where):
+    slice_ = _slice([InList("customer_state", ["SP"])])
+    
+    assert not slice_.covers(_with_where(where), freeze_params({"customer_state": ["SP"]}))
+
+def test_conjuncts_next_to_between_and_parentheses_are_routed():
+    slice_ = _slice([InList("customer_state", ["SP"])])
+    where = (
+        "item_price BETWEEN 1 AND 10 AND (x = 1 OR y = 2) AND seller_state IS NOT NULL "
+        "AND x NOT IN (1, 2) AND customer_state IN UNNEST(@customer_state)"
+    )
+    
+    assert slice_.covers(_with_where(where) + " GROUP BY x", freeze_params({"customer_state": ["SP"]}))
+
+def test_revenue_page_fallback_is_answered_from_the_slice(database, monkeypatch, tmp_path):
+    import glob
+    import os
+    from types import SimpleNamespace
+    
+    import pandas as pd
+    
+    from config.settings import APP_DIR
+    from utils.backends import DuckDBBackend
+    from utils.cache_warmer import load_page_functions
+    
+    pd.DataFrame({
+        "order_id": ["o1", "o2", "o3", "o4"],
+        "customer_id": ["c1", "c2", "c3", "c4"],
+        "customer_unique_id": ["u1", "u2", "u3", "u3"],
+        "item_price": [10.0, 20.0, 30.0, 40.0],
+        "order_date": [date(2017, 1, 5), date(2017, 2, 5), date(2018, 3, 5), date(2018, 4, 5)],
+        "customer_state": ["SP", "RJ", "SP", "MG"],
+        "seller_state": ["SP", "SP", "PR", "SP"],
+        "product_category_english": ["toys", "toys", "garden_tools", "toys"]
+    }).to_parquet(tmp_path / f"{TABLE}.parquet", index=False)
+    backend = DuckDBBackend(str(tmp_path), [TABLE])
+    ctx = SimpleNamespace(session_id="session-1", script_requests=SimpleNamespace(_state=SimpleNamespace(name="NONE")))
+    monkeypatch.setattr(database, "get_query_backend", lambda: backend)
+    monkeypatch.setattr(database, "get_script_run_ctx", lambda suppress_warning=False: ctx)
+    monkeypatch.setitem(database.COLUMNAR_STORE_CONFIG, "enabled", False)
+    
+    page = load_page_functions(glob.glob(os.path.join(APP_DIR, "pages", "1_*Revenue*.py"))[0])
+    filters = [InList("seller_state", ["SP"])]
+    expected = page["get_state_performance"](filters)
+    with database.filtered_slice(TABLE, filters) as slice_:
+        assert slice_ is not None
+        database.query_memory_cache.clear()
+        result = page["get_state_performance"](filters)
+    
+    assert database.get_query_telemetry()[-1]["source"] == "slice"
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
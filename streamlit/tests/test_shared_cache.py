@@ -0,0 +1,56 @@
+"""
+Cross-replica result cache: serialization failures and invalidation after dbt runs
+"""
+
+import pandas as pd
+
+from tests.fakes import FakeRedis
+from utils.shared_cache import RedisResultCache
+
+TABLE = "project.dataset.revenue_analytics_obt"
+
+def _cache() -> RedisResultCache:
+    return RedisResultCache(FakeRedis(), ttl_seconds=60, key_prefix="test:")
+
+def test_round_trip_checks_the_version():
+    cache = _cache()
+    df = pd.DataFrame({"state": ["SP", "RJ"], "revenue": [1.5, 2.0]})
+    cache.put("key", df, "v1", [TABLE])
+    
+    pd.testing.assert_frame_equal(cache.get("key", "v1"), df)
+    assert cache.get("key", "v2") is None
+
+def test_unserializable_result_is_skipped_not_raised():
+    cache = _cache()
+    cache.put("key", pd.DataFrame({"mixed": [1, "a", object()]}), "v1", [TABLE])
+    
+    assert cache.get("key", "v1") is None
+    assert cache.stats()["writes"] == 0
+    assert cache.available()
+
+def test_invalidate_tables_drops_tagged_results_only():
+    cache = _cache()
+    df = pd.DataFrame({"value": [1]})
+    cache.put("revenue", df, "v1", [TABLE])
+    cache.put("other", df, "v1", ["project.dataset.seller_analytics_obt"])
+    
+    assert cache.invalidate_tables([TABLE]) == 1
+    assert cache.get("revenue", "v1") is None
+    assert cache.get("other", "v1") is not None
+
+def test_refresh_table_versions_invalidates_rebuilt_tables(monkeypatch):
+    from utils import database
+    
+    cache = _cache()
+    cache.put("revenue", pd.DataFrame({"value": [1]}), "v1", [TABLE])
+    cache.put("seller", pd.DataFrame({"value": [2]}), "v1", ["project.dataset.seller_analytics_obt"])
+    snapshots = iter([
+        {"revenue_analytics_obt": 1, "seller_analytics_obt": 1},
+        {"revenue_analytics_obt": 2, "seller_analytics_obt": 1}
+    ])
+    monkeypatch.setattr(database, "get_table_versions", lambda project_id, dataset_id: next(snapshots))
+    monkeypatch.setattr(database, "get_shared_cache", lambda: cache)
+    
+    assert database.refresh_table_versions("project", "dataset") == ["revenue_analytics_obt"]
+    assert cache.get("revenue", "v1") is None
+    assert cache.get("seller", "v1") is not None
@@ -0,0 +1,63 @@
+"""
+Coalescing of identical in-flight queries
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tests.fakes import FakeClient
+from utils.single_flight import SingleFlight
+
+QUERY = "SELECT value FROM `project.dataset.revenue_analytics_obt`"
+THREADS = 20
+
+def _run_together(fn, threads: int = THREADS) -> list:
+    """Call fn from `threads` threads released at the same moment"""
+    barrier = threading.Barrier(threads)
+    
+    def call():
+        barrier.wait()
+        return fn()
+    
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return [f.result() for f in [executor.submit(call) for _ in range(threads)]]
+
+def test_concurrent_identical_queries_run_once(database):
+    database.fake_client = FakeClient(duration=0.5)
+    before = database.get_single_flight_stats()
+    
+    results = _run_together(lambda: database.execute_custom_query(QUERY, dry_run=False))
+    
+    assert database.fake_client.executions == 1
+    assert all(df["value"].tolist() == [1, 2, 3] for df in results)
+    after = database.get_single_flight_stats()
+    assert after["executions"] - before["executions"] == 1
+    assert after["coalesced"] - before["coalesced"] == THREADS - 1
+
+def test_formatting_differences_share_one_execution(database):
+    database.fake_client = FakeClient(duration=0.5)
+    variants = [QUERY, f"  {QUERY}\n", QUERY.replace(" ", "\n  ")]
+    
+    with ThreadPoolExecutor(max_workers=len(variants)) as executor:
+        list(executor.map(lambda q: database.execute_custom_query(q, dry_run=False), variants))
+    
+    assert database.fake_client.executions == 1
+
+def test_error_reaches_every_waiting_caller():
+    flight = SingleFlight()
+    calls = []
+    
+    def fail():
+        calls.append(1)
+        threading.Event().wait(0.3)
+        raise RuntimeError("boom")
+    
+    def call():
+        with pytest.raises(RuntimeError, match="boom"):
+            flight.do("key", fail)
+        return True
+    
+    assert all(_run_together(call, threads=5))
+    assert len(calls) == 1
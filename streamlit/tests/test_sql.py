@@ -0,0 +1,17 @@
+"""
+BigQuery-to-DuckDB translation of the dashboard's SQL dialect
+"""
+
+from utils.sql import translate_bigquery_to_duckdb
+
+def test_parameters_are_translated_outside_literals():
+    query = (
+        "SELECT 'it\\'s @literal' AS note FROM `project.dataset.revenue_analytics_obt` "
+        "WHERE customer_state IN UNNEST(@states) AND order_date >= @start"
+    )
+    translated = translate_bigquery_to_duckdb(query)
+    
+    assert "'it''s @literal'" in translated
+    assert "IN (SELECT UNNEST($states))" in translated
+    assert "order_date >= $start" in translated
+    assert 'FROM "revenue_analytics_obt"' in translated
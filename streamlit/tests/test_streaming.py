@@ -0,0 +1,75 @@
+"""
+Streamed query results: bounded memory and errors surfaced to the caller
+"""
+
+import tracemalloc
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from tests.fakes import FakeClient, FakeRowIterator
+
+QUERY = "SELECT order_id, item_price FROM `project.dataset.revenue_analytics_obt`"
+ROWS = 1_000_000
+CHUNK_ROWS = 10_000
+
+def _large_result() -> pa.Table:
+    """Two int64/float64 columns, about 16 MB once converted to pandas"""
+    return pa.table({"order_id": np.arange(ROWS), "item_price": np.random.default_rng(0).random(ROWS)})
+
+def test_chunks_keep_peak_memory_bounded(database, monkeypatch):
+    database.fake_client = FakeClient(result=_large_result().slice(0, 0))
+    full_bytes = ROWS * 16
+    
+    def generated_batches(self, **kwargs):
+        # Pages are produced on demand (NumPy memory, seen by tracemalloc), like a real download
+        rng = np.random.default_rng(0)
+        for offset in range(0, ROWS, self._page_size):
+            size = min(self._page_size, ROWS - offset)
+            yield pa.record_batch({"order_id": np.arange(offset, offset + size), "item_price": rng.random(size)})
+    monkeypatch.setattr(FakeRowIterator, "to_arrow_iterable", generated_batches)
+    
+    rows, total = 0, 0.0
+    tracemalloc.start()
+    try:
+        for chunk in database.iter_query_chunks(QUERY, chunk_rows=CHUNK_ROWS, timeout=None):
+            assert len(chunk) <= CHUNK_ROWS
+            rows += len(chunk)
+            total += chunk["item_price"].sum()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    assert rows == ROWS
+    # Only a few chunks' worth of pandas memory is ever alive, never the whole result
+    assert peak < full_bytes / 10
+    record = database.get_query_telemetry()[-1]
+    assert record["source"] == "stream" and record["rows"] == ROWS
+
+def test_mid_stream_error_is_recorded_and_raised(database, monkeypatch):
+    database.fake_client = FakeClient(result=_large_result())
+    
+    def failing_batches(self, **kwargs):
+        yield self._table.slice(0, CHUNK_ROWS).to_batches()[0]
+        raise ConnectionError("stream reset")
+    monkeypatch.setattr(FakeRowIterator, "to_arrow_iterable", failing_batches)
+    
+    chunks = []
+    with pytest.raises(database.QueryFailedError, match="stream reset"):
+        for chunk in database.iter_query_chunks(QUERY, chunk_rows=CHUNK_ROWS, timeout=None):
+            chunks.append(chunk)
+    
+    assert len(chunks) == 1
+    record = database.get_query_telemetry()[-1]
+    assert record["source"] == "error" and record["rows"] == CHUNK_ROWS
+
+def test_timeout_before_the_first_chunk_is_raised(database, monkeypatch):
+    database.fake_client = FakeClient(duration=10)
+    monkeypatch.setitem(database.QUERY_TIMEOUT_CONFIG, "poll_interval_seconds", 0.05)
+    
+    with pytest.raises(database.QueryTimeoutError):
+        list(database.iter_query_chunks(QUERY, timeout=0.2))
+    
+    assert database.fake_client.jobs[0].cancelled
+    assert database.get_query_telemetry()[-1]["source"] == "timeout"
@@ -0,0 +1,44 @@
+"""
+Table metadata lookups: failures reach the callers and are not cached
+"""
+
+import pytest
+
+PROJECT, DATASET = "project", "dataset"
+
+class FlakyMetadataBackend:
+    """Backend whose first metadata lookup fails"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def get_table_metadata(self, project_id, dataset_id):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("metadata query timed out")
+        return {"revenue_analytics_obt": {"num_rows": 3, "last_modified_ms": 1700000000000}}
+
+@pytest.fixture
+def flaky_backend(database, monkeypatch):
+    backend = FlakyMetadataBackend()
+    monkeypatch.setattr(database, "get_query_backend", lambda: backend)
+    database.get_table_metadata.clear()
+    yield backend
+    database.get_table_metadata.clear()
+
+def test_failed_lookup_is_raised_not_cached(database, flaky_backend):
+    with pytest.raises(RuntimeError):
+        database.get_table_metadata(PROJECT, DATASET)
+    
+    assert database.get_table_metadata(PROJECT, DATASET)["revenue_analytics_obt"]["num_rows"] == 3
+    assert flaky_backend.calls == 2
+
+def test_table_versions_recover_after_a_failed_lookup(database, flaky_backend):
+    assert database.get_table_versions(PROJECT, DATASET) == {}
+    assert database.get_table_versions(PROJECT, DATASET) == {"revenue_analytics_obt": 1700000000000}
+    # The successful lookup is cached
+    database.get_table_versions(PROJECT, DATASET)
+    assert flaky_backend.calls == 2
+
+def test_refresh_after_a_failed_lookup_invalidates_nothing(database, flaky_backend):
+    assert database.refresh_table_versions(PROJECT, DATASET) == []
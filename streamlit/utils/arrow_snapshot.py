@@ -0,0 +1,201 @@
+"""
+Memory-mapped Arrow IPC snapshots of the analytics OBT tables
+
+When several Streamlit processes run on one host, each DuckDB backend would
+load its own copy of every OBT table. A snapshot stores each table as an
+uncompressed Arrow IPC file; every process memory-maps the same files, so
+the OS page cache holds one physical copy that all of them scan zero-copy.
+
+Layout of the snapshot directory:
+
+    <directory>/<snapshot id>/<table>.arrow    one IPC file per table
+    <directory>/<snapshot id>/manifest.json    row counts and creation time
+    <directory>/CURRENT                        id of the snapshot to read
+
+A new snapshot is written to a temporary directory, renamed into place and
+only then published by atomically replacing CURRENT. Readers that still map
+an older snapshot keep working: its files are only removed once several
+newer snapshots exist, and mapped files stay readable even after removal.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+_CURRENT_FILE = "CURRENT"
+_MANIFEST_FILE = "manifest.json"
+
+def _write_ipc_file(path: str, batches: Iterable[pa.RecordBatch]) -> Optional[int]:
+    """
+    Stream record batches into an uncompressed Arrow IPC file
+    
+    Returns:
+        Number of rows written, or None if there were no batches (no schema to write)
+    """
+    writer = None
+    rows = 0
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pa.ipc.new_file(path, batch.schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows if writer is not None else None
+
+def _publish_current(directory: str, snapshot_id: str) -> None:
+    """Point CURRENT at a snapshot with an atomic rename"""
+    path = os.path.join(directory, _CURRENT_FILE)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(snapshot_id)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _prune_snapshots(directory: str, keep: int, current_id: str) -> None:
+    """Remove all but the newest `keep` snapshots (never the current one)"""
+    snapshot_ids = sorted(
+        name for name in os.listdir(directory)
+        if not name.startswith(".") and os.path.isfile(os.path.join(directory, name, _MANIFEST_FILE))
+    )
+    for snapshot_id in snapshot_ids[:-keep] if keep > 0 else snapshot_ids:
+        if snapshot_id == current_id:
+            continue
+        # Processes still mapping these files keep reading them until they unmap
+        shutil.rmtree(os.path.join(directory, snapshot_id), ignore_errors=True)
+
+def write_snapshot(directory: str, tables: Dict[str, Iterable[pa.RecordBatch]], keep: int = 3) -> str:
+    """
+    Write a new snapshot and atomically make it the current one
+    
+    Args:
+        directory: Snapshot directory
+        tables: Table name to its record batches (consumed one batch at a time)
+        keep: Number of snapshots to keep on disk, including the new one
+    
+    Returns:
+        Id of the new snapshot
+    """
+    os.makedirs(directory, exist_ok=True)
+    # Ids sort chronologically, which _prune_snapshots relies on
+    snapshot_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    tmp_dir = os.path.join(directory, f".{snapshot_id}.tmp")
+    os.makedirs(tmp_dir)
+    
+    manifest = {"snapshot_id": snapshot_id, "created_ms": int(time.time() * 1000), "tables": {}}
+    try:
+        for table_name, batches in tables.items():
+            path = os.path.join(tmp_dir, f"{table_name}.arrow")
+            rows = _write_ipc_file(path, batches)
+            if rows is None:
+                logger.warning("Skipping %s: the export returned no record batches", table_name)
+                continue
+            manifest["tables"][table_name] = {"rows": rows, "bytes": os.path.getsize(path)}
+        
+        with open(os.path.join(tmp_dir, _MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(tmp_dir, os.path.join(directory, snapshot_id))
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    
+    _publish_current(directory, snapshot_id)
+    _prune_snapshots(directory, keep, snapshot_id)
+    return snapshot_id
+
+class ArrowSnapshotStore:
+    """
+    Process-local view of the current snapshot, memory-mapping each table once
+    
+    Args:
+        directory: Snapshot directory written by write_snapshot
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.snapshot_id = None
+        self.manifest = {}
+        self._tables = {}
+        self._lock = threading.Lock()
+    
+    def current_id(self) -> Optional[str]:
+        """Id of the published snapshot, or None if none was written yet"""
+        try:
+            with open(os.path.join(self.directory, _CURRENT_FILE), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def refresh(self) -> bool:
+        """
+        Switch to the published snapshot if it changed
+        
+        Tables of the previous snapshot stay valid for queries still holding them.
+        
+        Returns:
+            True if a new snapshot was mapped
+        """
+        snapshot_id = self.current_id()
+        if snapshot_id is None or snapshot_id == self.snapshot_id:
+            return False
+        
+        snapshot_dir = os.path.join(self.directory, snapshot_id)
+        try:
+            with open(os.path.join(snapshot_dir, _MANIFEST_FILE), encoding="utf-8") as f:
+                manifest = json.load(f)
+            tables = {
+                table_name: self._map_table(os.path.join(snapshot_dir, f"{table_name}.arrow"))
+                for table_name in manifest["tables"]
+            }
+        except (OSError, ValueError, pa.ArrowInvalid) as e:
+            logger.warning("Could not map Arrow snapshot %s, keeping %s: %s", snapshot_id, self.snapshot_id, e)
+            return False
+        
+        with self._lock:
+            self.snapshot_id, self.manifest, self._tables = snapshot_id, manifest, tables
+        logger.info("Mapped Arrow snapshot %s (%d tables)", snapshot_id, len(tables))
+        return True
+    
+    @staticmethod
+    def _map_table(path: str) -> pa.Table:
+        # Uncompressed IPC buffers are read straight from the mapping, without copies;
+        # the table keeps the mapping open for as long as it is referenced
+        source = pa.memory_map(path, "r")
+        return pa.ipc.open_file(source).read_all()
+    
+    def tables(self) -> Dict[str, pa.Table]:
+        """Mapped tables of the current snapshot by table name"""
+        with self._lock:
+            return dict(self._tables)
+    
+    def stats(self) -> dict:
+        """
+        Get snapshot and memory-mapping details
+        
+        Returns:
+            Dictionary with snapshot_id, tables, rows, mapped_mb and arrow_heap_mb
+            (Arrow memory allocated by this process, which mapped tables do not add to)
+        """
+        with self._lock:
+            table_stats = dict(self.manifest.get("tables", {}))
+            snapshot_id = self.snapshot_id
+        return {
+            "snapshot_id": snapshot_id,
+            "tables": len(table_stats),
+            "rows": sum(t["rows"] for t in table_stats.values()),
+            "mapped_mb": round(sum(t["bytes"] for t in table_stats.values()) / (1024 * 1024), 2),
+            "arrow_heap_mb": round(pa.total_allocated_bytes() / (1024 * 1024), 2)
+        }
@@ -0,0 +1,504 @@
+"""
+Query backends for the Streamlit dashboard
+
+The data layer in utils/database.py talks to a QueryBackend instead of a raw
+BigQuery client, so pages can run against live BigQuery or against local
+Parquet copies of the analytics OBT tables through DuckDB.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+from google.cloud import bigquery
+
+from config.settings import DOWNLOAD_CONFIG, HEDGING_CONFIG
+from utils.arrow_snapshot import ArrowSnapshotStore
+from utils.job_control import JobControl, QueryTimeoutError
+from utils.sql import translate_bigquery_to_duckdb
+from utils.telemetry import job_statistics
+
+try:
+    # Optional dependency for the Storage Read API download path
+    from google.cloud import bigquery_storage
+except ImportError:
+    bigquery_storage = None
+
+logger = logging.getLogger(__name__)
+
+# Recent download timings, used to compare the REST and Storage API paths
+_download_stats = deque(maxlen=200)
+
+def download_dataframe(query_job, label: str, use_storage_api: bool = False) -> pd.DataFrame:
+    """
+    Download a finished query job into a DataFrame and record its throughput
+    
+    Args:
+        query_job: BigQuery QueryJob
+        label: Name recorded with the download stats (e.g. table name)
+        use_storage_api: Stream Arrow record batches through the Storage Read API
+    
+    Returns:
+        DataFrame with query results
+    """
+    # Wait for the job first so only the download itself is timed
+    query_job.result()
+    
+    start = time.perf_counter()
+    path = "rest"
+    df = None
+    
+    if use_storage_api:
+        if bigquery_storage is None:
+            logger.info("google-cloud-bigquery-storage not installed, using REST download for %s", label)
+        else:
+            try:
+                arrow_table = query_job.to_arrow(create_bqstorage_client=True)
+                if DOWNLOAD_CONFIG["arrow_dtypes"]:
+                    df = arrow_table.to_pandas(types_mapper=pd.ArrowDtype)
+                else:
+                    df = arrow_table.to_pandas()
+                path = "storage_api"
+            except Exception as e:
+                logger.warning("Storage API download failed for %s, falling back to REST: %s", label, e)
+                start = time.perf_counter()
+    
+    if df is None:
+        df = query_job.to_dataframe(create_bqstorage_client=False)
+    
+    elapsed = time.perf_counter() - start
+    rows_per_sec = len(df) / elapsed if elapsed > 0 else float("inf")
+    _download_stats.append({
+        "label": label,
+        "path": path,
+        "rows": len(df),
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows_per_sec, 1)
+    })
+    logger.info("Downloaded %s rows for %s via %s in %.2fs (%.0f rows/sec)",
+                len(df), label, path, elapsed, rows_per_sec)
+    return df
+
+def get_download_stats() -> list:
+    """
+    Get recent download timings for comparing the REST and Storage API paths
+    
+    Returns:
+        List of dictionaries with label, path, rows, seconds and rows_per_sec
+    """
+    return list(_download_stats)
+
+def slice_record_batches(batches: Iterable[pa.RecordBatch], max_rows: int) -> Iterator[pa.RecordBatch]:
+    """Split record batches so none holds more than max_rows rows (slices are zero-copy)"""
+    for batch in batches:
+        for offset in range(0, batch.num_rows, max_rows):
+            yield batch.slice(offset, max_rows)
+
+def _bigquery_type(value: Any) -> str:
+    """Map a Python parameter value to its BigQuery standard SQL type"""
+    if isinstance(value, bool):
+        return "BOOL"
+    if isinstance(value, int):
+        return "INT64"
+    if isinstance(value, float):
+        return "FLOAT64"
+    if isinstance(value, datetime):
+        return "TIMESTAMP" if value.tzinfo is not None else "DATETIME"
+    if isinstance(value, date):
+        return "DATE"
+    return "STRING"
+
+def _from_epoch_ms(value) -> Optional[datetime]:
+    """Convert an epoch-milliseconds timestamp from __TABLES__ to a UTC datetime"""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+
+def _option_string(value: Optional[str]) -> Optional[str]:
+    """Unquote a string value from INFORMATION_SCHEMA.TABLE_OPTIONS (stored as a SQL literal)"""
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value.strip('"')
+
+def bigquery_query_parameters(params: Optional[Dict[str, Any]]) -> list:
+    """
+    Convert named parameter values to BigQuery query parameters
+    
+    Lists and tuples become ARRAY parameters (for `col IN UNNEST(@name)`).
+    
+    Args:
+        params: Mapping of parameter name (without @) to value
+    
+    Returns:
+        List of ScalarQueryParameter / ArrayQueryParameter
+    """
+    query_parameters = []
+    for name, value in (params or {}).items():
+        if isinstance(value, (list, tuple)):
+            element_type = _bigquery_type(value[0]) if value else "STRING"
+            query_parameters.append(bigquery.ArrayQueryParameter(name, element_type, list(value)))
+        else:
+            query_parameters.append(bigquery.ScalarQueryParameter(name, _bigquery_type(value), value))
+    return query_parameters
+
+def duckdb_parameters(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert named parameter values to DuckDB parameters
+    
+    DuckDB binds @name parameters as $name (see translate_bigquery_to_duckdb)
+    and needs lists rather than tuples for `IN UNNEST(...)`.
+    """
+    return {
+        name: list(value) if isinstance(value, tuple) else value
+        for name, value in (params or {}).items()
+    }
+
+class QueryBackend(ABC):
+    """Interface shared by every query backend"""
+    
+    name = "base"
+    
+    @abstractmethod
+    def run_query_with_stats(self, query: str, params: Optional[Dict[str, Any]] = None,
+                             label: str = "query", use_storage_api: bool = False,
+                             control: Optional[JobControl] = None,
+                             hedge_after: Optional[float] = None) -> Tuple[pd.DataFrame, dict]:
+        """
+        Run a BigQuery-dialect SQL query and collect its job statistics
+        
+        Args:
+            query: SQL query string, referencing parameters as @name
+            params: Optional mapping of parameter name to value
+            label: Name recorded with download stats
+            use_storage_api: Prefer the Arrow download path where supported
+            control: Optional deadline / cancellation policy for the query
+            hedge_after: Seconds after which a duplicate job is submitted, first
+                result wins (requires control; ignored by local backends)
+        
+        Returns:
+            (DataFrame with query results, dictionary of job statistics)
+        """
+    
+    def run_query(self, query: str, params: Optional[Dict[str, Any]] = None,
+                  label: str = "query", use_storage_api: bool = False) -> pd.DataFrame:
+        """Run a BigQuery-dialect SQL query and return only its results"""
+        df, _ = self.run_query_with_stats(query, params, label=label, use_storage_api=use_storage_api)
+        return df
+    
+    @abstractmethod
+    def iter_query_batches(self, query: str, params: Optional[Dict[str, Any]] = None,
+                           chunk_rows: int = 50_000, use_storage_api: bool = False,
+                           control: Optional[JobControl] = None) -> Iterator[pa.RecordBatch]:
+        """
+        Run a BigQuery-dialect SQL query and stream its results
+        
+        Args:
+            query: SQL query string, referencing parameters as @name
+            params: Optional mapping of parameter name to value
+            chunk_rows: Maximum rows per yielded batch
+            use_storage_api: Prefer the Arrow download path where supported
+            control: Optional deadline / cancellation policy for the query
+        
+        Yields:
+            Arrow record batches of at most chunk_rows rows
+        """
+    
+    def estimate_bytes(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """Estimate bytes a query would process, or None if the backend does not bill by bytes"""
+        return None
+    
+    @abstractmethod
+    def get_table_metadata(self, project_id: str, dataset_id: str) -> Dict[str, dict]:
+        """
+        Get row count, size, created/modified time and description of every table in a dataset
+        
+        Returns:
+            Dictionary of table name to num_rows, size_mb, created, modified,
+            last_modified_ms (epoch milliseconds) and description
+        """
+    
+    def get_table_versions(self, project_id: str, dataset_id: str) -> Dict[str, int]:
+        """Get table name to last modification time (epoch milliseconds)"""
+        return {
+            table_name: info["last_modified_ms"]
+            for table_name, info in self.get_table_metadata(project_id, dataset_id).items()
+        }
+
+class BigQueryBackend(QueryBackend):
+    """Backend that runs queries as BigQuery jobs"""
+    
+    name = "bigquery"
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def run_query_with_stats(self, query: str, params: Optional[Dict[str, Any]] = None,
+                             label: str = "query", use_storage_api: bool = False,
+                             control: Optional[JobControl] = None,
+                             hedge_after: Optional[float] = None) -> Tuple[pd.DataFrame, dict]:
+        def submit():
+            return self.client.query(query, job_config=self._job_config(params, control))
+        
+        query_job = submit()
+        hedge_stats = {}
+        if control is not None and hedge_after is not None:
+            query_job, hedged, hedge_won = control.wait_hedged(
+                query_job, submit, hedge_after, HEDGING_CONFIG["poll_interval_seconds"]
+            )
+            hedge_stats = {
+                "hedge_after_ms": round(hedge_after * 1000, 1),
+                "hedged": hedged,
+                "hedge_won": hedge_won
+            }
+        elif control is not None:
+            control.wait(query_job)
+        df = download_dataframe(query_job, label, use_storage_api=use_storage_api)
+        return df, {**job_statistics(query_job), **hedge_stats}
+    
+    def iter_query_batches(self, query: str, params: Optional[Dict[str, Any]] = None,
+                           chunk_rows: int = 50_000, use_storage_api: bool = False,
+                           control: Optional[JobControl] = None) -> Iterator[pa.RecordBatch]:
+        query_job = self.client.query(query, job_config=self._job_config(params, control))
+        if control is not None:
+            control.wait(query_job)
+        
+        bqstorage_client = None
+        if use_storage_api and bigquery_storage is not None:
+            bqstorage_client = bigquery_storage.BigQueryReadClient()
+        # REST pages are fetched chunk_rows at a time; Storage API streams are
+        # read one batch ahead per stream, then sliced down to chunk_rows
+        rows = query_job.result(page_size=chunk_rows)
+        batches = rows.to_arrow_iterable(bqstorage_client=bqstorage_client, max_queue_size=1)
+        yield from slice_record_batches(batches, chunk_rows)
+    
+    def _job_config(self, params: Optional[Dict[str, Any]],
+                    control: Optional[JobControl]) -> bigquery.QueryJobConfig:
+        job_config = bigquery.QueryJobConfig(query_parameters=bigquery_query_parameters(params))
+        if control is not None and control.timeout:
+            # BigQuery also enforces the deadline server-side
+            job_config.job_timeout_ms = int(control.timeout * 1000)
+        return job_config
+    
+    def estimate_bytes(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        # Dry runs are free and return the bytes the query would process
+        job_config = bigquery.QueryJobConfig(
+            dry_run=True,
+            use_query_cache=False,
+            query_parameters=bigquery_query_parameters(params)
+        )
+        query_job = self.client.query(query, job_config=job_config)
+        return query_job.total_bytes_processed
+    
+    def get_table_metadata(self, project_id: str, dataset_id: str) -> Dict[str, dict]:
+        # One metadata query covers every table in the dataset, instead of a
+        # get_table API call per table
+        query = f"""
+        SELECT
+            t.table_id,
+            t.creation_time,
+            t.last_modified_time,
+            t.row_count,
+            t.size_bytes,
+            o.option_value AS description
+        FROM `{project_id}.{dataset_id}.__TABLES__` t
+        LEFT JOIN `{project_id}.{dataset_id}.INFORMATION_SCHEMA.TABLE_OPTIONS` o
+            ON o.table_name = t.table_id AND o.option_name = 'description'
+        """
+        metadata = {}
+        for row in self.client.query(query).result():
+            metadata[row["table_id"]] = {
+                "num_rows": int(row["row_count"] or 0),
+                "size_mb": round(int(row["size_bytes"] or 0) / (1024 * 1024), 2),
+                "created": _from_epoch_ms(row["creation_time"]),
+                "modified": _from_epoch_ms(row["last_modified_time"]),
+                "last_modified_ms": int(row["last_modified_time"]),
+                "description": _option_string(row["description"]) or "No description available"
+            }
+        return metadata
+
+class DuckDBBackend(QueryBackend):
+    """
+    Backend that answers queries locally from Parquet copies of the OBT tables
+    
+    Each `<table>.parquet` file in data_dir is loaded into an in-memory DuckDB
+    table named after it, and reloaded when the file changes. When an Arrow
+    snapshot has been published in snapshot_dir, its memory-mapped tables are
+    scanned in place instead, so processes on one host share one copy. Queries
+    are translated from the BigQuery dialect the pages use.
+    """
+    
+    name = "duckdb"
+    
+    def __init__(self, data_dir: str, table_names: list, snapshot_dir: Optional[str] = None):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("The duckdb backend requires the duckdb package (pip install duckdb)") from e
+        
+        self.data_dir = data_dir
+        self.table_names = list(table_names)
+        self._conn = duckdb.connect(database=":memory:")
+        self._lock = threading.Lock()
+        self._loaded = {}
+        self.snapshots = ArrowSnapshotStore(snapshot_dir) if snapshot_dir else None
+        self.refresh()
+    
+    def _path(self, table_name: str) -> str:
+        return os.path.join(self.data_dir, f"{table_name}.parquet")
+    
+    def _snapshot_tables(self) -> Dict[str, pa.Table]:
+        """Memory-mapped tables of the current Arrow snapshot (empty if none is published)"""
+        return self.snapshots.tables() if self.snapshots is not None else {}
+    
+    def refresh(self) -> None:
+        """
+        Switch to a newly published Arrow snapshot, or (re)load every Parquet
+        file that is new or changed since the last load
+        """
+        if self.snapshots is not None:
+            self.snapshots.refresh()
+            if self.snapshots.snapshot_id is not None:
+                with self._lock:
+                    # Free the private copies once the shared snapshot is in use
+                    for table_name in list(self._loaded):
+                        self._conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+                        del self._loaded[table_name]
+                return
+        
+        with self._lock:
+            for table_name in self.table_names:
+                path = self._path(table_name)
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                if self._loaded.get(table_name) == mtime_ns:
+                    continue
+                
+                escaped_path = path.replace("'", "''")
+                self._conn.execute(
+                    f'CREATE OR REPLACE TABLE "{table_name}" AS '
+                    f"SELECT * FROM read_parquet('{escaped_path}')"
+                )
+                self._loaded[table_name] = mtime_ns
+                logger.info("Loaded %s into DuckDB from %s", table_name, path)
+    
+    def run_query_with_stats(self, query: str, params: Optional[Dict[str, Any]] = None,
+                             label: str = "query", use_storage_api: bool = False,
+                             control: Optional[JobControl] = None,
+                             hedge_after: Optional[float] = None) -> Tuple[pd.DataFrame, dict]:
+        # A cursor per call gives each thread its own connection to the shared database
+        cursor = self._conn.cursor()
+        try:
+            return self._execute(cursor, query, params, control).df(), {}
+        finally:
+            cursor.close()
+    
+    def iter_query_batches(self, query: str, params: Optional[Dict[str, Any]] = None,
+                           chunk_rows: int = 50_000, use_storage_api: bool = False,
+                           control: Optional[JobControl] = None) -> Iterator[pa.RecordBatch]:
+        cursor = self._conn.cursor()
+        try:
+            reader = self._execute(cursor, query, params, control).fetch_record_batch(chunk_rows)
+            yield from slice_record_batches(reader, chunk_rows)
+        finally:
+            cursor.close()
+    
+    def _execute(self, cursor, query: str, params: Optional[Dict[str, Any]],
+                 control: Optional[JobControl]):
+        """Execute a translated query on a cursor, interrupting it at the control's deadline"""
+        bound = duckdb_parameters(params)
+        # Registering a mapped table is zero-copy; registrations are per cursor
+        for table_name, table in self._snapshot_tables().items():
+            cursor.register(table_name, table)
+        timer = None
+        remaining = control.remaining() if control is not None else None
+        if remaining is not None:
+            timer = threading.Timer(max(remaining, 0), cursor.interrupt)
+            timer.start()
+        try:
+            return cursor.execute(translate_bigquery_to_duckdb(query), bound or None)
+        except Exception as e:
+            if remaining is not None and control.remaining() <= 0:
+                raise QueryTimeoutError(
+                    f"Query exceeded its {control.timeout:g}s deadline and was interrupted"
+                ) from e
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+    
+    def get_table_metadata(self, project_id: str, dataset_id: str) -> Dict[str, dict]:
+        self.refresh()
+        snapshot_tables = self._snapshot_tables()
+        if snapshot_tables:
+            manifest = self.snapshots.manifest
+            created_ms = manifest["created_ms"]
+            return {
+                table_name: {
+                    "num_rows": table.num_rows,
+                    "size_mb": round(manifest["tables"][table_name]["bytes"] / (1024 * 1024), 2),
+                    "created": None,
+                    "modified": datetime.fromtimestamp(created_ms / 1000, tz=timezone.utc),
+                    "last_modified_ms": created_ms,
+                    "description": f"Arrow snapshot {manifest['snapshot_id']} of {table_name}"
+                }
+                for table_name, table in snapshot_tables.items()
+            }
+        
+        with self._lock:
+            loaded = dict(self._loaded)
+        
+        metadata = {}
+        cursor = self._conn.cursor()
+        try:
+            for table_name, mtime_ns in loaded.items():
+                try:
+                    size_bytes = os.stat(self._path(table_name)).st_size
+                except OSError:
+                    continue
+                num_rows = cursor.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+                metadata[table_name] = {
+                    "num_rows": int(num_rows),
+                    "size_mb": round(size_bytes / (1024 * 1024), 2),
+                    "created": None,
+                    "modified": datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc),
+                    "last_modified_ms": mtime_ns // 1_000_000,
+                    "description": f"Local Parquet copy of {table_name}"
+                }
+        finally:
+            cursor.close()
+        return metadata
+
+def create_backend(backend_type: str, client=None, data_dir: Optional[str] = None,
+                   table_names: Optional[list] = None,
+                   snapshot_dir: Optional[str] = None) -> Optional[QueryBackend]:
+    """
+    Build the query backend selected in config/settings.py
+    
+    Args:
+        backend_type: "bigquery" or "duckdb"
+        client: BigQuery client (bigquery backend)
+        data_dir: Directory of Parquet table copies (duckdb backend)
+        table_names: Tables to load (duckdb backend)
+        snapshot_dir: Directory of published Arrow snapshots (duckdb backend)
+    
+    Returns:
+        QueryBackend instance, or None if the BigQuery client is unavailable
+    """
+    if backend_type == "duckdb":
+        return DuckDBBackend(data_dir, table_names or [], snapshot_dir=snapshot_dir)
+    if backend_type == "bigquery":
+        return BigQueryBackend(client) if client is not None else None
+    raise ValueError(f"Unknown query backend: {backend_type}")
@@ -0,0 +1,258 @@
+"""
+Background cache warmer for the dashboard pages
+
+Pre-executes every page's get_* query functions so the first visitor after a
+deploy, cache expiry or dbt run does not pay for cold BigQuery queries.
+
+Page scripts render UI at import time, so the query functions are extracted
+from each page's source instead: only its imports and top-level function
+definitions are executed.
+"""
+
+import ast
+import inspect
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import streamlit as st
+
+from config.settings import CACHE_WARMER_CONFIG, QUERY_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+def _is_warmable(fn: Callable) -> bool:
+    """Whether a function can be called without arguments"""
+    try:
+        signature = inspect.signature(fn)
+    except (TypeError, ValueError):
+        return False
+    return all(
+        p.default is not inspect.Parameter.empty
+        or p.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+        for p in signature.parameters.values()
+    )
+
+def load_page_functions(path: str) -> Dict[str, Callable]:
+    """
+    Load the top-level functions of a page script without running its UI code
+    
+    Args:
+        path: Path to a page script
+    
+    Returns:
+        Dictionary of function name to function, bound to the page's imports
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    
+    tree.body = [
+        node for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef))
+    ]
+    namespace = {"__file__": path, "__name__": f"warm_{os.path.basename(path)}"}
+    # Compiled against the page's own path so telemetry attributes queries to the page
+    exec(compile(tree, path, "exec"), namespace)
+    return {
+        name: value for name, value in namespace.items()
+        if inspect.isfunction(value) and value.__code__.co_filename == path
+    }
+
+def discover_page_queries(
+    pages_dir: str,
+    prefix: str = "get_",
+    exclude: Iterable[str] = ()
+) -> Dict[str, Dict[str, Callable]]:
+    """
+    Find every zero-argument query function defined by the dashboard pages
+    
+    Args:
+        pages_dir: Directory holding the page scripts
+        prefix: Name prefix of query functions
+        exclude: Function names to skip
+    
+    Returns:
+        Dictionary of page name to {function name: function}
+    """
+    exclude = set(exclude)
+    queries = {}
+    for filename in sorted(os.listdir(pages_dir)):
+        if not filename.endswith(".py"):
+            continue
+        path = os.path.join(pages_dir, filename)
+        try:
+            functions = load_page_functions(path)
+        except Exception as e:
+            logger.warning("Skipping page %s in cache warm-up: %s", filename, e)
+            continue
+        
+        page_queries = {
+            name: fn for name, fn in functions.items()
+            if name.startswith(prefix) and name not in exclude and _is_warmable(fn)
+        }
+        if page_queries:
+            queries[os.path.splitext(filename)[0]] = page_queries
+    return queries
+
+def warm_caches(
+    queries: Dict[str, Dict[str, Callable]],
+    max_workers: Optional[int] = None
+) -> dict:
+    """
+    Execute every discovered query function concurrently
+    
+    Args:
+        queries: Output of discover_page_queries
+        max_workers: Optional cap on concurrent jobs (defaults to QUERY_CONCURRENCY)
+    
+    Returns:
+        Report with started_at, duration_s, warmed, failed and per-function results
+    """
+    entries = [(page, name, fn) for page, functions in queries.items() for name, fn in functions.items()]
+    started_at = datetime.now().isoformat(timespec="seconds")
+    start = time.perf_counter()
+    results = []
+    
+    def run(page: str, name: str, fn: Callable) -> dict:
+        fn_start = time.perf_counter()
+        result = {"page": page, "function": name}
+        try:
+            df = fn()
+            result["rows"] = len(df) if df is not None else 0
+        except Exception as e:
+            result["error"] = str(e)
+        result["wall_ms"] = round((time.perf_counter() - fn_start) * 1000, 1)
+        return result
+    
+    if entries:
+        workers = max(1, min(max_workers or QUERY_CONCURRENCY["max_workers"], len(entries)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cache-warm") as executor:
+            futures = [executor.submit(run, *entry) for entry in entries]
+            for future in as_completed(futures):
+                results.append(future.result())
+    
+    results.sort(key=lambda r: (r["page"], r["function"]))
+    return {
+        "started_at": started_at,
+        "duration_s": round(time.perf_counter() - start, 2),
+        "warmed": sum(1 for r in results if "error" not in r),
+        "failed": sum(1 for r in results if "error" in r),
+        "results": results
+    }
+
+class CacheWarmer:
+    """
+    Warms the page query caches at start-up and again after every dbt run
+    
+    A dbt run is detected from the modification time of its run_results.json,
+    or of a trigger file that deploy scripts can touch.
+    
+    Args:
+        pages_dir: Directory holding the page scripts
+        watch_paths: Files whose modification re-triggers a warm-up
+        poll_interval: Seconds between checks of the watched files
+        exclude: Function names to skip
+        max_workers: Optional cap on concurrent jobs
+    """
+    
+    def __init__(self, pages_dir: str, watch_paths: Iterable[str], poll_interval: float,
+                 exclude: Iterable[str] = (), max_workers: Optional[int] = None):
+        self.pages_dir = pages_dir
+        self.watch_paths = [p for p in watch_paths if p]
+        self.poll_interval = poll_interval
+        self.exclude = list(exclude)
+        self.max_workers = max_workers
+        self.reports: List[dict] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def _watch_state(self) -> tuple:
+        state = []
+        for path in self.watch_paths:
+            try:
+                state.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                state.append(None)
+        return tuple(state)
+    
+    def warm(self, reason: str = "manual") -> dict:
+        """
+        Discover and execute every page query once
+        
+        Args:
+            reason: Why the warm-up ran, recorded in the report
+        
+        Returns:
+            Warm-up report (see warm_caches)
+        """
+        # utils.database starts the warmer when it is imported, so it is imported lazily here
+        from utils.database import refresh_table_versions
+        
+        # Table metadata is cached briefly; re-read it so a rebuild is seen immediately
+        refresh_table_versions()
+        queries = discover_page_queries(self.pages_dir, exclude=self.exclude)
+        report = warm_caches(queries, max_workers=self.max_workers)
+        report["reason"] = reason
+        with self._lock:
+            self.reports.append(report)
+            del self.reports[:-20]
+        logger.info("Cache warm-up (%s): %s queries in %ss, %s failed",
+                    reason, report["warmed"], report["duration_s"], report["failed"])
+        return report
+    
+    def _warm_safely(self, reason: str) -> None:
+        try:
+            self.warm(reason)
+        except Exception:
+            logger.exception("Cache warm-up (%s) failed", reason)
+    
+    def _run(self) -> None:
+        state = self._watch_state()
+        self._warm_safely("startup")
+        while not self._stop.wait(self.poll_interval):
+            new_state = self._watch_state()
+            if new_state != state:
+                state = new_state
+                self._warm_safely("dbt run")
+    
+    def start(self) -> None:
+        """Start warming in a background daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop watching for dbt runs"""
+        self._stop.set()
+    
+    def last_report(self) -> Optional[dict]:
+        """Get the report of the most recent warm-up, or None before the first one finishes"""
+        with self._lock:
+            return self.reports[-1] if self.reports else None
+
+# The process-wide warmer, once start_cache_warmer has run
+_warmer: Optional[CacheWarmer] = None
+
+@st.cache_resource
+def start_cache_warmer() -> Optional[CacheWarmer]:
+    """Start the process-wide cache warmer once, or return None when disabled"""
+    global _warmer
+    if not CACHE_WARMER_CONFIG["enabled"]:
+        return None
+    _warmer = CacheWarmer(
+        CACHE_WARMER_CONFIG["pages_dir"],
+        watch_paths=[CACHE_WARMER_CONFIG["trigger_file"], CACHE_WARMER_CONFIG["dbt_run_results"]],
+        poll_interval=CACHE_WARMER_CONFIG["poll_interval_seconds"],
+        exclude=CACHE_WARMER_CONFIG["exclude"]
+    )
+    _warmer.start()
+    return _warmer
+
+def get_cache_warmer() -> Optional[CacheWarmer]:
+    """Get the running cache warmer without starting one (None when disabled or not started yet)"""
+    return _warmer
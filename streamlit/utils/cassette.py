@@ -0,0 +1,290 @@
+"""
+Record/replay BigQuery clients for offline, deterministic runs
+
+RecordingClient wraps a live bigquery.Client and saves every query result
+(as an Arrow IPC file) with its job statistics and latency into a cassette
+directory. ReplayClient serves those recordings back through the subset of
+the bigquery.Client API the dashboard uses (query, get_table, dataset), so
+pages and benchmarks run without a GCP project, optionally with the
+recorded latencies.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Optional, Union
+
+import pyarrow as pa
+from google.cloud import bigquery
+from google.cloud.bigquery.table import Row
+
+from utils.sql import normalize_sql
+
+_JOB_STAT_FIELDS = ("total_bytes_processed", "total_bytes_billed", "slot_millis", "cache_hit")
+_TABLE_FIELDS = ("num_rows", "num_bytes", "created", "modified", "description")
+
+class CassetteMissError(LookupError):
+    """Raised when a replayed query or table was never recorded"""
+
+def _query_key(query: str, job_config=None) -> str:
+    """Identify a query by its normalized SQL, bound parameters and dry-run flag"""
+    params = [p.to_api_repr() for p in getattr(job_config, "query_parameters", None) or []]
+    dry_run = bool(getattr(job_config, "dry_run", False))
+    payload = json.dumps([normalize_sql(query), params, dry_run], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _table_id(table) -> str:
+    """Fully-qualified table ID of a TableReference, Table or table ID string"""
+    if isinstance(table, str):
+        return table
+    return f"{table.project}.{table.dataset_id}.{table.table_id}"
+
+class Cassette:
+    """
+    Directory of recorded query results and table metadata
+    
+    Each query is stored as <key>.arrow (Arrow IPC file) and <key>.json
+    (SQL, job statistics, latency); tables as tables/<table id>.json.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "tables"), exist_ok=True)
+    
+    def _write_atomic(self, path: str, write) -> None:
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    
+    def save_query(self, key: str, query: str, table: Optional[pa.Table], metadata: dict) -> None:
+        """Save a query's result table (None for dry runs) and metadata"""
+        if table is not None:
+            def write_table(path):
+                with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            self._write_atomic(os.path.join(self.directory, f"{key}.arrow"), write_table)
+        
+        def write_metadata(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"query": query, **metadata}, f, indent=2, default=str)
+        self._write_atomic(os.path.join(self.directory, f"{key}.json"), write_metadata)
+    
+    def load_query(self, key: str, query: str) -> tuple:
+        """
+        Load a recorded query
+        
+        Returns:
+            (result table or None for dry runs, metadata dictionary)
+        
+        Raises:
+            CassetteMissError: If the query was not recorded
+        """
+        metadata_path = os.path.join(self.directory, f"{key}.json")
+        try:
+            with open(metadata_path, encoding="utf-8") as f:
+                metadata = json.load(f)
+        except FileNotFoundError:
+            raise CassetteMissError(f"Query not recorded in {self.directory}:\n{query}") from None
+        
+        table = None
+        table_path = os.path.join(self.directory, f"{key}.arrow")
+        if os.path.exists(table_path):
+            with pa.memory_map(table_path) as source:
+                table = pa.ipc.open_file(source).read_all()
+        return table, metadata
+    
+    def _table_path(self, table_id: str) -> str:
+        return os.path.join(self.directory, "tables", f"{table_id}.json")
+    
+    def save_table(self, table_id: str, metadata: dict) -> None:
+        """Save table metadata returned by get_table"""
+        def write(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(metadata, f, indent=2, default=str)
+        self._write_atomic(self._table_path(table_id), write)
+    
+    def load_table(self, table_id: str) -> dict:
+        """
+        Load recorded table metadata
+        
+        Raises:
+            CassetteMissError: If the table was not recorded
+        """
+        try:
+            with open(self._table_path(table_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise CassetteMissError(f"Table {table_id} not recorded in {self.directory}") from None
+
+class _RecordingJob:
+    """Proxy for a live QueryJob that saves its result to the cassette once it finishes"""
+    
+    def __init__(self, job, cassette: Cassette, key: str, query: str, submitted: float):
+        self._job = job
+        self._cassette = cassette
+        self._key = key
+        self._query = query
+        self._submitted = submitted
+        self._recorded = False
+        self._lock = threading.Lock()
+    
+    def __getattr__(self, name):
+        return getattr(self._job, name)
+    
+    def result(self, *args, **kwargs):
+        result = self._job.result(*args, **kwargs)
+        self._record()
+        return result
+    
+    def _record(self) -> None:
+        with self._lock:
+            if self._recorded:
+                return
+            self._recorded = True
+        job = self._job
+        created, ended = getattr(job, "created", None), getattr(job, "ended", None)
+        if created is not None and ended is not None:
+            latency = (ended - created).total_seconds()
+        else:
+            latency = time.monotonic() - self._submitted
+        metadata = {field: getattr(job, field, None) for field in _JOB_STAT_FIELDS}
+        metadata["latency_seconds"] = latency
+        metadata["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+        table = job.to_arrow(create_bqstorage_client=False)
+        self._cassette.save_query(self._key, self._query, table, metadata)
+
+class RecordingClient:
+    """
+    Wraps a live bigquery.Client and records every query and table lookup
+    
+    Args:
+        client: Live bigquery.Client
+        cassette: Cassette to record into
+    """
+    
+    def __init__(self, client, cassette: Cassette):
+        self._client = client
+        self.cassette = cassette
+    
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+    
+    def query(self, query: str, job_config=None, **kwargs):
+        submitted = time.monotonic()
+        job = self._client.query(query, job_config=job_config, **kwargs)
+        key = _query_key(query, job_config)
+        if getattr(job_config, "dry_run", False):
+            metadata = {field: getattr(job, field, None) for field in _JOB_STAT_FIELDS}
+            metadata["latency_seconds"] = 0.0
+            self.cassette.save_query(key, query, None, metadata)
+            return job
+        return _RecordingJob(job, self.cassette, key, query, submitted)
+    
+    def get_table(self, table, **kwargs):
+        result = self._client.get_table(table, **kwargs)
+        self.cassette.save_table(
+            _table_id(result), {field: getattr(result, field, None) for field in _TABLE_FIELDS}
+        )
+        return result
+
+class _ReplayRowIterator:
+    """Rows of a replayed result, iterable as bigquery Rows or as Arrow batches"""
+    
+    def __init__(self, table: pa.Table, page_size: Optional[int]):
+        self._table = table
+        self._page_size = page_size
+        self.total_rows = table.num_rows
+    
+    def __iter__(self):
+        field_to_index = {name: i for i, name in enumerate(self._table.column_names)}
+        for values in zip(*(column.to_pylist() for column in self._table.columns)):
+            yield Row(values, field_to_index)
+    
+    def to_arrow_iterable(self, bqstorage_client=None, max_queue_size=None, **kwargs):
+        return iter(self._table.to_batches(max_chunksize=self._page_size))
+    
+    def to_arrow(self, **kwargs) -> pa.Table:
+        return self._table
+    
+    def to_dataframe(self, **kwargs):
+        return self._table.to_pandas()
+
+class _ReplayJob:
+    """Replayed QueryJob that becomes done after its simulated latency"""
+    
+    def __init__(self, table: Optional[pa.Table], metadata: dict, latency: float):
+        self._table = table if table is not None else pa.table({})
+        self._ready_at = time.monotonic() + latency
+        self.job_id = f"replay_{uuid.uuid4().hex[:12]}"
+        self.cancelled = False
+        for field in _JOB_STAT_FIELDS:
+            setattr(self, field, metadata.get(field))
+    
+    def done(self, *args, **kwargs) -> bool:
+        return self.cancelled or time.monotonic() >= self._ready_at
+    
+    def cancel(self, *args, **kwargs) -> bool:
+        self.cancelled = True
+        return True
+    
+    def result(self, timeout: Optional[float] = None, page_size: Optional[int] = None, **kwargs):
+        remaining = self._ready_at - time.monotonic()
+        if timeout is not None and remaining > timeout:
+            time.sleep(timeout)
+            raise FutureTimeoutError()
+        if remaining > 0:
+            time.sleep(remaining)
+        if self.cancelled:
+            raise RuntimeError(f"Job {self.job_id} was cancelled")
+        return _ReplayRowIterator(self._table, page_size)
+    
+    def to_arrow(self, **kwargs) -> pa.Table:
+        return self.result().to_arrow()
+    
+    def to_dataframe(self, **kwargs):
+        return self.result().to_dataframe()
+
+class ReplayClient:
+    """
+    Serves recorded queries and tables in place of a bigquery.Client
+    
+    Args:
+        cassette: Cassette to replay from
+        project: Default project for dataset()
+        latency: "recorded" to replay recorded job latencies, a number of
+            seconds for a fixed latency, or None to answer immediately
+        latency_scale: Multiplier applied to recorded latencies
+    """
+    
+    def __init__(self, cassette: Cassette, project: str,
+                 latency: Union[str, float, None] = "recorded", latency_scale: float = 1.0):
+        self.cassette = cassette
+        self.project = project
+        self.latency = latency
+        self.latency_scale = latency_scale
+    
+    def _latency(self, metadata: dict) -> float:
+        if self.latency == "recorded":
+            return (metadata.get("latency_seconds") or 0.0) * self.latency_scale
+        return float(self.latency or 0.0)
+    
+    def query(self, query: str, job_config=None, **kwargs) -> _ReplayJob:
+        table, metadata = self.cassette.load_query(_query_key(query, job_config), query)
+        dry_run = bool(getattr(job_config, "dry_run", False))
+        return _ReplayJob(table, metadata, 0.0 if dry_run else self._latency(metadata))
+    
+    def dataset(self, dataset_id: str, project: Optional[str] = None) -> bigquery.DatasetReference:
+        return bigquery.DatasetReference(project or self.project, dataset_id)
+    
+    def get_table(self, table, **kwargs) -> SimpleNamespace:
+        metadata = self.cassette.load_table(_table_id(table))
+        for field in ("created", "modified"):
+            if metadata.get(field):
+                metadata[field] = datetime.fromisoformat(metadata[field])
+        return SimpleNamespace(**metadata)
@@ -5,110 +5,1257 @@ BigQuery database connection utilities for Streamlit dashboard
 import streamlit as st
 from google.cloud import bigquery
 import pandas as pd
-from typing import Optional
+import pyarrow as pa
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+import logging
 import os
+import threading
+import time
 
-from config.settings import BIGQUERY_CONFIG
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from config.settings import (
+    ANALYTICS_TABLES, BIGQUERY_CONFIG, CACHE_TTL, CASSETTE_CONFIG, COLUMNAR_STORE_CONFIG, COST_GUARD_CONFIG,
+    DEV_MODE, DISK_CACHE_CONFIG, DOWNLOAD_CONFIG, DTYPE_COMPACTION_CONFIG, HEDGING_CONFIG, MEMORY_CACHE_CONFIG,
+    PLAN_INSPECTION_CONFIG, QUERY_BACKEND, QUERY_CONCURRENCY, QUERY_TIMEOUT_CONFIG, SESSION_SLICE_CONFIG, SHARED_CACHE_CONFIG, STREAMING_CONFIG,
+    TELEMETRY_CONFIG
+)
+from utils import backends
+from utils.backends import QueryBackend, create_backend
+from utils.cassette import Cassette, RecordingClient, ReplayClient
+from utils.columnar_store import ColumnarStore
+from utils.disk_cache import ParquetResultCache
+from utils.job_control import (
+    JobControl, QueryCancelledError, QueryTimeoutError, SessionJobRegistry, script_run_superseded
+)
+from utils.dtypes import compact_dataframe
+from utils.hedging import LatencyHistory
+from utils.memory_cache import MemoryResultCache, dataframe_memory_bytes
+from utils.query_builder import build_select_query
+from utils.query_plan import find_plan_issues
+from utils.session_slices import FilteredSlice, SessionSliceRegistry
+from utils.shared_cache import RedisResultCache
+from utils.single_flight import SingleFlight
+from utils.sql import add_table_sample, extract_table_refs, freeze_params, normalize_sql
+from utils.telemetry import QueryTelemetry, find_caller
+
+logger = logging.getLogger(__name__)
+
+class QueryFailedError(Exception):
+    """A query produced no result (backend error, refused by the cost guard or no backend)"""
+
+# Process-wide ring buffer of per-query telemetry, shown on the Performance page
+query_telemetry = QueryTelemetry(TELEMETRY_CONFIG["max_records"])
+
+# Process-wide query results, bounded by memory and evicted least-recently-used first
+query_memory_cache = MemoryResultCache(
+    MEMORY_CACHE_CONFIG["max_size_mb"], MEMORY_CACHE_CONFIG["max_entry_fraction"]
+)
+
+# Identical in-flight queries across all sessions share one backend execution
+query_single_flight = SingleFlight()
+
+# Backend latency per query template, used to decide when to hedge a slow query
+query_latency_history = LatencyHistory(
+    HEDGING_CONFIG["history_size"], HEDGING_CONFIG["percentile"],
+    HEDGING_CONFIG["min_samples"], HEDGING_CONFIG["min_delay_seconds"]
+)
+
+# Running backend jobs per session, cancelled when their page run is abandoned
+query_job_registry = SessionJobRegistry()
+
+# Per-session filtered slices of OBT tables, answering that session's filtered page queries
+session_slices = SessionSliceRegistry(
+    SESSION_SLICE_CONFIG["max_size_mb"], SESSION_SLICE_CONFIG["idle_seconds"]
+)
+
+# Per-table columnar stores answering page aggregations in process, replaced on table version change
+columnar_stores: Dict[str, ColumnarStore] = {}
+_columnar_lock = threading.Lock()
+
+# Telemetry record of the query currently running on this thread, filled in by cache layers
+_call_state = threading.local()
+
+# A batch entry is either raw SQL or a zero-argument function returning a DataFrame
+# (e.g. one of a page's get_* query functions)
+BatchQuery = Union[str, Callable[[], pd.DataFrame]]
 
 @st.cache_resource
 def get_bigquery_client():
-    """Get cached BigQuery client instance"""
+    """
+    Get cached BigQuery client instance
+    
+    With CASSETTE_CONFIG["mode"] set to "replay", recorded results are served
+    without connecting to BigQuery; "record" saves every live result.
+    """
     try:
+        mode = CASSETTE_CONFIG["mode"]
+        if mode == "replay":
+            return ReplayClient(
+                Cassette(CASSETTE_CONFIG["directory"]),
+                project=BIGQUERY_CONFIG['project_id'],
+                latency=CASSETTE_CONFIG["latency"],
+                latency_scale=CASSETTE_CONFIG["latency_scale"]
+            )
+        
         # Initialize BigQuery client with correct location
         client = bigquery.Client(
             project=BIGQUERY_CONFIG['project_id'],
             location=BIGQUERY_CONFIG['location']
         )
+        if mode == "record":
+            return RecordingClient(client, Cassette(CASSETTE_CONFIG["directory"]))
         return client
     except Exception as e:
         st.error(f"Failed to connect to BigQuery: {str(e)}")
         return None
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def query_analytics_data(table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
+@contextmanager
+def _query_telemetry(query: str):
+    """
+    Record wall time, caller and cache source of one query call
+    
+    The yielded record starts as an in-memory cache hit; the cache layers
+    underneath update it via _annotate_query when they do more work.
+    """
+    if not TELEMETRY_CONFIG["enabled"]:
+        yield {}
+        return
+    
+    page, function = find_caller()
+    record = {"page": page, "function": function, "source": "memory"}
+    previous = getattr(_call_state, "record", None)
+    _call_state.record = record
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        _call_state.record = previous
+        record["wall_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        record["timestamp"] = time.time()
+        record["query"] = query
+        query_telemetry.record(record)
+
+def _annotate_query(**fields) -> None:
+    """Add fields to the telemetry record of the query running on this thread"""
+    record = getattr(_call_state, "record", None)
+    if record is not None:
+        record.update(fields)
+
+def _measure_result(record: dict, df: pd.DataFrame) -> None:
+    """
+    Store row count and in-memory size of a query result in its telemetry record
+    
+    Results held by query_memory_cache reuse the size measured when they were
+    cached (annotated as cached_memory_bytes) instead of being measured again.
+    """
+    if TELEMETRY_CONFIG["enabled"]:
+        record["rows"] = len(df)
+        cached_bytes = record.pop("cached_memory_bytes", None)
+        record["memory_bytes"] = cached_bytes if cached_bytes is not None else dataframe_memory_bytes(df)
+
+def _compact_result(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply DTYPE_COMPACTION_CONFIG to a fresh backend result and record the memory saved"""
+    if not DTYPE_COMPACTION_CONFIG["enabled"]:
+        return df
+    df, before, after = compact_dataframe(
+        df,
+        max_category_ratio=DTYPE_COMPACTION_CONFIG["max_category_ratio"],
+        min_int_bits=DTYPE_COMPACTION_CONFIG["min_int_bits"],
+        downcast_floats=DTYPE_COMPACTION_CONFIG["downcast_floats"],
+        arrow_strings=DTYPE_COMPACTION_CONFIG["arrow_strings"]
+    )
+    _annotate_query(raw_memory_bytes=before, compacted_memory_bytes=after)
+    return df
+
+def _inspect_query_plan(query: str, job_stats: dict, df: pd.DataFrame) -> None:
+    """
+    Flag a backend execution that scanned every partition or read far more than it returned
+    
+    Flags are stored with the result (df.attrs["plan_flags"]), so they travel
+    through the memory, disk and shared caches and are reported by
+    _report_plan_flags whenever the result is served.
+    """
+    if not PLAN_INSPECTION_CONFIG["enabled"]:
+        return
+    flags = find_plan_issues(
+        query,
+        job_stats.get("bytes_processed"),
+        dataframe_memory_bytes(df),
+        max_read_amplification=PLAN_INSPECTION_CONFIG["max_read_amplification"],
+        min_bytes_processed=PLAN_INSPECTION_CONFIG["min_bytes_processed"]
+    )
+    if flags:
+        df.attrs["plan_flags"] = flags
+
+def _report_plan_flags(df: pd.DataFrame) -> None:
+    """
+    Report the plan flags of a served result, however it was served
+    
+    Flags are added to the telemetry record (plan_flags) and, in developer
+    mode, shown under the chart that issued the query on every render.
+    """
+    flags = df.attrs.get("plan_flags")
+    if not flags:
+        return
+    _annotate_query(plan_flags=list(flags))
+    if DEV_MODE:
+        st.caption("🔎 " + " · ".join(flags))
+
+def get_query_telemetry() -> list:
+    """
+    Get the buffered per-query telemetry records
+    
+    Returns:
+        List of dictionaries with page, function, source, wall_ms, job statistics,
+        rows and memory_bytes
+    """
+    return query_telemetry.records()
+
+def export_query_telemetry() -> str:
+    """Export the buffered per-query telemetry records as JSON"""
+    return query_telemetry.to_json()
+
+def get_memory_cache_stats() -> dict:
+    """
+    Get hit/miss counters and memory usage of the in-process result cache
+    
+    Returns:
+        Dictionary with hits, misses, hit_rate, evictions, rejected, entries, size_mb and max_size_mb
+    """
+    return query_memory_cache.stats()
+
+def get_single_flight_stats() -> dict:
+    """
+    Get request coalescing counters
+    
+    Returns:
+        Dictionary with executions, coalesced (duplicate executions avoided) and in_flight
+    """
+    return query_single_flight.stats()
+
+def get_hedging_stats() -> dict:
+    """
+    Get hedged execution counters
+    
+    Returns:
+        Dictionary with templates, samples, hedged and hedge_wins
+    """
+    return query_latency_history.stats()
+
+def get_job_control_stats() -> dict:
+    """
+    Get query job deadline and cancellation counters
+    
+    Returns:
+        Dictionary with running, sessions, cancelled and timed_out
+    """
+    return query_job_registry.stats()
+
+def get_session_slice_stats() -> dict:
+    """
+    Get filtered slice counters and memory usage
+    
+    Returns:
+        Dictionary with slices, sessions, active, rows, size_mb, max_size_mb,
+        created, reused, dropped and queries
+    """
+    return session_slices.stats()
+
+@st.cache_resource
+def get_result_cache() -> Optional[ParquetResultCache]:
+    """Get the shared on-disk Parquet result cache, or None when disabled"""
+    if not DISK_CACHE_CONFIG["enabled"]:
+        return None
+    try:
+        return ParquetResultCache(
+            DISK_CACHE_CONFIG["directory"],
+            DISK_CACHE_CONFIG["max_size_mb"]
+        )
+    except OSError as e:
+        logger.warning("Disk result cache unavailable: %s", e)
+        return None
+
+def get_result_cache_stats() -> dict:
+    """
+    Get hit/miss counters and disk usage of the persistent result cache
+    
+    Returns:
+        Dictionary of cache stats (empty when the disk cache is disabled)
+    """
+    cache = get_result_cache()
+    return cache.stats() if cache is not None else {}
+
+@st.cache_resource
+def get_shared_cache() -> Optional[RedisResultCache]:
+    """Get the cross-replica Redis result cache, or None when no URL is configured"""
+    if not SHARED_CACHE_CONFIG["url"]:
+        return None
+    try:
+        return RedisResultCache.from_url(
+            SHARED_CACHE_CONFIG["url"],
+            socket_timeout=SHARED_CACHE_CONFIG["socket_timeout_seconds"],
+            ttl_seconds=SHARED_CACHE_CONFIG["ttl_seconds"],
+            key_prefix=SHARED_CACHE_CONFIG["key_prefix"],
+            compression=SHARED_CACHE_CONFIG["compression"],
+            max_entry_mb=SHARED_CACHE_CONFIG["max_entry_mb"],
+            retry_after_seconds=SHARED_CACHE_CONFIG["retry_after_seconds"]
+        )
+    except Exception as e:
+        logger.warning("Shared result cache unavailable: %s", e)
+        return None
+
+def get_shared_cache_stats() -> dict:
+    """
+    Get hit/miss counters of the cross-replica result cache
+    
+    Returns:
+        Dictionary of cache stats (empty when the shared cache is disabled)
+    """
+    cache = get_shared_cache()
+    return cache.stats() if cache is not None else {}
+
+@st.cache_resource
+def get_query_backend() -> Optional[QueryBackend]:
+    """Get the cached query backend selected by QUERY_BACKEND in config/settings.py"""
+    backend_type = QUERY_BACKEND["type"]
+    try:
+        client = get_bigquery_client() if backend_type == "bigquery" else None
+        return create_backend(
+            backend_type,
+            client=client,
+            data_dir=QUERY_BACKEND["duckdb_data_dir"],
+            table_names=list(ANALYTICS_TABLES.values()),
+            snapshot_dir=QUERY_BACKEND["arrow_snapshot_dir"]
+        )
+    except Exception as e:
+        st.error(f"Failed to initialize {backend_type} query backend: {str(e)}")
+        return None
+
+def get_download_stats() -> list:
+    """
+    Get recent download timings for comparing the REST and Storage API paths
+    
+    Returns:
+        List of dictionaries with label, path, rows, seconds and rows_per_sec
+    """
+    return backends.get_download_stats()
+
+@st.cache_data(ttl=CACHE_TTL["table_versions"], show_spinner=False)
+def get_table_metadata(project_id: str, dataset_id: str) -> Dict[str, dict]:
+    """
+    Get row count, size and modification time of every table in a dataset
+    
+    Uses a single metadata lookup per dataset (__TABLES__ on BigQuery, the
+    loaded Parquet files on DuckDB), re-checked at most every
+    CACHE_TTL["table_versions"] seconds. The same snapshot versions cached
+    query results and fills the pages' Data Source Information panels.
+    
+    Args:
+        project_id: BigQuery project ID
+        dataset_id: BigQuery dataset ID
+    
+    Returns:
+        Dictionary of table name to num_rows, size_mb, created, modified,
+        last_modified_ms and description
+    
+    Raises:
+        QueryFailedError: If there is no backend; backend errors propagate too.
+            Either way nothing is cached, so the next call retries the lookup.
+    """
+    backend = get_query_backend()
+    if backend is None:
+        raise QueryFailedError("Error reading table metadata: no query backend available")
+    return backend.get_table_metadata(project_id, dataset_id)
+
+def get_table_versions(project_id: str, dataset_id: str) -> Dict[str, int]:
+    """
+    Get the last modification time of every table in a dataset
+    
+    Args:
+        project_id: BigQuery project ID
+        dataset_id: BigQuery dataset ID
+    
+    Returns:
+        Dictionary of table name to last_modified_time (epoch milliseconds),
+        empty if the metadata lookup failed
+    """
+    try:
+        metadata = get_table_metadata(project_id, dataset_id)
+    except Exception as e:
+        logger.warning("Could not read table metadata for %s.%s: %s", project_id, dataset_id, e)
+        return {}
+    return {table_name: info["last_modified_ms"] for table_name, info in metadata.items()}
+
+def refresh_table_versions(project_id: str = BIGQUERY_CONFIG["project_id"],
+                           dataset_id: str = BIGQUERY_CONFIG["dataset_id"]) -> List[str]:
+    """
+    Re-read table modification times now and drop shared results of rebuilt tables
+    
+    Called after a dbt run so the new table versions are used immediately and
+    results computed from the previous versions leave the shared cache instead
+    of lingering until their TTL.
+    
+    Args:
+        project_id: BigQuery project ID
+        dataset_id: BigQuery dataset ID
+    
+    Returns:
+        Names of the tables whose version changed
+    """
+    previous = get_table_versions(project_id, dataset_id)
+    get_table_metadata.clear()
+    current = get_table_versions(project_id, dataset_id)
+    # Tables missing from a failed or earlier lookup are not known to have changed
+    changed = sorted(
+        name for name, modified in current.items() if name in previous and previous[name] != modified
+    )
+    
+    shared_cache = get_shared_cache()
+    if shared_cache is not None and changed:
+        deleted = shared_cache.invalidate_tables(f"{project_id}.{dataset_id}.{name}" for name in changed)
+        logger.info("Dropped %s shared results of rebuilt tables %s", deleted, ", ".join(changed))
+    return changed
+
+def get_query_version(query: str) -> str:
+    """
+    Build a version token for a query from its source tables' modification times
+    
+    Results cached under this token stay valid until a dbt rebuild changes
+    one of the referenced tables. Queries over tables with no known version
+    fall back to a CACHE_TTL["data_queries"] time bucket.
+    
+    Args:
+        query: SQL query string
+    
+    Returns:
+        Version token string
+    """
+    parts = []
+    unversioned = False
+    for project_id, dataset_id, table_name in extract_table_refs(query):
+        modified = get_table_versions(project_id, dataset_id).get(table_name)
+        if modified is None:
+            unversioned = True
+        else:
+            parts.append(f"{project_id}.{dataset_id}.{table_name}@{modified}")
+    
+    if unversioned or not parts:
+        parts.append(f"ttl@{int(time.time() // CACHE_TTL['data_queries'])}")
+    return "|".join(parts)
+
+def query_analytics_data(
+    table_name: str,
+    limit: Optional[int] = None,
+    use_storage_api: Optional[bool] = None,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Iterable] = None,
+    order_by: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
     """
     Query data from analytics OBT tables
     
+    Projecting only the needed columns and filtering on the partition and
+    cluster columns (see ANALYTICS_TABLE_LAYOUTS) cuts the bytes BigQuery scans.
+    
     Args:
         table_name: Name of the analytics OBT table (without project/dataset prefix)
         limit: Optional limit for number of rows
+        use_storage_api: Download through the Storage Read API as Arrow record batches
+            (defaults to DOWNLOAD_CONFIG, falls back to REST if the storage client is missing)
+        columns: Optional list of columns to select (defaults to all columns)
+        filters: Optional Equals / InList / DateRange predicates from utils.query_builder
+        order_by: Optional list of columns, each optionally followed by ASC or DESC
     
     Returns:
         DataFrame with query results
+    
+    Example:
+        query_analytics_data(
+            "revenue_analytics_obt",
+            columns=["order_date", "customer_state", "item_price"],
+            filters=[DateRange("order_date", date(2018, 1, 1), date(2018, 3, 31)),
+                     InList("customer_state", ["SP", "RJ"])]
+        )
     """
-    client = get_bigquery_client()
-    if client is None:
-        return pd.DataFrame()
+    if use_storage_api is None:
+        use_storage_api = DOWNLOAD_CONFIG["use_storage_api"]
     
     # Use configuration from settings
     project_id = BIGQUERY_CONFIG["project_id"]
     dataset_id = BIGQUERY_CONFIG["dataset_id"]
     
-    query = f"""
-    SELECT * 
-    FROM `{project_id}.{dataset_id}.{table_name}`
-    """
+    try:
+        query, params = build_select_query(
+            f"`{project_id}.{dataset_id}.{table_name}`",
+            table_name,
+            columns=columns,
+            filters=filters,
+            order_by=order_by,
+            limit=limit
+        )
+    except ValueError as e:
+        st.error(f"Invalid query for {table_name}: {str(e)}")
+        return pd.DataFrame()
+    
+    return _query_analytics_data(
+        query, freeze_params(params), table_name, use_storage_api, get_query_version(query)
+    )
+
+def _query_analytics_data(
+    query: str,
+    params: tuple,
+    table_name: str,
+    use_storage_api: bool,
+    version: str
+) -> pd.DataFrame:
+    """Run a table read, cached in memory per parameter values until the table version changes"""
+    cache_key = ("table", normalize_sql(query), params, use_storage_api, version)
+    cached_df = query_memory_cache.get(cache_key)
+    if cached_df is not None:
+        return cached_df
     
-    if limit:
-        query += f" LIMIT {limit}"
+    backend = get_query_backend()
+    if backend is None:
+        return pd.DataFrame()
     
     try:
-        df = client.query(query).to_dataframe()
-        return df
+        df = backend.run_query(
+            query, dict(params), label=table_name, use_storage_api=use_storage_api
+        )
     except Exception as e:
         st.error(f"Error querying {table_name}: {str(e)}")
         return pd.DataFrame()
+    df = _compact_result(df)
+    query_memory_cache.put(cache_key, df)
+    return df.copy(deep=False)
 
-@st.cache_data(ttl=3600)
-def execute_custom_query(query: str) -> pd.DataFrame:
+@st.cache_data(show_spinner=False)
+def _estimate_query_bytes(normalized_query: str, params: tuple, version: str, _query: str) -> Optional[int]:
     """
-    Execute a custom BigQuery SQL query
+    Dry-run a query once per normalized SQL text, parameter values and table version
+    
+    The original text is what gets dry-run (the leading underscore keeps it out
+    of the cache key), so it is the same SQL that would be executed.
+    """
+    backend = get_query_backend()
+    if backend is None:
+        return None
+    return backend.estimate_bytes(_query, dict(params))
+
+def estimate_query_bytes(query: str, params: Optional[dict] = None) -> Optional[int]:
+    """
+    Estimate the bytes a query would process with a cached dry run
     
     Args:
         query: SQL query string
-        
+        params: Optional named query parameters
+    
     Returns:
-        DataFrame with query results
+        Estimated bytes processed, or None if the backend does not bill by bytes
     """
-    client = get_bigquery_client()
-    if client is None:
-        return pd.DataFrame()
+    return _estimate_query_bytes(normalize_sql(query), freeze_params(params), get_query_version(query), query)
+
+def _format_bytes(num_bytes: float) -> str:
+    """Format a byte count for user-facing messages"""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if num_bytes < 1024:
+            return f"{num_bytes:,.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:,.1f} TB"
+
+def _apply_cost_guard(query: str, params: tuple, version: str) -> Tuple[Optional[str], bool]:
+    """
+    Check a query against the per-query byte budget before it runs
+    
+    Args:
+        query: SQL query string
+        params: Frozen named query parameters
+        version: Table version token of the query
+    
+    Returns:
+        (query to run, whether the query was downgraded to a sample)
+    
+    Raises:
+        QueryFailedError: If the query is over budget and cannot be sampled
+    """
+    estimated_bytes = _estimate_query_bytes(normalize_sql(query), params, version, query)
+    _annotate_query(estimated_bytes=estimated_bytes)
+    budget = COST_GUARD_CONFIG["max_bytes_per_query"]
+    if estimated_bytes is None or estimated_bytes <= budget:
+        return query, False
+    
+    over_budget = (
+        f"This query would scan {_format_bytes(estimated_bytes)}, "
+        f"over the {_format_bytes(budget)} per-query budget."
+    )
+    sampled_query = add_table_sample(query, COST_GUARD_CONFIG["sample_percent"])
+    if COST_GUARD_CONFIG["over_budget_action"] == "sample" and sampled_query != query:
+        _annotate_query(cost_guard="sampled")
+        st.warning(
+            f"⚠️ {over_budget} Showing results from a "
+            f"{COST_GUARD_CONFIG['sample_percent']}% table sample instead."
+        )
+        return sampled_query, True
     
+    _annotate_query(cost_guard="refused")
+    raise QueryFailedError(f"🚫 Query refused: {over_budget}")
+
+def execute_custom_query(
+    query: str,
+    params: Optional[dict] = None,
+    dry_run: Optional[bool] = None,
+    timeout: Optional[float] = None,
+    hedge: Optional[bool] = None
+) -> pd.DataFrame:
+    """
+    Execute a custom BigQuery SQL query
+    
+    Results are cached against the modification time of every referenced
+    table, so they stay valid until a dbt run rebuilds one of them. Results
+    missing from the in-memory cache are looked up in the on-disk Parquet
+    cache before running a BigQuery job.
+    
+    Filter values should be passed as named parameters rather than formatted
+    into the SQL: the cache key is the template plus the bound values, so one
+    template serves every filter selection and values are never injected.
+    Inside a filtered_slice block, queries whose WHERE clause applies the
+    slice's filters run locally against the slice instead.
+    
+    Args:
+        query: SQL query string, referencing parameters as @name
+        params: Optional mapping of parameter name to value (lists bind as
+            ARRAY parameters, e.g. `customer_state IN UNNEST(@states)`)
+        dry_run: Dry-run uncached queries against the COST_GUARD_CONFIG byte budget
+            (defaults to COST_GUARD_CONFIG["enabled"])
+        timeout: Seconds before the backend job is cancelled
+            (defaults to QUERY_TIMEOUT_CONFIG["timeout_seconds"])
+        hedge: Submit a duplicate job if the query runs past the HEDGING_CONFIG
+            percentile of its latency history, keeping the first result
+            (defaults to HEDGING_CONFIG["enabled"])
+    
+    Returns:
+        DataFrame with query results (empty if the query failed, timed out or
+        was cancelled because the page rerun)
+    """
+    if dry_run is None:
+        dry_run = COST_GUARD_CONFIG["enabled"]
+    if timeout is None:
+        timeout = QUERY_TIMEOUT_CONFIG["timeout_seconds"]
+    if hedge is None:
+        hedge = HEDGING_CONFIG["enabled"]
+    
+    frozen_params = freeze_params(params)
+    with _query_telemetry(query) as record:
+        record["params"] = dict(frozen_params)
+        df = _query_filtered_slice(query, frozen_params)
+        if df is None:
+            try:
+                df = _execute_versioned_query(
+                    query, frozen_params, get_query_version(query), dry_run, timeout, hedge
+                )
+            except QueryTimeoutError as e:
+                _annotate_query(source="timeout", error=str(e))
+                st.error(f"⏱️ Query timed out: {str(e)}")
+                df = pd.DataFrame()
+            except QueryCancelledError:
+                # The run that wanted this result is already gone; nothing to show
+                _annotate_query(source="cancelled")
+                df = pd.DataFrame()
+            except QueryFailedError as e:
+                st.error(str(e))
+                df = pd.DataFrame()
+        _report_plan_flags(df)
+        _measure_result(record, df)
+    return df
+
+def _execute_versioned_query(
+    query: str,
+    params: tuple,
+    version: str,
+    dry_run: bool = False,
+    timeout: Optional[float] = None,
+    hedge: bool = False
+) -> pd.DataFrame:
+    """
+    Run a query through the memory, disk and shared caches and the query backend
+    
+    Results are cached in memory per table version under the
+    MEMORY_CACHE_CONFIG budget. Concurrent misses for the same normalized query
+    share one execution. Failures, timeouts and cancellations propagate as
+    exceptions so they are never cached; the timeout and hedging are not part
+    of the cache key.
+    """
+    cache_key = (
+        BIGQUERY_CONFIG["project_id"], BIGQUERY_CONFIG["dataset_id"],
+        normalize_sql(query), params, version, dry_run
+    )
+    cached_df = query_memory_cache.get(cache_key)
+    if cached_df is not None:
+        _annotate_query(cached_memory_bytes=query_memory_cache.entry_bytes(cache_key))
+        return cached_df
+    
+    def load() -> pd.DataFrame:
+        loaded_df = _load_query_result(query, params, version, dry_run, timeout, hedge)
+        query_memory_cache.put(cache_key, loaded_df)
+        return loaded_df
+    
+    while True:
+        try:
+            df, shared = query_single_flight.do(cache_key, load)
+            break
+        except QueryCancelledError:
+            # A shared execution was abandoned by another session's rerun;
+            # run it again unless this run is being abandoned too
+            if _run_abandoned(get_script_run_ctx(suppress_warning=True)):
+                raise
+    if shared:
+        _annotate_query(source="coalesced")
+    _annotate_query(cached_memory_bytes=query_memory_cache.entry_bytes(cache_key))
+    return df.copy(deep=False)
+
+def _run_abandoned(ctx) -> bool:
+    """Whether a script run was superseded by a rerun or page change, or its session ended"""
+    if ctx is None:
+        return False
+    return script_run_superseded(ctx) or not _session_is_active(ctx.session_id)
+
+def _make_job_control(timeout: Optional[float]) -> JobControl:
+    """Build the deadline and abandonment policy for a query started by the current run"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    cancel_abandoned = QUERY_TIMEOUT_CONFIG["cancel_abandoned"]
+    return JobControl(
+        query_job_registry,
+        session_id=ctx.session_id if ctx is not None else "none",
+        timeout=timeout,
+        should_cancel=lambda: cancel_abandoned and _run_abandoned(ctx),
+        poll_interval=QUERY_TIMEOUT_CONFIG["poll_interval_seconds"]
+    )
+
+def _load_query_result(
+    query: str,
+    params: tuple,
+    version: str,
+    dry_run: bool,
+    timeout: Optional[float] = None,
+    hedge: bool = False
+) -> pd.DataFrame:
+    """
+    Load a query result from the disk cache, the shared cache, or the query backend
+    
+    Local disk is checked first; shared hits are copied to disk so later
+    restarts of this replica do not depend on the shared server.
+    
+    Raises:
+        QueryFailedError: If there is no backend, the cost guard refused the
+            query or the backend failed; nothing is written to any cache
+    """
+    cache_key = ParquetResultCache.make_key(
+        query, BIGQUERY_CONFIG["project_id"], BIGQUERY_CONFIG["dataset_id"], version, params
+    )
+    disk_cache = get_result_cache()
+    if disk_cache is not None:
+        cached_df = disk_cache.get(cache_key)
+        if cached_df is not None:
+            _annotate_query(source="disk")
+            return cached_df
+    
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        cached_df = shared_cache.get(cache_key, version)
+        if cached_df is not None:
+            _annotate_query(source="shared")
+            if disk_cache is not None:
+                disk_cache.put(cache_key, cached_df)
+            return cached_df
+    
+    backend = get_query_backend()
+    if backend is None:
+        raise QueryFailedError("Error executing query: no query backend available")
+    
+    run_query, sampled = query, False
     try:
-        df = client.query(query).to_dataframe()
-        return df
+        if dry_run:
+            run_query, sampled = _apply_cost_guard(query, params, version)
+        latency_key = normalize_sql(run_query)
+        hedge_after = query_latency_history.hedge_delay(latency_key) if hedge else None
+        started = time.perf_counter()
+        df, job_stats = backend.run_query_with_stats(
+            run_query, dict(params), control=_make_job_control(timeout), hedge_after=hedge_after
+        )
+        query_latency_history.record(latency_key, time.perf_counter() - started)
+        if job_stats.get("hedged"):
+            query_latency_history.record_hedge(job_stats["hedge_won"])
+    except (QueryTimeoutError, QueryCancelledError, QueryFailedError):
+        raise
     except Exception as e:
-        st.error(f"Error executing query: {str(e)}")
-        return pd.DataFrame()
+        _annotate_query(source="error", error=str(e))
+        raise QueryFailedError(f"Error executing query: {str(e)}") from e
+    _annotate_query(source="backend", backend=backend.name, **job_stats)
+    df = _compact_result(df)
+    _inspect_query_plan(run_query, job_stats, df)
+    
+    # Sampled results must not outlive a budget change in the persistent caches
+    if not sampled:
+        if disk_cache is not None:
+            disk_cache.put(cache_key, df)
+        if shared_cache is not None:
+            tables = [".".join(ref) for ref in extract_table_refs(query)]
+            shared_cache.put(cache_key, df, version, tables)
+    return df
+
+def _session_is_active(session_id: str) -> bool:
+    """Whether a Streamlit session is still connected (always True outside a Streamlit server)"""
+    return not Runtime.exists() or Runtime.instance().is_active_session(session_id)
+
+def _load_filtered_slice(session_id: str, table_name: str, filters: list) -> Optional[FilteredSlice]:
+    """
+    Get a session's slice of a table for a filter set, downloading it if needed
+    
+    Returns:
+        FilteredSlice, or None if the filters match more than
+        SESSION_SLICE_CONFIG["max_rows"] rows or the download failed
+    """
+    project_id = BIGQUERY_CONFIG["project_id"]
+    dataset_id = BIGQUERY_CONFIG["dataset_id"]
+    try:
+        query, params = build_select_query(
+            f"`{project_id}.{dataset_id}.{table_name}`", table_name, filters=filters
+        )
+    except ValueError as e:
+        st.error(f"Invalid filters for {table_name}: {str(e)}")
+        return None
+    
+    frozen_params = freeze_params(params)
+    filter_key = (normalize_sql(query), frozen_params, get_query_version(query))
+    slice_ = session_slices.get(session_id, table_name, filter_key)
+    if slice_ is not None:
+        return slice_
+    
+    session_slices.prune(_session_is_active)
+    count_df = execute_custom_query(f"SELECT COUNT(*) AS row_count FROM ({query})", params)
+    if count_df.empty or int(count_df["row_count"].iloc[0]) > SESSION_SLICE_CONFIG["max_rows"]:
+        return None
+    
+    backend = get_query_backend()
+    if backend is None:
+        return None
+    
+    with _query_telemetry(query) as record:
+        record["params"] = dict(frozen_params)
+        try:
+            batches = list(backend.iter_query_batches(
+                query, params, chunk_rows=STREAMING_CONFIG["chunk_rows"],
+                use_storage_api=DOWNLOAD_CONFIG["use_storage_api"],
+                control=_make_job_control(QUERY_TIMEOUT_CONFIG["timeout_seconds"])
+            ))
+        except Exception as e:
+            # The page's own queries still run against the full table
+            _annotate_query(source="error", error=str(e))
+            logger.warning("Could not load filtered slice of %s: %s", table_name, e)
+            return None
+        _annotate_query(source="slice_load")
+        if not batches:
+            return None
+        table = pa.Table.from_batches(batches)
+        _annotate_query(rows=table.num_rows, memory_bytes=table.nbytes)
+    
+    slice_ = FilteredSlice(project_id, dataset_id, table_name, filter_key, filters, table)
+    session_slices.put(session_id, slice_)
+    return slice_
+
+@contextmanager
+def filtered_slice(table_name: str, filters: Optional[Iterable] = None) -> Iterator[Optional[FilteredSlice]]:
+    """
+    Answer the filtered page queries inside the block from a local slice of a table
+    
+    The rows matching the filters are downloaded once per session and filter
+    set; queries run inside the block that read only this table and apply
+    every filter in their WHERE clause (as build_where_clause compiles it, with
+    the same values) then run locally (through DuckDB) instead of scanning the
+    full table again, so their result is the same whether or not the slice is used.
+    
+    A session keeps one slice per table: changing the filters replaces it, and
+    it is dropped when the session ends or after SESSION_SLICE_CONFIG["idle_seconds"].
+    
+    Args:
+        table_name: Analytics OBT table name (without project/dataset prefix)
+        filters: Equals / InList / DateRange predicates from utils.query_builder
+    
+    Yields:
+        The active FilteredSlice, or None if no slice is used (no filters, no
+        Streamlit session, too many matching rows or slices disabled)
+    
+    Example:
+        filters = [InList("customer_state", states)]
+        with filtered_slice(ANALYTICS_TABLES["revenue"], filters):
+            overview_df = get_revenue_overview(states)
+            trend_df = get_revenue_trend(states)
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    filters = list(filters or [])
+    slice_ = None
+    if ctx is not None and filters and SESSION_SLICE_CONFIG["enabled"]:
+        slice_ = _load_filtered_slice(ctx.session_id, table_name, filters)
+    if slice_ is None:
+        yield None
+        return
+    
+    session_slices.activate(ctx.session_id, slice_)
+    try:
+        yield slice_
+    finally:
+        session_slices.deactivate(ctx.session_id, slice_)
+
+def _query_filtered_slice(query: str, params: tuple) -> Optional[pd.DataFrame]:
+    """
+    Answer a query from the current session's active filtered slice
+    
+    Returns:
+        DataFrame with query results, or None if no slice covers the query or
+        the slice could not run it (the caller then queries the full table)
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    slice_ = session_slices.find(ctx.session_id, query, params)
+    if slice_ is None:
+        return None
+    
+    try:
+        df = slice_.run(query, dict(params))
+    except Exception as e:
+        logger.warning("Filtered slice of %s could not run query, using the full table: %s",
+                       slice_.table_name, e)
+        return None
+    _annotate_query(source="slice", slice_rows=slice_.num_rows)
+    return _compact_result(df)
+
+def _load_columnar_store(table_name: str) -> Optional[ColumnarStore]:
+    """
+    Get the process-wide columnar store of a table, (re)loading it when the table version changed
+    
+    Returns:
+        ColumnarStore, or None if the table is not configured, too large or could not be loaded
+    """
+    columns = COLUMNAR_STORE_CONFIG["tables"].get(table_name)
+    if not columns:
+        return None
+    
+    project_id = BIGQUERY_CONFIG["project_id"]
+    dataset_id = BIGQUERY_CONFIG["dataset_id"]
+    query, params = build_select_query(
+        f"`{project_id}.{dataset_id}.{table_name}`", table_name, columns=columns
+    )
+    version = get_query_version(query)
+    with _columnar_lock:
+        store = columnar_stores.get(table_name)
+    if store is not None and store.version == version:
+        return store
+    
+    try:
+        num_rows = get_table_metadata(project_id, dataset_id).get(table_name, {}).get("num_rows")
+    except Exception as e:
+        # Without a row count the table might be too large to load; use SQL for now
+        logger.warning("Not loading the columnar store of %s, table metadata unavailable: %s", table_name, e)
+        return None
+    if num_rows is not None and num_rows > COLUMNAR_STORE_CONFIG["max_rows"]:
+        return None
+    backend = get_query_backend()
+    if backend is None:
+        return None
+    
+    def load() -> ColumnarStore:
+        with _query_telemetry(query) as record:
+            batches = list(backend.iter_query_batches(
+                query, params, chunk_rows=STREAMING_CONFIG["chunk_rows"],
+                use_storage_api=DOWNLOAD_CONFIG["use_storage_api"],
+                control=_make_job_control(QUERY_TIMEOUT_CONFIG["timeout_seconds"])
+            ))
+            df = pa.Table.from_batches(batches).to_pandas() if batches else pd.DataFrame(columns=columns)
+            loaded = ColumnarStore(df, version)
+            _annotate_query(source="columnar_load", memory_bytes=loaded.memory_bytes)
+            record["rows"] = loaded.num_rows
+        return loaded
+    
+    try:
+        # Sessions hitting a version change together share one load
+        store, _ = query_single_flight.do(("columnar", table_name, version), load)
+    except Exception as e:
+        # Pages fall back to aggregating through the query backend
+        logger.warning("Could not load columnar store of %s: %s", table_name, e)
+        return None
+    
+    with _columnar_lock:
+        columnar_stores[table_name] = store
+    return store
+
+def columnar_store_available(table_name: str) -> bool:
+    """Whether aggregate_locally can answer queries on a table (loading its store if needed)"""
+    return COLUMNAR_STORE_CONFIG["enabled"] and _load_columnar_store(table_name) is not None
+
+def aggregate_locally(
+    table_name: str,
+    metrics: Dict[str, Tuple[str, Optional[str]]],
+    by: Optional[Sequence] = None,
+    filters: Optional[Iterable] = None
+) -> Optional[pd.DataFrame]:
+    """
+    Aggregate an analytics OBT table in process from its columnar store
+    
+    The columns listed in COLUMNAR_STORE_CONFIG["tables"] are loaded once per
+    table version and kept as compact NumPy arrays, so grouped sums, counts
+    and distinct counts - filtered or not - take milliseconds instead of a
+    BigQuery round trip.
+    
+    Args:
+        table_name: Analytics OBT table name (without project/dataset prefix)
+        metrics: Output column to (function, column), see ColumnarStore.aggregate
+        by: Group-by columns, or (date column, "month" / "year") for a date grain
+        filters: Equals / InList / DateRange predicates from utils.query_builder
+    
+    Returns:
+        DataFrame with one row per group, or None if the table has no columnar
+        store (the caller then runs its SQL query instead)
+    
+    Example:
+        state_df = aggregate_locally(
+            "revenue_analytics_obt",
+            {"state_revenue": ("sum", "item_price"), "orders": ("nunique", "order_id")},
+            by=["customer_state"]
+        )
+    """
+    if not COLUMNAR_STORE_CONFIG["enabled"]:
+        return None
+    store = _load_columnar_store(table_name)
+    if store is None:
+        return None
+    
+    keys = [key if isinstance(key, str) else f"{key[1]}({key[0]})" for key in by or []]
+    description = f"LOCAL {table_name}: {', '.join(metrics)}"
+    if keys:
+        description += f" BY {', '.join(keys)}"
+    with _query_telemetry(description) as record:
+        record["params"] = {f"filter_{i}": repr(predicate) for i, predicate in enumerate(filters or [])}
+        try:
+            df = store.aggregate(metrics, by=by, filters=filters)
+        except ValueError as e:
+            _annotate_query(source="error", error=str(e))
+            logger.warning("Columnar store of %s cannot answer %s: %s", table_name, description, e)
+            return None
+        _annotate_query(source="columnar", store_rows=store.num_rows)
+        _measure_result(record, df)
+    return df
+
+def get_columnar_store_stats() -> list:
+    """
+    Get size and version of each loaded columnar store
+    
+    Returns:
+        List of dictionaries with table, rows, columns, memory_mb and version
+    """
+    with _columnar_lock:
+        stores = dict(columnar_stores)
+    return [
+        {
+            "table": table_name,
+            "rows": store.num_rows,
+            "columns": len(store.columns),
+            "memory_mb": round(store.memory_bytes / (1024 * 1024), 2),
+            "version": store.version
+        }
+        for table_name, store in stores.items()
+    ]
+
+def iter_query_chunks(
+    query: str,
+    params: Optional[dict] = None,
+    chunk_rows: Optional[int] = None,
+    as_arrow: bool = False,
+    use_storage_api: Optional[bool] = None,
+    timeout: Optional[float] = None
+) -> Iterator[Union[pd.DataFrame, pa.RecordBatch]]:
+    """
+    Run a query and yield its result in bounded chunks
+    
+    For results too large to hold at once (raw-row exports, customer-level
+    tables): only about one chunk is held in memory at a time, so callers can
+    aggregate, write or render progressively. Streams bypass the result caches.
+    
+    Args:
+        query: SQL query string, referencing parameters as @name
+        params: Optional mapping of parameter name to value
+        chunk_rows: Maximum rows per chunk (defaults to STREAMING_CONFIG["chunk_rows"])
+        as_arrow: Yield Arrow record batches instead of DataFrames
+        use_storage_api: Read through the Storage Read API (defaults to DOWNLOAD_CONFIG)
+        timeout: Seconds before the backend job is cancelled
+            (defaults to QUERY_TIMEOUT_CONFIG["timeout_seconds"])
+    
+    Yields:
+        DataFrames (or record batches) of at most chunk_rows rows
+    
+    Raises:
+        QueryTimeoutError: The deadline passed mid-stream
+        QueryCancelledError: The starting script run was superseded
+        QueryFailedError: No backend is available, or the backend failed mid-stream;
+            chunks already yielded are an incomplete result
+    
+    Example:
+        for chunk in iter_query_chunks(query, {"states": ["SP", "RJ"]}):
+            totals = totals.add(chunk.groupby("customer_state")["item_price"].sum(), fill_value=0)
+    """
+    chunk_rows = chunk_rows or STREAMING_CONFIG["chunk_rows"]
+    if use_storage_api is None:
+        use_storage_api = DOWNLOAD_CONFIG["use_storage_api"]
+    if timeout is None:
+        timeout = QUERY_TIMEOUT_CONFIG["timeout_seconds"]
+    
+    backend = get_query_backend()
+    if backend is None:
+        raise QueryFailedError("Error streaming query: no query backend available")
+    
+    # Recorded by hand: the thread-local record of _query_telemetry must not
+    # stay active while the caller's code runs between chunks
+    page, function = find_caller()
+    record = {"page": page, "function": function, "source": "stream", "params": params or {}}
+    start = time.perf_counter()
+    rows, peak_bytes = 0, 0
+    batches = backend.iter_query_batches(
+        query, params, chunk_rows=chunk_rows, use_storage_api=use_storage_api,
+        control=_make_job_control(timeout)
+    )
+    try:
+        for batch in batches:
+            rows += batch.num_rows
+            peak_bytes = max(peak_bytes, batch.nbytes)
+            yield batch if as_arrow else batch.to_pandas()
+    except QueryTimeoutError as e:
+        record.update(source="timeout", error=str(e))
+        raise
+    except QueryCancelledError:
+        record["source"] = "cancelled"
+        raise
+    except Exception as e:
+        record.update(source="error", error=str(e))
+        raise QueryFailedError(f"Error streaming query: {str(e)}") from e
+    finally:
+        batches.close()
+        if TELEMETRY_CONFIG["enabled"]:
+            record.update(
+                rows=rows,
+                memory_bytes=peak_bytes,
+                wall_ms=round((time.perf_counter() - start) * 1000, 1),
+                timestamp=time.time(),
+                query=query
+            )
+            query_telemetry.record(record)
+
+def _run_batch_entry(entry: BatchQuery) -> pd.DataFrame:
+    """Run a single batch entry through the cached query path"""
+    if callable(entry):
+        return entry()
+    return execute_custom_query(entry)
+
+def iter_queries_as_completed(
+    queries: Dict[str, BatchQuery],
+    max_workers: Optional[int] = None
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Submit a batch of named queries at once and yield results as they finish
+    
+    Every entry goes through execute_custom_query (directly or via a page
+    get_* function), so results already held in the result caches are returned without
+    a BigQuery round trip.
+    
+    Args:
+        queries: Mapping of result name to SQL string or zero-argument callable
+        max_workers: Optional cap on concurrent jobs (defaults to QUERY_CONCURRENCY)
+    
+    Yields:
+        (name, DataFrame) tuples in completion order
+    """
+    if not queries:
+        return
+    
+    workers = max_workers or QUERY_CONCURRENCY["max_workers"]
+    workers = max(1, min(workers, len(queries)))
+    ctx = get_script_run_ctx()
+    
+    def run(name: str, entry: BatchQuery) -> pd.DataFrame:
+        # Attach the caller's script context so st.error and run cancellation work in the worker
+        if ctx is not None:
+            add_script_run_ctx(ctx=ctx)
+        return _run_batch_entry(entry)
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bq-batch") as executor:
+        futures = {
+            executor.submit(run, name, entry): name
+            for name, entry in queries.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                st.error(f"Error executing batch query {name}: {str(e)}")
+                df = pd.DataFrame()
+            yield name, df
+
+def execute_queries_concurrently(
+    queries: Dict[str, BatchQuery],
+    max_workers: Optional[int] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Execute a batch of named queries concurrently
+    
+    Page latency becomes roughly that of the slowest query instead of the sum
+    of every BigQuery round trip.
+    
+    Args:
+        queries: Mapping of result name to SQL string or zero-argument callable
+        max_workers: Optional cap on concurrent jobs (defaults to QUERY_CONCURRENCY)
+    
+    Returns:
+        Dictionary of DataFrames keyed by the same names, in input order
+    """
+    results = dict(iter_queries_as_completed(queries, max_workers=max_workers))
+    return {name: results.get(name, pd.DataFrame()) for name in queries}
 
 def get_table_info(table_name: str) -> dict:
     """
     Get metadata information about a table
     
+    Served from the dataset's cached metadata snapshot (get_table_metadata),
+    so pages make no metadata API call per rerun.
+    
     Args:
         table_name: Name of the table
-        
+    
     Returns:
-        Dictionary with table metadata
+        Dictionary with num_rows, size_mb, created, modified and description
     """
-    client = get_bigquery_client()
-    if client is None:
+    if get_query_backend() is None:
         return {}
     
     project_id = BIGQUERY_CONFIG["project_id"]
     dataset_id = BIGQUERY_CONFIG["dataset_id"]
     
     try:
-        table_ref = client.dataset(dataset_id, project=project_id).table(table_name)
-        table = client.get_table(table_ref)
-        
-        return {
-            "num_rows": table.num_rows,
-            "size_mb": round(table.num_bytes / (1024 * 1024), 2),
-            "created": table.created,
-            "modified": table.modified,
-            "description": table.description or "No description available"
-        }
+        info = get_table_metadata(project_id, dataset_id).get(table_name)
     except Exception as e:
         st.error(f"Error getting table info for {table_name}: {str(e)}")
         return {}
+    if info is None:
+        st.error(f"Error getting table info for {table_name}: not found in {project_id}.{dataset_id}")
+        return {}
+    return info
+
+# Every page imports this module, so the warmer starts on whichever page is
+# opened first, deep links included (not in scripts or tests, which run
+# outside a Streamlit server)
+if Runtime.exists():
+    from utils.cache_warmer import start_cache_warmer
+    start_cache_warmer()
@@ -0,0 +1,160 @@
+"""
+Persistent on-disk Parquet cache for query results
+
+Sits underneath the in-memory result cache so restarts, deploys and
+new worker processes can serve results without re-running BigQuery jobs.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from typing import Optional
+
+import pandas as pd
+
+from utils.sql import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+class ParquetResultCache:
+    """
+    Size-capped Parquet file cache with least-recently-used eviction
+    
+    File modification times track recency, so the LRU order is shared by
+    every process pointing at the same directory.
+    """
+    
+    def __init__(self, directory: str, max_size_mb: float):
+        self.directory = directory
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+    
+    @staticmethod
+    def make_key(query: str, project_id: str, dataset_id: str, version: str = "",
+                 params: tuple = ()) -> str:
+        """Build a cache key from normalized SQL, bound parameters, the target project/dataset and a table version token"""
+        payload = "\n".join([project_id, dataset_id, version, normalize_sql(query), repr(params)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.parquet")
+    
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Read a cached result
+        
+        Args:
+            key: Cache key from make_key
+            
+        Returns:
+            Cached DataFrame, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            df = pd.read_parquet(path)
+            # Touch the file so eviction treats it as recently used
+            os.utime(path, None)
+        except FileNotFoundError:
+            df = None
+        except Exception as e:
+            logger.warning("Discarding unreadable cache file %s: %s", path, e)
+            self._remove(path)
+            df = None
+        
+        with self._lock:
+            if df is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return df
+    
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        """
+        Write a result to the cache and evict old entries over the size cap
+        
+        Args:
+            key: Cache key from make_key
+            df: Query result to store
+        """
+        path = self._path(key)
+        # Write to a unique temp file and rename so readers never see partial files
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("Failed to write cache file %s: %s", path, e)
+            self._remove(tmp_path)
+            return
+        
+        with self._lock:
+            self.writes += 1
+        self._evict()
+    
+    def _remove(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+    
+    def _entries(self) -> list:
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".parquet"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def _evict(self) -> None:
+        """Delete least-recently-used files until the cache fits its size cap"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+    
+    def clear(self) -> None:
+        """Remove every cached result"""
+        for _, _, path in self._entries():
+            self._remove(path)
+    
+    def stats(self) -> dict:
+        """
+        Get cache counters and current disk usage
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, writes, evictions, entries and size_mb
+        """
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "size_mb": round(sum(size for _, size, _ in entries) / (1024 * 1024), 2),
+                "max_size_mb": round(self.max_bytes / (1024 * 1024), 2)
+            }
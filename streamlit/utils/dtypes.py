@@ -0,0 +1,117 @@
+"""
+Dtype compaction for query results
+
+BigQuery downloads return low-cardinality strings (customer_state,
+payment_type, satisfaction_level, ...) as object columns and every number as
+64-bit: nullable Int64 from the REST path, int64[pyarrow] from the Storage
+API path, plain int64/float64 from DuckDB. Compacting them once, before a result is cached, shrinks every
+cached copy and every serialized payload.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils.memory_cache import dataframe_memory_bytes
+
+_INTEGER_DTYPES = {8: np.int8, 16: np.int16, 32: np.int32, 64: np.int64}
+_NULLABLE_INTEGER_DTYPES = {8: "Int8", 16: "Int16", 32: "Int32", 64: "Int64"}
+_ARROW_INTEGER_TYPES = {8: pa.int8(), 16: pa.int16(), 32: pa.int32(), 64: pa.int64()}
+
+def _is_string_column(series: pd.Series) -> bool:
+    """Whether a column holds only Python/pandas strings (and nulls)"""
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return False
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return False
+    return pd.api.types.infer_dtype(series, skipna=True) == "string"
+
+def _narrower_integer_dtype(series: pd.Series, bits: int):
+    """The signed integer dtype of the given width in the same family (numpy, nullable or Arrow)"""
+    if isinstance(series.dtype, pd.ArrowDtype):
+        return pd.ArrowDtype(_ARROW_INTEGER_TYPES[bits])
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return _NULLABLE_INTEGER_DTYPES[bits]
+    return _INTEGER_DTYPES[bits]
+
+def _downcast_integer(series: pd.Series, min_int_bits: int) -> pd.Series:
+    """
+    Use the smallest signed integer type that holds every value, but no narrower than min_int_bits
+    
+    numpy, nullable (Int64) and Arrow (int64[pyarrow]) columns stay in their
+    own family, so nulls are kept.
+    """
+    if series.empty or series.isna().all():
+        return series
+    low, high = series.min(), series.max()
+    for bits in _INTEGER_DTYPES:
+        if bits < min_int_bits or bits >= series.dtype.itemsize * 8:
+            continue
+        info = np.iinfo(_INTEGER_DTYPES[bits])
+        if info.min <= low and high <= info.max:
+            return series.astype(_narrower_integer_dtype(series, bits))
+    return series
+
+def _downcast_float(series: pd.Series) -> pd.Series:
+    """Use float32 only when every value survives the round trip exactly"""
+    if series.dtype != np.float64:
+        return series
+    narrowed = series.astype(np.float32)
+    restored = narrowed.astype(np.float64)
+    if ((restored == series) | (series.isna() & restored.isna())).all():
+        return narrowed
+    return series
+
+def compact_dataframe(
+    df: pd.DataFrame,
+    max_category_ratio: float = 0.5,
+    min_int_bits: int = 32,
+    downcast_floats: bool = True,
+    arrow_strings: bool = False
+) -> Tuple[pd.DataFrame, int, int]:
+    """
+    Shrink a query result's dtypes without changing its values
+    
+    - String columns whose distinct values are at most max_category_ratio of
+      the rows become categoricals.
+    - Remaining string columns become Arrow-backed strings when arrow_strings is set.
+    - Integer columns (int64, nullable Int64 or int64[pyarrow]) are downcast to
+      the smallest integer type of the same family that fits, no narrower than
+      min_int_bits (narrow types overflow silently in arithmetic).
+    - float64 columns become float32 only when no value loses precision.
+    
+    Args:
+        df: Query result
+        max_category_ratio: Largest distinct/rows ratio converted to a categorical
+        min_int_bits: Narrowest integer width to downcast to (8, 16, 32 or 64)
+        downcast_floats: Try float32 for float64 columns
+        arrow_strings: Store high-cardinality strings as string[pyarrow]
+    
+    Returns:
+        (compacted DataFrame, memory bytes before, memory bytes after)
+    """
+    before = dataframe_memory_bytes(df)
+    if df.empty:
+        return df, before, before
+    
+    columns = {}
+    for name, series in df.items():
+        if _is_string_column(series):
+            if series.nunique(dropna=True) <= max_category_ratio * len(series):
+                columns[name] = series.astype("category")
+            elif arrow_strings:
+                columns[name] = series.astype("string[pyarrow]")
+        elif pd.api.types.is_integer_dtype(series):
+            columns[name] = _downcast_integer(series, min_int_bits)
+        elif downcast_floats and isinstance(series.dtype, np.dtype) and series.dtype == np.float64:
+            columns[name] = _downcast_float(series)
+    
+    if not columns:
+        return df, before, before
+    
+    compacted = df.copy(deep=False)
+    for name, series in columns.items():
+        compacted[name] = series
+    return compacted, before, dataframe_memory_bytes(compacted)
@@ -0,0 +1,86 @@
+"""
+Latency history for hedged query execution
+
+Most dashboard queries finish in about a second, but a few percent sit in the
+BigQuery queue for much longer. When a query is still running past a high
+percentile of its own latency history, a duplicate job is submitted and the
+first to finish wins (see JobControl.wait_hedged).
+"""
+
+import threading
+from collections import deque
+from typing import Hashable, Optional
+
+import numpy as np
+
+class LatencyHistory:
+    """
+    Recent backend latencies per query template, used to pick hedge delays
+    
+    Args:
+        history_size: Latencies kept per query template (and overall)
+        percentile: Percentile of the history after which a query is hedged
+        min_samples: Samples needed before a history is trusted
+        min_delay: Lower bound on the hedge delay in seconds
+    """
+    
+    def __init__(self, history_size: int, percentile: float, min_samples: int, min_delay: float):
+        self.history_size = history_size
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._overall = deque(maxlen=history_size)
+        self._by_key = {}
+        self._lock = threading.Lock()
+    
+    def record(self, key: Hashable, seconds: float) -> None:
+        """Add a backend latency (in seconds) for a query template"""
+        with self._lock:
+            history = self._by_key.get(key)
+            if history is None:
+                history = self._by_key[key] = deque(maxlen=self.history_size)
+            history.append(seconds)
+            self._overall.append(seconds)
+    
+    def hedge_delay(self, key: Hashable) -> Optional[float]:
+        """
+        Get how long to wait before hedging a query
+        
+        Uses the query template's own history, falling back to the latency of
+        all queries while the template has too few samples.
+        
+        Returns:
+            Delay in seconds, or None if there is not enough history to hedge
+        """
+        with self._lock:
+            history = self._by_key.get(key)
+            if history is None or len(history) < self.min_samples:
+                history = self._overall
+            if len(history) < self.min_samples:
+                return None
+            samples = list(history)
+        return max(float(np.percentile(samples, self.percentile)), self.min_delay)
+    
+    def record_hedge(self, hedge_won: bool) -> None:
+        """Count a hedged execution and whether the duplicate finished first"""
+        with self._lock:
+            self.hedged += 1
+            if hedge_won:
+                self.hedge_wins += 1
+    
+    def stats(self) -> dict:
+        """
+        Get hedging counters
+        
+        Returns:
+            Dictionary with templates, samples, hedged and hedge_wins
+        """
+        with self._lock:
+            return {
+                "templates": len(self._by_key),
+                "samples": len(self._overall),
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins
+            }
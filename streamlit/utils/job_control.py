@@ -0,0 +1,211 @@
+"""
+Query job deadlines and cancellation of abandoned Streamlit script runs
+
+BigQuery jobs keep running (and billing slots) after the page script that
+started them is abandoned by a rerun or page change. Jobs are waited on in
+short polls so they can be cancelled as soon as their run is superseded or
+their deadline passes.
+"""
+
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional, Tuple
+
+class QueryTimeoutError(Exception):
+    """Raised when a query exceeds its deadline and its job was cancelled"""
+
+class QueryCancelledError(Exception):
+    """Raised when a query's script run was superseded and its job was cancelled"""
+
+def script_run_superseded(ctx) -> bool:
+    """
+    Check whether a Streamlit script run has been asked to stop or rerun
+    
+    Args:
+        ctx: ScriptRunContext of the run, or None outside Streamlit
+    
+    Returns:
+        True if the run is being abandoned
+    """
+    requests = getattr(ctx, "script_requests", None)
+    # ScriptRequests exposes no public accessor for the pending request type
+    state = getattr(requests, "_state", None)
+    return state is not None and getattr(state, "name", "") in ("STOP", "RERUN")
+
+class SessionJobRegistry:
+    """Running query jobs grouped by Streamlit session"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self.cancelled = 0
+        self.timed_out = 0
+    
+    def register(self, session_id: str, job) -> None:
+        with self._lock:
+            self._jobs.setdefault(session_id, set()).add(job)
+    
+    def unregister(self, session_id: str, job) -> None:
+        with self._lock:
+            jobs = self._jobs.get(session_id)
+            if jobs is not None:
+                jobs.discard(job)
+                if not jobs:
+                    del self._jobs[session_id]
+    
+    def record_outcome(self, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timed_out += 1
+            else:
+                self.cancelled += 1
+    
+    def stats(self) -> dict:
+        """
+        Get job tracking counters
+        
+        Returns:
+            Dictionary with running, sessions, cancelled and timed_out
+        """
+        with self._lock:
+            return {
+                "running": sum(len(jobs) for jobs in self._jobs.values()),
+                "sessions": len(self._jobs),
+                "cancelled": self.cancelled,
+                "timed_out": self.timed_out
+            }
+
+def _cancel_job(job) -> None:
+    """Request cancellation of a job, ignoring jobs that already finished"""
+    try:
+        job.cancel()
+    except Exception:
+        pass
+
+class JobControl:
+    """
+    Deadline and abandonment policy for one query
+    
+    Args:
+        registry: Registry the job is tracked in while it runs
+        session_id: Streamlit session that started the query
+        timeout: Seconds before the job is cancelled, or None for no deadline
+        should_cancel: Returns True once the starting script run is abandoned
+        poll_interval: Seconds between abandonment checks
+    """
+    
+    def __init__(self, registry: SessionJobRegistry, session_id: str,
+                 timeout: Optional[float], should_cancel: Callable[[], bool],
+                 poll_interval: float):
+        self.registry = registry
+        self.session_id = session_id
+        self.timeout = timeout
+        self.should_cancel = should_cancel
+        self.poll_interval = poll_interval
+        self.deadline = time.monotonic() + timeout if timeout else None
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without one"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+    
+    def wait(self, job) -> None:
+        """
+        Wait for a BigQuery job, cancelling it on timeout or abandonment
+        
+        Raises:
+            QueryTimeoutError: The deadline passed
+            QueryCancelledError: The starting script run was superseded
+        """
+        self.registry.register(self.session_id, job)
+        try:
+            while True:
+                remaining = self.remaining()
+                if remaining is not None and remaining <= 0:
+                    self._abort([job], timed_out=True)
+                poll = self.poll_interval if remaining is None else min(self.poll_interval, remaining)
+                try:
+                    job.result(timeout=max(poll, 0.01))
+                    return
+                except FutureTimeoutError:
+                    pass
+                if self.should_cancel():
+                    self._abort([job], timed_out=False)
+        finally:
+            self.registry.unregister(self.session_id, job)
+    
+    def wait_hedged(self, job, submit_hedge: Callable[[], Any], hedge_after: float,
+                    poll_interval: float) -> Tuple[Any, bool, bool]:
+        """
+        Wait for a job, submitting one duplicate if it is still running after hedge_after seconds
+        
+        Whichever job finishes first wins and the other is cancelled. A job that
+        fails while its twin is still running is dropped in favour of the twin.
+        
+        Args:
+            job: Primary BigQuery job
+            submit_hedge: Submits and returns the duplicate job
+            hedge_after: Seconds to wait for the primary before hedging
+            poll_interval: Seconds between completion checks
+        
+        Returns:
+            (winning job, whether a duplicate was submitted, whether the duplicate won)
+        
+        Raises:
+            QueryTimeoutError: The deadline passed
+            QueryCancelledError: The starting script run was superseded
+        """
+        hedge_at = time.monotonic() + hedge_after
+        jobs = [job]
+        submitted = [job]
+        self.registry.register(self.session_id, job)
+        try:
+            while True:
+                for candidate in list(jobs):
+                    if not candidate.done():
+                        continue
+                    try:
+                        candidate.result()
+                    except Exception:
+                        if len(jobs) > 1:
+                            jobs.remove(candidate)
+                            continue
+                        raise
+                    for loser in jobs:
+                        if loser is not candidate:
+                            _cancel_job(loser)
+                    return candidate, len(submitted) > 1, candidate is not job
+                
+                remaining = self.remaining()
+                if remaining is not None and remaining <= 0:
+                    self._abort(jobs, timed_out=True)
+                if self.should_cancel():
+                    self._abort(jobs, timed_out=False)
+                
+                now = time.monotonic()
+                if len(jobs) == 1 and jobs[0] is job and now >= hedge_at:
+                    hedge = submit_hedge()
+                    self.registry.register(self.session_id, hedge)
+                    jobs.append(hedge)
+                    submitted.append(hedge)
+                    continue
+                
+                sleep = poll_interval
+                if len(jobs) == 1 and jobs[0] is job:
+                    sleep = min(sleep, hedge_at - now)
+                if remaining is not None:
+                    sleep = min(sleep, remaining)
+                time.sleep(max(sleep, 0.01))
+        finally:
+            for candidate in submitted:
+                self.registry.unregister(self.session_id, candidate)
+    
+    def _abort(self, jobs: list, timed_out: bool) -> None:
+        for job in jobs:
+            _cancel_job(job)
+        self.registry.record_outcome(timed_out)
+        if timed_out:
+            raise QueryTimeoutError(f"Query exceeded its {self.timeout:g}s deadline and was cancelled")
+        raise QueryCancelledError("Query cancelled because its page run was superseded")
@@ -0,0 +1,117 @@
+"""
+Memory-bounded in-process cache for query results
+
+st.cache_data has no memory bound, so per-filter results accumulate until
+the container runs out of memory. This cache measures each DataFrame's real
+footprint (memory_usage(deep=True)), keeps the total under a byte budget and
+evicts least-recently-used results first.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import pandas as pd
+
+def dataframe_memory_bytes(df: pd.DataFrame) -> int:
+    """Measure a DataFrame's memory footprint, including object column contents"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+class MemoryResultCache:
+    """
+    Thread-safe LRU cache of DataFrames bounded by total memory
+    
+    Args:
+        max_size_mb: Byte budget for all cached results together
+        max_entry_fraction: Results larger than this share of the budget are not cached
+    """
+    
+    def __init__(self, max_size_mb: float, max_entry_fraction: float = 0.25):
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_entry_bytes = int(self.max_bytes * max_entry_fraction)
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[pd.DataFrame]:
+        """
+        Look up a cached result and mark it as recently used
+        
+        Returns:
+            A shallow copy of the cached DataFrame (so adding or replacing columns
+            does not affect the cache), or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[0].copy(deep=False)
+    
+    def entry_bytes(self, key: Hashable) -> Optional[int]:
+        """
+        Get the footprint measured when a result was cached, without counting a lookup
+        
+        Returns:
+            Size in bytes, or None if the result is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        return None if entry is None else entry[1]
+    
+    def put(self, key: Hashable, df: pd.DataFrame) -> bool:
+        """
+        Cache a result, evicting least-recently-used entries to stay within budget
+        
+        Returns:
+            True if the result was cached, False if it is too large
+        """
+        size = dataframe_memory_bytes(df)
+        with self._lock:
+            if size > self.max_entry_bytes:
+                self.rejected += 1
+                return False
+            
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= previous[1]
+            self._entries[key] = (df, size)
+            self.size_bytes += size
+            
+            while self.size_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.evictions += 1
+        return True
+    
+    def clear(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+    
+    def stats(self) -> dict:
+        """
+        Get cache counters and current memory usage
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, evictions, rejected, entries, size_mb and max_size_mb
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+                "entries": len(self._entries),
+                "size_mb": round(self.size_bytes / (1024 * 1024), 2),
+                "max_size_mb": round(self.max_bytes / (1024 * 1024), 2)
+            }
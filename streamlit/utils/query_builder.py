@@ -0,0 +1,199 @@
+"""
+Safe SELECT query builder for the analytics OBT tables
+
+Compiles a column list, typed filter predicates and an order/limit spec into
+BigQuery SQL with named query parameters, so drill-downs read only the
+columns they need and filter on the partition and cluster columns declared
+in the dbt configs. Filter values are bound as parameters, so every filter
+selection shares one SQL template.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.settings import ANALYTICS_TABLE_LAYOUTS
+
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_ORDER_PATTERN = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)(?:\s+(ASC|DESC))?$", re.IGNORECASE)
+
+@dataclass(frozen=True)
+class Equals:
+    """column = value (column IS NULL when value is None)"""
+    column: str
+    value: Any
+
+@dataclass(frozen=True)
+class InList:
+    """column IN (values...)"""
+    column: str
+    values: Sequence[Any]
+
+@dataclass(frozen=True)
+class DateRange:
+    """start <= column <= end, either bound optional"""
+    column: str
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+def validate_identifier(name: str) -> str:
+    """
+    Validate a column name and return it unchanged
+    
+    Raises:
+        ValueError: If the name is not a plain SQL identifier
+    """
+    if not _IDENTIFIER_PATTERN.match(name):
+        raise ValueError(f"Invalid column name: {name!r}")
+    return name
+
+def _parameter_name(params: Dict[str, Any], base: str) -> str:
+    """Pick an unused parameter name derived from a column name"""
+    name = base
+    suffix = 2
+    while name in params:
+        name = f"{base}_{suffix}"
+        suffix += 1
+    return name
+
+def compile_predicate(predicate, params: Dict[str, Any]) -> str:
+    """
+    Compile one filter predicate to a SQL boolean expression
+    
+    Values are added to params and referenced as @name in the expression.
+    
+    Args:
+        predicate: Equals, InList or DateRange
+        params: Parameter mapping to add bound values to
+    
+    Returns:
+        SQL boolean expression
+    """
+    if isinstance(predicate, Equals):
+        column = validate_identifier(predicate.column)
+        if predicate.value is None:
+            return f"{column} IS NULL"
+        name = _parameter_name(params, column)
+        params[name] = predicate.value
+        return f"{column} = @{name}"
+    
+    if isinstance(predicate, InList):
+        column = validate_identifier(predicate.column)
+        values = list(predicate.values)
+        if not values:
+            return "FALSE"
+        name = _parameter_name(params, column)
+        params[name] = values
+        return f"{column} IN UNNEST(@{name})"
+    
+    if isinstance(predicate, DateRange):
+        column = validate_identifier(predicate.column)
+        conditions = []
+        if predicate.start is not None:
+            name = _parameter_name(params, f"{column}_start")
+            params[name] = predicate.start
+            conditions.append(f"{column} >= @{name}")
+        if predicate.end is not None:
+            name = _parameter_name(params, f"{column}_end")
+            params[name] = predicate.end
+            conditions.append(f"{column} <= @{name}")
+        return " AND ".join(conditions) if conditions else "TRUE"
+    
+    raise ValueError(f"Unsupported filter predicate: {predicate!r}")
+
+def order_predicates(table_name: str, filters: Iterable) -> List:
+    """
+    Order predicates partition column first, then cluster columns in declared order
+    
+    BigQuery prunes regardless of order, but a stable order keeps compiled SQL
+    (and therefore cache keys) identical for the same filter set.
+    """
+    layout = ANALYTICS_TABLE_LAYOUTS.get(table_name, {})
+    priority = [layout.get("partition_by")] + list(layout.get("cluster_by", []))
+    
+    def sort_key(predicate):
+        column = predicate.column
+        rank = priority.index(column) if column in priority else len(priority)
+        return (rank, column, type(predicate).__name__)
+    
+    return sorted(filters, key=sort_key)
+
+def build_where_clause(
+    table_name: str,
+    filters: Optional[Iterable] = None,
+    conditions: Optional[Sequence[str]] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Compile filter predicates into a WHERE clause for hand-written queries
+    
+    Lets pages keep their own aggregate SQL while filtering on the partition
+    and cluster columns with bound parameters.
+    
+    Args:
+        table_name: Table name, used to look up its partition/cluster layout
+        filters: Equals / InList / DateRange predicates, combined with AND
+        conditions: Fixed SQL conditions ANDed after the predicates (e.g. "x IS NOT NULL")
+    
+    Returns:
+        ("WHERE ..." clause, or "" when there is nothing to filter; named parameter values)
+    
+    Example:
+        where_clause, params = build_where_clause(
+            "revenue_analytics_obt",
+            [DateRange("order_date", start, end), InList("customer_state", ["SP", "RJ"])],
+            conditions=["order_date IS NOT NULL"]
+        )
+        query = f"SELECT SUM(item_price) AS revenue FROM {table_ref} {where_clause}"
+    """
+    params = {}
+    terms = [compile_predicate(p, params) for p in order_predicates(table_name, filters or [])]
+    terms += list(conditions or [])
+    if not terms:
+        return "", params
+    return "WHERE " + "\n      AND ".join(terms), params
+
+def build_select_query(
+    table_ref: str,
+    table_name: str,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Iterable] = None,
+    order_by: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build a parameterized SELECT over one analytics table
+    
+    Args:
+        table_ref: Backtick-quoted fully-qualified table reference
+        table_name: Table name, used to look up its partition/cluster layout
+        columns: Columns to project (all columns when omitted)
+        filters: Equals / InList / DateRange predicates, combined with AND
+        order_by: Column names, optionally followed by ASC or DESC
+        limit: Optional row limit
+    
+    Returns:
+        (SQL query template, named parameter values)
+    """
+    select_list = ", ".join(validate_identifier(c) for c in columns) if columns else "*"
+    clauses = [f"SELECT {select_list}", f"FROM {table_ref}"]
+    
+    where_clause, params = build_where_clause(table_name, filters)
+    if where_clause:
+        clauses.append(where_clause)
+    
+    if order_by:
+        order_terms = []
+        for term in order_by:
+            match = _ORDER_PATTERN.match(term.strip())
+            if match is None:
+                raise ValueError(f"Invalid order term: {term!r}")
+            direction = (match.group(2) or "ASC").upper()
+            order_terms.append(f"{match.group(1)} {direction}")
+        clauses.append(f"ORDER BY {', '.join(order_terms)}")
+    
+    if limit:
+        clauses.append(f"LIMIT {int(limit)}")
+    
+    query = "\n" + "\n".join(f"    {clause}" for clause in clauses) + "\n"
+    return query, params
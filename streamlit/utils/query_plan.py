@@ -0,0 +1,136 @@
+"""
+Query plan inspection for executed page queries
+
+revenue_analytics_obt and orders_analytics_obt are partitioned by order_date,
+but a query only prunes partitions when it filters on that column. Backend
+executions are checked for reads of a partitioned table without a partition
+filter and for reading far more bytes than they return, so wasteful queries
+show up in telemetry instead of only on the bill.
+"""
+
+import re
+from typing import List, Optional
+
+from config.settings import ANALYTICS_TABLE_LAYOUTS
+from utils.sql import extract_table_refs
+
+# Body of each WHERE clause, up to the next clause keyword
+_WHERE_PATTERN = re.compile(
+    r"\bWHERE\b(.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bHAVING\b|\bQUALIFY\b|\bWINDOW\b|\bLIMIT\b|$)",
+    re.IGNORECASE | re.DOTALL
+)
+
+def query_plan_summary(query_job) -> list:
+    """
+    Summarize the stages of a finished BigQuery job's query plan
+    
+    Args:
+        query_job: BigQuery QueryJob
+    
+    Returns:
+        List of stage dictionaries with stage, name, input_stages, records_read,
+        records_written and slot_ms (empty for jobs without a plan)
+    """
+    stages = []
+    for entry in getattr(query_job, "query_plan", None) or []:
+        stages.append({
+            "stage": entry.entry_id,
+            "name": entry.name,
+            "input_stages": list(entry.input_stages or []),
+            "records_read": entry.records_read,
+            "records_written": entry.records_written,
+            "slot_ms": entry.slot_ms
+        })
+    return stages
+
+def rows_read(plan_stages: list) -> Optional[int]:
+    """Rows read from tables: the input of stages that do not read other stages"""
+    leaf_stages = [stage for stage in plan_stages if not stage["input_stages"]]
+    if not leaf_stages:
+        return None
+    return sum(stage["records_read"] or 0 for stage in leaf_stages)
+
+# Words that can follow a table reference where an alias would otherwise be
+_NOT_ALIASES = {
+    "WHERE", "JOIN", "LEFT", "RIGHT", "INNER", "FULL", "CROSS", "ON", "USING", "GROUP", "ORDER",
+    "HAVING", "QUALIFY", "WINDOW", "LIMIT", "UNION", "EXCEPT", "INTERSECT", "TABLESAMPLE", "FOR"
+}
+
+# Comparisons BigQuery can prune partitions with (not IS [NOT] NULL, <> or !=)
+_COLUMN_FIRST_OPERATORS = r"\s*(?:<=|>=|=|<(?!>)|>|\bBETWEEN\b|\bIN\b)"
+_COLUMN_LAST_OPERATORS = r"(?:<=|>=|(?<![!<>])=|<(?!>)|(?<!<)>)\s*"
+
+def _table_aliases(query: str, project_id: str, dataset_id: str, table_name: str) -> List[Optional[str]]:
+    """Alias of each reference to a table (None where it is referenced without one)"""
+    pattern = re.compile(
+        rf"`{re.escape(project_id)}\.{re.escape(dataset_id)}\.{re.escape(table_name)}`"
+        r"(?:\s+TABLESAMPLE\s+SYSTEM\s*\([^)]*\))?(?:\s+(?:AS\s+)?(\w+))?",
+        re.IGNORECASE
+    )
+    aliases = []
+    for match in pattern.finditer(query):
+        alias = match.group(1)
+        aliases.append(alias if alias and alias.upper() not in _NOT_ALIASES else None)
+    return aliases
+
+def _has_partition_predicate(query: str, column: str, qualifiers: List[str]) -> bool:
+    """
+    Whether any WHERE clause compares a column with =, <, <=, >, >=, BETWEEN or IN
+    
+    The column may be unqualified or qualified with one of the given table
+    names / aliases; columns of other tables in a JOIN do not count.
+    """
+    qualifier = "|".join(re.escape(q) for q in qualifiers)
+    column_ref = rf"(?<![\w.])(?:(?:{qualifier})\s*\.\s*)?{re.escape(column)}(?!\w)"
+    predicate = re.compile(
+        rf"{column_ref}{_COLUMN_FIRST_OPERATORS}|{_COLUMN_LAST_OPERATORS}{column_ref}",
+        re.IGNORECASE
+    )
+    return any(predicate.search(body) for body in _WHERE_PATTERN.findall(query))
+
+def find_plan_issues(
+    query: str,
+    bytes_processed: Optional[int],
+    result_bytes: int,
+    max_read_amplification: float,
+    min_bytes_processed: int
+) -> List[str]:
+    """
+    Flag an executed query that scans more than it needs to
+    
+    - full_scan: the query reads a partitioned table (see ANALYTICS_TABLE_LAYOUTS)
+      without an equality, range or IN predicate on that table's partition
+      column, so every partition is scanned.
+    - read_amplification: the query processed more than max_read_amplification
+      times the bytes of its result (only checked above min_bytes_processed).
+    
+    Args:
+        query: SQL query string that was executed
+        bytes_processed: Bytes processed by the job (None for local backends)
+        result_bytes: In-memory size of the result
+        max_read_amplification: Largest acceptable bytes processed per result byte
+        min_bytes_processed: Jobs processing less than this are never amplification-flagged
+    
+    Returns:
+        List of human-readable flags, empty if the query looks fine
+    """
+    flags = []
+    for project_id, dataset_id, table_name in extract_table_refs(query):
+        partition_column = ANALYTICS_TABLE_LAYOUTS.get(table_name, {}).get("partition_by")
+        if not partition_column:
+            continue
+        # Every reference (e.g. both sides of a self-join) needs its own filter
+        for alias in _table_aliases(query, project_id, dataset_id, table_name):
+            qualifiers = [table_name] + ([alias] if alias else [])
+            if not _has_partition_predicate(query, partition_column, qualifiers):
+                flags.append(f"full_scan: {table_name} read with no {partition_column} filter")
+                break
+    
+    if bytes_processed and bytes_processed >= min_bytes_processed:
+        amplification = bytes_processed / max(result_bytes, 1)
+        if amplification > max_read_amplification:
+            flags.append(
+                f"read_amplification: {bytes_processed / (1024 ** 2):,.1f} MB processed for a "
+                f"{result_bytes / 1024:,.1f} KB result ({amplification:,.0f}x)"
+            )
+    return flags
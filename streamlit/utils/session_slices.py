@@ -0,0 +1,344 @@
+"""
+Session-scoped filtered slices of the analytics OBT tables
+
+Once a user applies page filters, every chart on the page re-scans the full
+OBT with the same WHERE clause. A FilteredSlice holds the filtered rows of one
+table in an in-memory DuckDB database, downloaded once per (session, table,
+filter set) as Arrow record batches, and answers the page's queries locally.
+A session's slice is dropped when its filters change, when the session ends,
+when it has been idle too long or when the slices of all sessions exceed
+their memory budget.
+"""
+
+import re
+import threading
+import time
+from typing import Callable, Hashable, Iterable, List, Optional, Pattern, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from utils.backends import duckdb_parameters
+from utils.query_builder import compile_predicate
+from utils.sql import extract_table_refs, freeze_params, normalize_sql, translate_bigquery_to_duckdb
+
+_UNBOUND = object()
+_PARAMETER_REF_PATTERN = re.compile(r"@(\w+)")
+_QUOTED_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`")
+_SUBQUERY_PATTERN = re.compile(r"\(\s*SELECT\b|\bWITH\b", re.IGNORECASE)
+_CLAUSE_PATTERN = re.compile(
+    r"\bWHERE\b|\bGROUP\s+BY\b|\bORDER\s+BY\b|\bHAVING\b|\bQUALIFY\b|\bWINDOW\b|\bLIMIT\b"
+    r"|\bUNION\b|\bEXCEPT\b|\bINTERSECT\b",
+    re.IGNORECASE
+)
+_BOOLEAN_PATTERN = re.compile(r"\b(AND|OR|NOT|BETWEEN)\b", re.IGNORECASE)
+
+def _paren_depths(text: str) -> List[int]:
+    """Parenthesis nesting depth at each character"""
+    depths, depth = [], 0
+    for char in text:
+        if char == ")":
+            depth -= 1
+        depths.append(depth)
+        if char == "(":
+            depth += 1
+    return depths
+
+def where_conjuncts(query: str) -> Optional[List[str]]:
+    """
+    Split the WHERE clause of a single-level query into its top-level AND terms
+    
+    Returns:
+        The terms, or None when they cannot be relied on: no WHERE clause, an
+        OR or a negated term (NOT x, but not IS NOT / NOT IN) outside
+        parentheses, or a subquery or CTE anywhere in the query
+    """
+    sql = normalize_sql(query)
+    # Literals and identifiers blanked out, so their contents are never parsed
+    masked = _QUOTED_PATTERN.sub(lambda match: "x" * len(match.group(0)), sql)
+    if _SUBQUERY_PATTERN.search(masked):
+        return None
+    depths = _paren_depths(masked)
+    
+    clauses = [match for match in _CLAUSE_PATTERN.finditer(masked) if depths[match.start()] == 0]
+    wheres = [i for i, match in enumerate(clauses) if match.group(0).upper() == "WHERE"]
+    if len(wheres) != 1:
+        return None
+    start = clauses[wheres[0]].end()
+    end = clauses[wheres[0] + 1].start() if wheres[0] + 1 < len(clauses) else len(sql)
+    
+    conjuncts, term_start, in_between = [], start, False
+    for match in _BOOLEAN_PATTERN.finditer(masked, start, end):
+        if depths[match.start()] != 0:
+            continue
+        keyword = match.group(1).upper()
+        if keyword == "OR":
+            return None
+        if keyword == "NOT":
+            if not sql[term_start:match.start()].strip():
+                return None
+            continue
+        if keyword == "BETWEEN":
+            in_between = True
+        elif in_between:
+            # The AND of `x BETWEEN a AND b`
+            in_between = False
+        else:
+            conjuncts.append(sql[term_start:match.start()].strip())
+            term_start = match.end()
+    conjuncts.append(sql[term_start:end].strip())
+    return conjuncts
+
+def compile_slice_conditions(filters: Iterable) -> List[Tuple[Pattern, Tuple]]:
+    """
+    Compile filter predicates to the conditions a query must contain to use a slice
+    
+    Each predicate is compiled as build_where_clause would compile it and split
+    into its ANDed comparisons. A comparison matches one of a query's top-level
+    WHERE terms word for word, except that its column may be qualified with a
+    table alias and its @parameters may have any name.
+    
+    Args:
+        filters: Equals / InList / DateRange predicates
+    
+    Returns:
+        List of (pattern capturing the parameter names, frozen parameter values)
+    """
+    conditions = []
+    for predicate in filters:
+        params = {}
+        for term in compile_predicate(predicate, params).split(" AND "):
+            if term == "TRUE":
+                continue
+            names = _PARAMETER_REF_PATTERN.findall(term)
+            pieces = [re.escape(piece) for piece in _PARAMETER_REF_PATTERN.split(term)[::2]]
+            pattern = r"@(\w+)".join(pieces).replace(r"\ ", r"\s*")
+            frozen = dict(freeze_params(params))
+            values = tuple(frozen[name] for name in names)
+            conditions.append((re.compile(rf"(?:\w+\s*\.\s*)?{pattern}", re.IGNORECASE), values))
+    return conditions
+
+class FilteredSlice:
+    """
+    Filtered rows of one analytics table, queryable with the pages' BigQuery SQL
+    
+    A query is only routed to the slice when its WHERE clause applies every
+    filter the slice was built with - same column, operator and bound value -
+    i.e. when it filters at least as narrowly itself, so its result is the
+    same as on the full table.
+    
+    Args:
+        project_id: Project of the sliced table
+        dataset_id: Dataset of the sliced table
+        table_name: Sliced table name
+        filter_key: Hashable identity of the filter set (and table version)
+        filters: Equals / InList / DateRange predicates the slice was built with
+        table: Filtered rows
+    """
+    
+    def __init__(self, project_id: str, dataset_id: str, table_name: str,
+                 filter_key: Hashable, filters: Iterable, table: pa.Table):
+        import duckdb
+        
+        self.table_ref = (project_id, dataset_id, table_name)
+        self.table_name = table_name
+        self.filter_key = filter_key
+        self.conditions = compile_slice_conditions(filters)
+        self.num_rows = table.num_rows
+        self.size_bytes = table.nbytes
+        self.queries = 0
+        self.last_used = time.monotonic()
+        self._conn = duckdb.connect(database=":memory:")
+        # Copied into a real table: registered Arrow views are not visible to cursors.
+        # Translated queries read `project.dataset.table` as "table".
+        self._conn.register("filtered_rows", table)
+        self._conn.execute(f'CREATE TABLE "{table_name}" AS SELECT * FROM filtered_rows')
+        self._conn.unregister("filtered_rows")
+    
+    def covers(self, query: str, params: tuple) -> bool:
+        """
+        Whether the slice can answer a query
+        
+        Args:
+            query: SQL query string
+            params: Frozen query parameters (see freeze_params)
+        
+        Returns:
+            True if the query reads only this slice's table and every filter of
+            the slice is a top-level AND term of its WHERE clause (see where_conjuncts)
+        """
+        refs = extract_table_refs(query)
+        if not refs or any(ref != self.table_ref for ref in refs):
+            return False
+        
+        conjuncts = where_conjuncts(query)
+        if conjuncts is None:
+            return False
+        bound = dict(params)
+        for pattern, values in self.conditions:
+            matches = (pattern.fullmatch(conjunct) for conjunct in conjuncts)
+            if not any(
+                match is not None and tuple(bound.get(name, _UNBOUND) for name in match.groups()) == values
+                for match in matches
+            ):
+                return False
+        return True
+    
+    def run(self, query: str, params: Optional[dict] = None) -> pd.DataFrame:
+        """
+        Run a BigQuery-dialect query against the slice
+        
+        Args:
+            query: SQL query string reading only this slice's table
+            params: Optional named query parameters
+        
+        Returns:
+            DataFrame with query results
+        """
+        self.last_used = time.monotonic()
+        self.queries += 1
+        # A cursor per call gives each thread its own connection to the slice
+        cursor = self._conn.cursor()
+        try:
+            bound = duckdb_parameters(params)
+            return cursor.execute(translate_bigquery_to_duckdb(query), bound or None).df()
+        finally:
+            cursor.close()
+    
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+class SessionSliceRegistry:
+    """
+    Filtered slices grouped by Streamlit session, one per session and table
+    
+    Args:
+        max_size_mb: Memory budget for the slices of all sessions together
+        idle_seconds: Slices unused for this long are dropped
+    """
+    
+    def __init__(self, max_size_mb: float, idle_seconds: float):
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.idle_seconds = idle_seconds
+        self.created = 0
+        self.reused = 0
+        self.dropped = 0
+        self._slices = {}
+        self._active = {}
+        self._lock = threading.Lock()
+    
+    def get(self, session_id: str, table_name: str, filter_key: Hashable) -> Optional[FilteredSlice]:
+        """Look up a session's slice of a table, if it was built for the same filters"""
+        with self._lock:
+            slice_ = self._slices.get((session_id, table_name))
+            if slice_ is None or slice_.filter_key != filter_key:
+                return None
+            slice_.last_used = time.monotonic()
+            self.reused += 1
+            return slice_
+    
+    def put(self, session_id: str, slice_: FilteredSlice) -> None:
+        """
+        Store a session's slice, replacing its slice of the same table
+        
+        Least-recently-used slices of other tables and sessions are dropped
+        to stay within the memory budget.
+        """
+        with self._lock:
+            previous = self._slices.pop((session_id, slice_.table_name), None)
+            self._slices[(session_id, slice_.table_name)] = slice_
+            self.created += 1
+            dropped = [previous] if previous is not None else []
+            
+            in_use = self._in_use()
+            by_age = sorted(self._slices.items(), key=lambda item: item[1].last_used)
+            total = sum(s.size_bytes for s in self._slices.values())
+            for key, candidate in by_age:
+                if total <= self.max_bytes:
+                    break
+                if candidate is slice_ or id(candidate) in in_use:
+                    continue
+                del self._slices[key]
+                total -= candidate.size_bytes
+                dropped.append(candidate)
+            self.dropped += len(dropped)
+        
+        for old in dropped:
+            old.close()
+    
+    def _in_use(self) -> set:
+        """IDs of slices currently routing queries (never dropped while active)"""
+        return {id(s) for active in self._active.values() for s in active.values()}
+    
+    def activate(self, session_id: str, slice_: FilteredSlice) -> None:
+        """Route the session's queries on the slice's table to the slice"""
+        with self._lock:
+            self._active.setdefault(session_id, {})[slice_.table_name] = slice_
+    
+    def deactivate(self, session_id: str, slice_: FilteredSlice) -> None:
+        with self._lock:
+            active = self._active.get(session_id, {})
+            if active.get(slice_.table_name) is slice_:
+                del active[slice_.table_name]
+            if not active:
+                self._active.pop(session_id, None)
+    
+    def find(self, session_id: str, query: str, params: tuple) -> Optional[FilteredSlice]:
+        """Find the session's active slice that can answer a query on its own"""
+        with self._lock:
+            active = list(self._active.get(session_id, {}).values())
+        for slice_ in active:
+            if slice_.covers(query, params):
+                return slice_
+        return None
+    
+    def prune(self, is_session_active: Callable[[str], bool]) -> int:
+        """
+        Drop slices of ended sessions and slices idle past idle_seconds
+        
+        Args:
+            is_session_active: Returns False once a session has ended
+        
+        Returns:
+            Number of slices dropped
+        """
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            in_use = self._in_use()
+            expired = [
+                key for key, slice_ in self._slices.items()
+                if id(slice_) not in in_use
+                and (slice_.last_used < cutoff or not is_session_active(key[0]))
+            ]
+            dropped = [self._slices.pop(key) for key in expired]
+            self.dropped += len(dropped)
+        
+        for old in dropped:
+            old.close()
+        return len(dropped)
+    
+    def stats(self) -> dict:
+        """
+        Get slice counters and current memory usage
+        
+        Returns:
+            Dictionary with slices, sessions, active, rows, size_mb, max_size_mb,
+            created, reused, dropped and queries
+        """
+        with self._lock:
+            slices = list(self._slices.values())
+            return {
+                "slices": len(slices),
+                "sessions": len({session_id for session_id, _ in self._slices}),
+                "active": sum(len(active) for active in self._active.values()),
+                "rows": sum(s.num_rows for s in slices),
+                "size_mb": round(sum(s.size_bytes for s in slices) / (1024 * 1024), 2),
+                "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+                "created": self.created,
+                "reused": self.reused,
+                "dropped": self.dropped,
+                "queries": sum(s.queries for s in slices)
+            }
@@ -0,0 +1,241 @@
+"""
+Shared cross-replica result cache over the Redis protocol
+
+Dashboard replicas behind a load balancer each keep their own in-memory
+and disk caches. This layer lets them share query results through Redis (or
+any server speaking its protocol), so one replica's BigQuery job serves all
+of them. Results are stored as compressed Arrow IPC streams with a TTL and
+tagged with the tables and table version they were computed from.
+
+When the server is unreachable the cache reports misses and skips writes for
+a back-off period, so queries fall through to the local caches and backend.
+"""
+
+import logging
+import threading
+import time
+from typing import Iterable, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    # Optional dependency for the shared cache (SHARED_CACHE_CONFIG["url"])
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_VERSION_METADATA_KEY = b"olist.version"
+_TABLES_METADATA_KEY = b"olist.tables"
+
+def serialize_dataframe(df: pd.DataFrame, compression: Optional[str] = "zstd",
+                        metadata: Optional[dict] = None) -> bytes:
+    """
+    Serialize a DataFrame to an Arrow IPC stream
+    
+    Args:
+        df: DataFrame to serialize (the index is dropped)
+        compression: IPC buffer compression ("zstd", "lz4" or None)
+        metadata: Optional string key/value pairs added to the schema metadata
+    
+    Returns:
+        IPC stream bytes
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if metadata:
+        schema_metadata = dict(table.schema.metadata or {})
+        schema_metadata.update({k.encode(): str(v).encode() for k, v in metadata.items()})
+        table = table.replace_schema_metadata(schema_metadata)
+    
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def deserialize_dataframe(payload: bytes) -> pa.Table:
+    """Read an Arrow IPC stream written by serialize_dataframe"""
+    return pa.ipc.open_stream(pa.py_buffer(payload)).read_all()
+
+class RedisResultCache:
+    """
+    Query result cache shared by every replica connected to one Redis server
+    
+    Args:
+        client: Redis client (redis.Redis, or an in-process stand-in such as
+            fakeredis.FakeRedis exposing get/set/sadd/smembers/expire/delete)
+        ttl_seconds: Lifetime of each cached result
+        key_prefix: Namespace for result keys and table tag sets
+        compression: Arrow IPC buffer compression ("zstd", "lz4" or None)
+        max_entry_mb: Results larger than this once serialized are not shared
+        retry_after_seconds: Back-off after a connection error before the server is tried again
+    """
+    
+    def __init__(self, client, ttl_seconds: int, key_prefix: str = "olist:result:",
+                 compression: Optional[str] = "zstd", max_entry_mb: float = 64,
+                 retry_after_seconds: float = 30):
+        self.client = client
+        self.ttl_seconds = int(ttl_seconds)
+        self.key_prefix = key_prefix
+        self.compression = compression
+        self.max_entry_bytes = int(max_entry_mb * 1024 * 1024)
+        self.retry_after_seconds = retry_after_seconds
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self.bytes_written = 0
+        self._unavailable_until = 0.0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_url(cls, url: str, socket_timeout: float = 0.5, **kwargs) -> "RedisResultCache":
+        """
+        Connect to a Redis server by URL (e.g. redis://cache:6379/0)
+        
+        Raises:
+            ImportError: If the redis package is not installed
+        """
+        if redis is None:
+            raise ImportError("The shared result cache requires the redis package (pip install redis)")
+        client = redis.Redis.from_url(
+            url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout
+        )
+        return cls(client, **kwargs)
+    
+    def _result_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+    
+    def _tag_key(self, table: str) -> str:
+        return f"{self.key_prefix}tag:{table}"
+    
+    def available(self) -> bool:
+        """Whether the server is currently being used (False during a back-off)"""
+        return time.monotonic() >= self._unavailable_until
+    
+    def _record_error(self, operation: str, error: Exception) -> None:
+        with self._lock:
+            self.errors += 1
+            self._unavailable_until = time.monotonic() + self.retry_after_seconds
+        logger.warning("Shared cache %s failed, using local caches for %ss: %s",
+                       operation, self.retry_after_seconds, error)
+    
+    def get(self, key: str, version: str = "") -> Optional[pd.DataFrame]:
+        """
+        Read a shared result
+        
+        Args:
+            key: Cache key (see ParquetResultCache.make_key)
+            version: Table version token the result must have been computed from
+        
+        Returns:
+            Cached DataFrame, or None on a miss, a version mismatch or while unreachable
+        """
+        if not self.available():
+            return None
+        try:
+            payload = self.client.get(self._result_key(key))
+        except Exception as e:
+            self._record_error("read", e)
+            return None
+        
+        df = None
+        if payload is not None:
+            try:
+                table = deserialize_dataframe(payload)
+                stored_version = (table.schema.metadata or {}).get(_VERSION_METADATA_KEY, b"").decode()
+                if stored_version == version:
+                    df = table.to_pandas()
+            except Exception as e:
+                logger.warning("Discarding unreadable shared cache entry %s: %s", key, e)
+        
+        with self._lock:
+            if df is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return df
+    
+    def put(self, key: str, df: pd.DataFrame, version: str = "",
+            tables: Iterable[str] = ()) -> None:
+        """
+        Store a result with the TTL and tag it with the tables it reads
+        
+        Args:
+            key: Cache key (see ParquetResultCache.make_key)
+            df: Query result to share
+            version: Table version token the result was computed from
+            tables: Fully-qualified tables the query reads, used by invalidate_tables
+        """
+        if not self.available():
+            return
+        tables = sorted(set(tables))
+        result_key = self._result_key(key)
+        try:
+            payload = serialize_dataframe(df, self.compression, {
+                _VERSION_METADATA_KEY.decode(): version,
+                _TABLES_METADATA_KEY.decode(): ",".join(tables)
+            })
+        except Exception as e:
+            # Columns Arrow cannot represent (e.g. mixed object types) stay replica-local
+            logger.warning("Not sharing result %s, it cannot be serialized: %s", key, e)
+            return
+        if len(payload) > self.max_entry_bytes:
+            return
+        
+        try:
+            self.client.set(result_key, payload, ex=self.ttl_seconds)
+            for table in tables:
+                tag_key = self._tag_key(table)
+                self.client.sadd(tag_key, result_key)
+                self.client.expire(tag_key, self.ttl_seconds)
+        except Exception as e:
+            self._record_error("write", e)
+            return
+        
+        with self._lock:
+            self.writes += 1
+            self.bytes_written += len(payload)
+    
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """
+        Delete every shared result tagged with any of the given tables
+        
+        Args:
+            tables: Fully-qualified table names (project.dataset.table)
+        
+        Returns:
+            Number of result keys deleted
+        """
+        deleted = 0
+        try:
+            for table in tables:
+                tag_key = self._tag_key(table)
+                keys = list(self.client.smembers(tag_key))
+                if keys:
+                    deleted += self.client.delete(*keys)
+                self.client.delete(tag_key)
+        except Exception as e:
+            self._record_error("invalidate", e)
+        return deleted
+    
+    def stats(self) -> dict:
+        """
+        Get shared cache counters
+        
+        Returns:
+            Dictionary with available, hits, misses, hit_rate, writes, written_mb and errors
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "available": self.available(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+                "written_mb": round(self.bytes_written / (1024 * 1024), 2),
+                "errors": self.errors
+            }
@@ -0,0 +1,83 @@
+"""
+Single-flight request coalescing
+
+Concurrent callers asking for the same key wait on one in-flight call and
+share its result, so a burst of identical cache misses (e.g. many sessions
+opening a page right after a dbt rebuild) runs one BigQuery job instead of
+one per session.
+"""
+
+import threading
+from typing import Any, Callable, Hashable, Tuple
+
+class _Call:
+    """State of one in-flight call shared by its waiters"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Process-wide de-duplication of concurrent calls with the same key"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key among concurrent callers
+        
+        Args:
+            key: Identity of the call (e.g. normalized SQL plus parameters)
+            fn: Zero-argument function producing the result
+        
+        Returns:
+            (result, shared) where shared is True if another caller's execution was reused
+        
+        Raises:
+            Whatever fn raised, re-raised in every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+        
+        if not leader:
+            call.done.wait()
+            with self._lock:
+                self.coalesced += 1
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self.executions += 1
+            call.done.set()
+        return call.result, False
+    
+    def stats(self) -> dict:
+        """
+        Get execution counters
+        
+        Returns:
+            Dictionary with executions, coalesced (duplicate executions avoided) and in_flight
+        """
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls)
+            }
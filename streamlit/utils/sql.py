@@ -0,0 +1,250 @@
+"""
+SQL text helpers shared by the query caching layers
+"""
+
+import re
+
+# Quoted literals and backtick identifiers, left untouched by the rewrites below
+_QUOTED_PATTERN = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)")
+
+# Scanned left to right, so comment markers inside literals and quotes inside
+# comments are both left alone: literals and backtick identifiers are kept
+# verbatim, and each run of whitespace and comments becomes one space
+_SQL_TOKEN_PATTERN = re.compile(
+    r"(?P<quoted>'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)"
+    r"|(?P<gap>(?:\s|--[^\n]*|/\*.*?\*/)+)",
+    re.DOTALL
+)
+
+def normalize_sql(query: str) -> str:
+    """
+    Normalize SQL text so formatting-only differences share one cache key
+    
+    Removes comments and collapses runs of whitespace outside quoted literals,
+    then strips the ends. The result is a single line that is still valid SQL.
+    
+    Args:
+        query: SQL query string
+        
+    Returns:
+        Normalized SQL string
+    """
+    return _SQL_TOKEN_PATTERN.sub(lambda match: match.group("quoted") or " ", query).strip()
+
+# Fully-qualified backtick table references: `project.dataset.table`
+_TABLE_REF_PATTERN = re.compile(r"`([\w-]+)\.([\w-]+)\.([\w$-]+)`")
+
+def extract_table_refs(query: str) -> list:
+    """
+    Find the fully-qualified tables a query reads
+    
+    Metadata views (INFORMATION_SCHEMA, __TABLES__) are ignored since they
+    have no modification time of their own.
+    
+    Args:
+        query: SQL query string
+        
+    Returns:
+        Sorted list of unique (project_id, dataset_id, table_name) tuples
+    """
+    refs = set()
+    for project_id, dataset_id, table_name in _TABLE_REF_PATTERN.findall(query):
+        if "INFORMATION_SCHEMA" in (dataset_id.upper(), table_name.upper()):
+            continue
+        if table_name.startswith("__"):
+            continue
+        refs.add((project_id, dataset_id, table_name))
+    return sorted(refs)
+
+def add_table_sample(query: str, percent: float) -> str:
+    """
+    Add a TABLESAMPLE clause after every fully-qualified table reference
+    
+    Args:
+        query: BigQuery SQL query string
+        percent: Percentage of table blocks to read
+        
+    Returns:
+        Sampled SQL query string
+    """
+    def sample(match):
+        if (match.group(1), match.group(2), match.group(3)) not in refs:
+            return match.group(0)
+        return f"{match.group(0)} TABLESAMPLE SYSTEM ({percent:g} PERCENT)"
+    
+    refs = set(extract_table_refs(query))
+    return _TABLE_REF_PATTERN.sub(sample, query)
+
+def _split_call_args(query: str, start: int) -> tuple:
+    """
+    Split the arguments of a function call whose opening parenthesis ends at start
+    
+    Returns:
+        (list of argument strings, index just past the closing parenthesis),
+        or (None, start) if the parentheses are unbalanced
+    """
+    depth = 0
+    quote = None
+    args = []
+    current = start
+    i = start
+    while i < len(query):
+        char = query[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in ("'", '"', "`"):
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            if depth == 0:
+                args.append(query[current:i].strip())
+                return args, i + 1
+            depth -= 1
+        elif char == "," and depth == 0:
+            args.append(query[current:i].strip())
+            current = i + 1
+        i += 1
+    return None, start
+
+def rewrite_function_calls(query: str, name: str, rewrite) -> str:
+    """
+    Rewrite every call of a SQL function, including nested calls
+    
+    Args:
+        query: SQL query string
+        name: Function name (case-insensitive)
+        rewrite: Callable taking the list of argument strings and returning
+            replacement SQL, or None to leave the call unchanged
+        
+    Returns:
+        Rewritten SQL string
+    """
+    pattern = re.compile(rf"\b{name}\s*\(", re.IGNORECASE)
+    output = []
+    pos = 0
+    while True:
+        match = pattern.search(query, pos)
+        if match is None:
+            break
+        args, end = _split_call_args(query, match.end())
+        if args is None:
+            break
+        args = [rewrite_function_calls(arg, name, rewrite) for arg in args]
+        replacement = rewrite(args)
+        if replacement is None:
+            replacement = f"{query[match.start():match.end()]}{', '.join(args)})"
+        output.append(query[pos:match.start()])
+        output.append(replacement)
+        pos = end
+    output.append(query[pos:])
+    return "".join(output)
+
+# BigQuery date parts that DuckDB spells differently
+_DUCKDB_DATE_PARTS = {
+    "DAYOFWEEK": "dow",
+    "DAYOFYEAR": "doy",
+    "ISOWEEK": "week"
+}
+
+_INFORMATION_SCHEMA_PATTERN = re.compile(
+    r"`(?:[\w-]+\.){1,2}INFORMATION_SCHEMA\.(\w+)`", re.IGNORECASE
+)
+_PART_PATTERN = re.compile(r"^[A-Za-z]+$")
+_EXTRACT_PATTERN = re.compile(r"^(\w+)\s+FROM\s+(.+)$", re.IGNORECASE | re.DOTALL)
+
+def _translate_date_trunc(args: list):
+    if len(args) != 2 or not _PART_PATTERN.match(args[1]):
+        return None
+    return f"DATE_TRUNC('{args[1].lower()}', {args[0]})"
+
+def _translate_date_diff(args: list):
+    # BigQuery: DATE_DIFF(end, start, PART); DuckDB: DATE_DIFF('part', start, end)
+    if len(args) != 3 or not _PART_PATTERN.match(args[2]):
+        return None
+    return f"DATE_DIFF('{args[2].lower()}', {args[1]}, {args[0]})"
+
+def _translate_safe_divide(args: list):
+    if len(args) != 2:
+        return None
+    return f"(({args[0]}) / NULLIF({args[1]}, 0))"
+
+def _translate_extract(args: list):
+    match = _EXTRACT_PATTERN.match(args[0]) if len(args) == 1 else None
+    if match is None:
+        return None
+    part, expression = match.group(1).upper(), match.group(2)
+    if part == "DAYOFWEEK":
+        # BigQuery numbers weekdays 1 (Sunday) to 7, DuckDB 0 to 6
+        return f"(EXTRACT(dow FROM {expression}) + 1)"
+    return f"EXTRACT({_DUCKDB_DATE_PARTS.get(part, part.lower())} FROM {expression})"
+
+def _translate_string_literal(match) -> str:
+    literal = match.group(0)
+    if not literal.startswith("'"):
+        return literal
+    # BigQuery escapes with backslashes, DuckDB doubles the quote
+    body = re.sub(r"\\(.)", lambda m: "''" if m.group(1) == "'" else m.group(1), literal[1:-1])
+    return f"'{body}'"
+
+_PARAMETER_PATTERN = re.compile(r"(?<![@\w])@(\w+)")
+_IN_UNNEST_PATTERN = re.compile(r"\bIN\s+UNNEST\s*\(\s*(\$\w+)\s*\)", re.IGNORECASE)
+
+def _translate_parameters(query: str) -> str:
+    """Rewrite BigQuery @name parameters to DuckDB $name outside quoted text"""
+    parts = _QUOTED_PATTERN.split(query)
+    for i in range(0, len(parts), 2):
+        parts[i] = _PARAMETER_PATTERN.sub(r"$\1", parts[i])
+    query = "".join(parts)
+    # `col IN UNNEST(@values)` is BigQuery's array-parameter membership test
+    return _IN_UNNEST_PATTERN.sub(r"IN (SELECT UNNEST(\1))", query)
+
+def translate_bigquery_to_duckdb(query: str) -> str:
+    """
+    Translate the BigQuery SQL dialect used by the dashboard pages to DuckDB
+    
+    Handles backtick table references, INFORMATION_SCHEMA views, DATE_TRUNC,
+    DATE_DIFF, EXTRACT, SAFE_DIVIDE, backslash-escaped string literals and
+    @name query parameters. Other syntax is passed through as is.
+    
+    Args:
+        query: BigQuery SQL query string
+        
+    Returns:
+        DuckDB SQL query string
+    """
+    query = _QUOTED_PATTERN.sub(_translate_string_literal, query)
+    query = _translate_parameters(query)
+    query = _INFORMATION_SCHEMA_PATTERN.sub(
+        lambda m: f"information_schema.{m.group(1).lower()}", query
+    )
+    query = _TABLE_REF_PATTERN.sub(lambda m: f'"{m.group(3)}"', query)
+    query = rewrite_function_calls(query, "DATE_TRUNC", _translate_date_trunc)
+    query = rewrite_function_calls(query, "DATE_DIFF", _translate_date_diff)
+    query = rewrite_function_calls(query, "SAFE_DIVIDE", _translate_safe_divide)
+    query = rewrite_function_calls(query, "EXTRACT", _translate_extract)
+    return query
+
+def freeze_params(params) -> tuple:
+    """
+    Convert named query parameters to a hashable, order-independent cache key
+    
+    Args:
+        params: Mapping of parameter name to value (lists become tuples), or None
+        
+    Returns:
+        Sorted tuple of (name, value) pairs
+    """
+    if not params:
+        return ()
+    frozen = []
+    for name, value in dict(params).items():
+        if isinstance(value, set):
+            value = tuple(sorted(value))
+        elif isinstance(value, list):
+            value = tuple(value)
+        frozen.append((name, value))
+    return tuple(sorted(frozen))
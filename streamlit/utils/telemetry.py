@@ -0,0 +1,126 @@
+"""
+In-process query telemetry for the Streamlit dashboard
+
+Every execute_custom_query call is recorded in a bounded ring buffer so the
+Performance page can rank the slowest and most expensive page queries.
+"""
+
+import json
+import os
+import sys
+import threading
+from collections import deque
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from config.settings import APP_DIR
+from utils.query_plan import query_plan_summary, rows_read
+
+_UTILS_DIR = os.path.join(APP_DIR, "utils")
+
+def find_caller() -> Tuple[str, str]:
+    """
+    Find the dashboard page and function that issued the current query
+    
+    Walks up the stack past utils/, Streamlit and standard library frames to
+    the first frame that belongs to the app itself.
+    
+    Returns:
+        (page, function) tuple, e.g. ("6_🚚_Delivery_Analytics", "get_delivery_trends")
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(APP_DIR) and not filename.startswith(_UTILS_DIR):
+            page = os.path.splitext(os.path.basename(filename))[0]
+            return page, frame.f_code.co_name
+        frame = frame.f_back
+    return "unknown", "unknown"
+
+def job_statistics(query_job) -> dict:
+    """
+    Extract billing, cache and query plan statistics from a finished BigQuery job
+    
+    Args:
+        query_job: BigQuery QueryJob
+    
+    Returns:
+        Dictionary with job_id, bytes_processed, bytes_billed, slot_ms, bq_cache_hit,
+        partitions_processed, rows_read and plan_stages
+    """
+    # The client library exposes no accessor for totalPartitionsProcessed
+    query_stats = (getattr(query_job, "_properties", None) or {}).get("statistics", {}).get("query", {})
+    partitions = query_stats.get("totalPartitionsProcessed")
+    plan_stages = query_plan_summary(query_job)
+    return {
+        "job_id": getattr(query_job, "job_id", None),
+        "bytes_processed": getattr(query_job, "total_bytes_processed", None),
+        "bytes_billed": getattr(query_job, "total_bytes_billed", None),
+        "slot_ms": getattr(query_job, "slot_millis", None),
+        "bq_cache_hit": getattr(query_job, "cache_hit", None),
+        "partitions_processed": int(partitions) if partitions is not None else None,
+        "rows_read": rows_read(plan_stages),
+        "plan_stages": plan_stages
+    }
+
+class QueryTelemetry:
+    """Thread-safe ring buffer of per-query telemetry records"""
+    
+    def __init__(self, max_records: int):
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+    
+    def record(self, entry: dict) -> None:
+        """Append a record, dropping the oldest once the buffer is full"""
+        with self._lock:
+            self._records.append(entry)
+    
+    def records(self) -> list:
+        """Get a snapshot of all buffered records, oldest first"""
+        with self._lock:
+            return list(self._records)
+    
+    def clear(self) -> None:
+        """Drop every buffered record"""
+        with self._lock:
+            self._records.clear()
+    
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Export all buffered records as a JSON array"""
+        return json.dumps(self.records(), indent=indent, default=str)
+    
+    def summarize(self) -> pd.DataFrame:
+        """
+        Aggregate records per page function, ranked worst first within each page
+        
+        Returns:
+            DataFrame with one row per (page, function) sorted by page and total wall time
+        """
+        df = pd.DataFrame(self.records())
+        if df.empty:
+            return df
+        
+        # Memory hits and local backends carry no job statistics
+        for column in ("bytes_billed", "slot_ms", "rows", "memory_bytes"):
+            df[column] = pd.to_numeric(df.get(column), errors="coerce")
+        df["executed"] = df["source"] == "backend"
+        plan_flags = df["plan_flags"] if "plan_flags" in df else [None] * len(df)
+        df["flagged"] = [isinstance(flags, list) and bool(flags) for flags in plan_flags]
+        summary = df.groupby(["page", "function"]).agg(
+            calls=("wall_ms", "size"),
+            executions=("executed", "sum"),
+            plan_flagged=("flagged", "sum"),
+            total_wall_ms=("wall_ms", "sum"),
+            avg_wall_ms=("wall_ms", "mean"),
+            max_wall_ms=("wall_ms", "max"),
+            total_bytes_billed=("bytes_billed", "sum"),
+            total_slot_ms=("slot_ms", "sum"),
+            avg_rows=("rows", "mean"),
+            max_memory_bytes=("memory_bytes", "max")
+        ).reset_index()
+        
+        summary["rank"] = summary.groupby("page")["total_wall_ms"].rank(
+            ascending=False, method="first"
+        ).astype(int)
+        return summary.sort_values(["page", "rank"]).round(1)